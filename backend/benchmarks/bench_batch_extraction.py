@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Compare per-page and batched LLM extraction for one user's crawl.
+
+The OpenAI client is replaced by a stand-in that returns well-formed
+results and sleeps for a simulated round-trip (fixed overhead plus time
+per prompt token), so the numbers show request count, prompt tokens and
+latency shape rather than real model quality.
+
+Usage: python benchmarks/bench_batch_extraction.py [overhead_ms] [ms_per_1k_tokens]
+"""
+
+import json
+import re
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.extractors import LLMExtractor, estimate_tokens
+
+class StandInClient:
+    def __init__(self, overhead: float, per_1k_tokens: float):
+        self.overhead = overhead
+        self.per_1k_tokens = per_1k_tokens
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+    
+    def create(self, messages, **kwargs):
+        tokens = sum(estimate_tokens(message["content"]) for message in messages)
+        self.requests += 1
+        self.prompt_tokens += tokens
+        time.sleep(self.overhead + tokens / 1000 * self.per_1k_tokens)
+        
+        documents = len(re.findall(r'^### Document \d+', messages[1]["content"], re.MULTILINE))
+        if documents:
+            content = json.dumps({"results": [{"index": i, "activity_type": "profile"} for i in range(documents)]})
+        else:
+            content = json.dumps({"activity_type": "profile"})
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+def user_pages() -> list:
+    pages = []
+    for tab in ("", "?tab=repositories", "?tab=followers", "?tab=following"):
+        pages.append({
+            "platform": "github",
+            "url": f"https://github.com/benchuser{tab}",
+            "content": "# benchuser\n\n**Bio:** Data engineer\n\n42 repositories · 1200 followers\n\n"
+                       + "\n\n".join(f"Pushed to benchuser/repo-{j} with a fix for parser edge cases" for j in range(8))
+        })
+    for path in ("", "/answers", "/articles"):
+        pages.append({
+            "platform": "zhihu",
+            "url": f"https://www.zhihu.com/people/benchuser{path}",
+            "content": "# 测试用户\n\n**个人简介:** 后端开发\n\n1000 关注者\n\n"
+                       + "\n\n".join(f"## 回答 {j}: 如何设计高并发爬虫" for j in range(6))
+        })
+    for engine in ("google", "bing"):
+        for query in range(5):
+            pages.append({
+                "platform": f"search_{engine}",
+                "url": f"https://www.{engine}.com/search?q=benchuser+{query}",
+                "content": "\n\n".join(f"[benchuser result {j}](https://example.com/{j})\n\n> snippet about benchuser projects {j}" for j in range(6))
+            })
+    return pages
+
+def main():
+    overhead = (float(sys.argv[1]) if len(sys.argv) > 1 else 400) / 1000
+    per_1k = (float(sys.argv[2]) if len(sys.argv) > 2 else 50) / 1000
+    pages = user_pages()
+    
+    # Same grouping the profiler uses: one call per platform/engine result set
+    groups = {}
+    for page in pages:
+        groups.setdefault(page["platform"], []).append(page)
+    
+    for mode in ("per-page", "batched"):
+        extractor = LLMExtractor(client=StandInClient(overhead, per_1k))
+        start = time.perf_counter()
+        for group in groups.values():
+            if mode == "batched":
+                extractor.extract_batch(group)
+            else:
+                for page in group:
+                    extractor.extract_structured_info(page["content"], page["platform"], page["url"])
+        elapsed = time.perf_counter() - start
+        print(f"{mode:9s}: {extractor.client.requests:2d} requests, "
+              f"{extractor.client.prompt_tokens:5d} prompt tokens, {elapsed:5.2f}s for {len(pages)} pages")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Show how a degraded host affects a crawl with and without the circuit breaker.
+
+A stand-in fetcher hangs on one host (every request runs past the per-URL
+timeout) and answers another host after a short delay. The same URL list is
+crawled with the breaker effectively disabled and with the default
+threshold, and the wall time and number of fetch attempts are compared.
+
+Usage: python benchmarks/bench_circuit_breaker.py [urls_per_host] [timeout_s]
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.collectors import PageCollector
+from src.collectors.fetcher import FetchResult
+from src.collectors.resilience import HostResilience
+from src.config import config
+
+class StandInFetcher:
+    def __init__(self):
+        self.stats = {"escalations": 0}
+        self.attempts = 0
+    
+    async def fetch(self, url: str, tier: str) -> FetchResult:
+        self.attempts += 1
+        if "degraded" in url:
+            await asyncio.sleep(3600)
+        await asyncio.sleep(0.02)
+        return FetchResult(url, True, markdown=f"# Page\n\n{'A short profile paragraph that is long enough. ' * 2}", tier="http")
+
+async def crawl(urls_per_host: int, timeout: float, failure_threshold: int) -> tuple:
+    config.BREAKER_FAILURE_THRESHOLD = failure_threshold
+    collector = PageCollector()
+    collector.rate_limit = 0
+    collector.url_timeout = timeout
+    collector.fetcher = StandInFetcher()
+    collector.resilience = HostResilience()
+    
+    urls = []
+    for i in range(urls_per_host):
+        urls.append(f"https://degraded.example.com/page/{i}")
+        urls.append(f"https://healthy.example.com/page/{i}")
+    
+    start = time.perf_counter()
+    items = await collector.collect_urls(urls)
+    elapsed = time.perf_counter() - start
+    return elapsed, collector.fetcher.attempts, len(items), collector.resilience.get_stats()
+
+def main():
+    urls_per_host = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    timeout = float(sys.argv[2]) if len(sys.argv) > 2 else 0.5
+    default_threshold = config.BREAKER_FAILURE_THRESHOLD
+    
+    print(f"{urls_per_host} URLs on a hanging host + {urls_per_host} on a healthy host, "
+          f"per-URL timeout {timeout}s")
+    for label, threshold in (("no breaker", 10 ** 9), (f"breaker (threshold {default_threshold})", default_threshold)):
+        elapsed, attempts, items, stats = asyncio.run(crawl(urls_per_host, timeout, threshold))
+        degraded = stats["degraded.example.com"]
+        print(f"  {label:22s}: {elapsed:6.2f}s, {attempts:3d} fetch attempts, {items} items, "
+              f"degraded host state={degraded['state']} rejected={degraded['rejected']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Measure how much page chrome ContentReducer removes before LLM extraction.
+
+Builds GitHub- and Zhihu-shaped pages (navigation, repeated cards, footer
+link lists around a short profile header) and compares the old prompt input
+(the stored 2000-char preview) with the reduced input.
+
+Usage: python benchmarks/bench_content_reduction.py [pages]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.extractors.content_reducer import ContentReducer, estimate_tokens
+
+NAV = "\n".join(f"- [{name}](https://example.com/{name.lower()})" for name in (
+    "Product", "Solutions", "Resources", "Open Source", "Enterprise", "Pricing", "Search", "Explore"
+))
+FOOTER = "© 2024 Example, Inc.\n\n" + "\n".join(
+    f"- [{name}](https://example.com/{name.lower()})" for name in ("Terms", "Privacy", "Security", "Status", "Docs", "Contact")
+)
+
+def github_page(i: int) -> str:
+    repos = "\n\n".join(
+        f"[repo-{j}](https://github.com/user{i}/repo-{j})\n\nPublic\n\nPython · ★ {j * 3}" for j in range(30)
+    )
+    return (
+        f"[Skip to content](#start)\n\n{NAV}\n\nSign in\n\nSign up\n\n{NAV}\n\n"
+        f"{repos}\n\n# user{i}\n\n**Bio:** Builds data pipelines in Python and Rust\n\n"
+        f"{i % 90 + 10} repositories · {i * 7} followers · 12 following\n\n"
+        f"Pushed to user{i}/repo-1\n\nCreated user{i}/repo-2\n\n{FOOTER}"
+    )
+
+def zhihu_page(i: int) -> str:
+    cards = "\n\n".join(f"## 推荐阅读 {j}\n\n[阅读全文](https://zhuanlan.zhihu.com/p/{j})" for j in range(25))
+    return (
+        f"登录\n\n注册\n\n下载 App\n\n{cards}\n\n# 用户{i}\n\n**个人简介:** 后端开发，关注分布式系统\n\n"
+        f"{i * 3} 关注者 · {i % 50} 个回答 · 8 篇文章\n\n## 如何设计一个爬虫调度器？\n\n{cards}\n\n京ICP备13052560号"
+    )
+
+def main():
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    reducer = ContentReducer()
+    
+    for platform, build in (("github", github_page), ("zhihu", zhihu_page)):
+        docs = [build(i) for i in range(pages)]
+        legacy_tokens = sum(estimate_tokens(doc[:2000]) for doc in docs)
+        legacy_has_bio = sum(("Bio:" in doc[:2000] or "个人简介" in doc[:2000]) for doc in docs)
+        
+        start = time.perf_counter()
+        reduced = [reducer.reduce(doc, platform) for doc in docs]
+        elapsed = time.perf_counter() - start
+        reduced_tokens = sum(estimate_tokens(doc) for doc in reduced)
+        reduced_has_bio = sum("Bio:" in doc or "个人简介" in doc for doc in reduced)
+        
+        print(f"{platform}: {pages} pages, avg full page {sum(map(estimate_tokens, docs)) // pages} tokens")
+        print(f"  legacy [:2000] prompt : {legacy_tokens // pages:5d} tokens/page, bio present {legacy_has_bio}/{pages}")
+        print(f"  reduced               : {reduced_tokens // pages:5d} tokens/page, bio present {reduced_has_bio}/{pages}")
+        print(f"  reduction cost        : {elapsed / pages * 1000:.2f} ms/page")
+    
+    for platform, stats in reducer.get_stats().items():
+        print(f"stats[{platform}] = {stats}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""Compare DB size and hot-column scan speed with inline vs. side-table content.
+
+Usage: python benchmarks/bench_content_storage.py [rows]
+"""
+
+import asyncio
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+WORDS = (
+    "python rust async crawler profile github zhihu repository followers answer "
+    "article machine learning database sqlite index timeline markdown api"
+).split()
+
+SCAN_QUERIES = {
+    "platform_scan": (
+        "SELECT id, user_id, timestamp FROM user_activities "
+        "WHERE platform = 'zhihu' ORDER BY timestamp DESC"
+    ),
+    "user_lookup": (
+        "SELECT id, platform, url, title, timestamp FROM user_activities "
+        "WHERE user_id = ? ORDER BY timestamp DESC LIMIT 100"
+    ),
+}
+
+def _markdown(rng: random.Random) -> str:
+    lines = [f"# {rng.choice(WORDS)} {rng.choice(WORDS)}"]
+    while sum(len(line) for line in lines) < rng.randint(600, 2000):
+        lines.append(" ".join(rng.choice(WORDS) for _ in range(12)))
+    return "\n".join(lines)[:2000]
+
+def build_legacy_db(path: str, rows: int):
+    rng = random.Random(42)
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE user_activities (id INTEGER PRIMARY KEY, user_id VARCHAR, "
+        "platform VARCHAR, url VARCHAR, title VARCHAR, content TEXT, "
+        "extracted_data JSON, timestamp DATETIME, created_at DATETIME)"
+    )
+    conn.execute("CREATE INDEX ix_user_activities_user_id ON user_activities (user_id)")
+    conn.executemany(
+        "INSERT INTO user_activities (user_id, platform, url, title, content, "
+        "extracted_data, timestamp, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            (
+                f"user{rng.randint(0, rows // 50)}",
+                rng.choice(["github", "zhihu", "search_google"]),
+                f"https://example.com/{i}",
+                f"Activity {i}",
+                _markdown(rng),
+                '{"type": "profile"}',
+                f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} 00:00:00",
+                "2024-01-01 00:00:00",
+            )
+            for i in range(rows)
+        ),
+    )
+    conn.commit()
+    conn.close()
+
+def measure(path: str, repeat: int = 5) -> dict:
+    conn = sqlite3.connect(path)
+    timings = {}
+    for name, sql in SCAN_QUERIES.items():
+        params = ("user7",) if "?" in sql else ()
+        start = time.perf_counter()
+        for _ in range(repeat):
+            conn.execute(sql, params).fetchall()
+        timings[name] = (time.perf_counter() - start) / repeat * 1000
+    hot_pages = conn.execute(
+        "SELECT COUNT(*) FROM dbstat WHERE name = 'user_activities'"
+    ).fetchone()[0] if _has_dbstat(conn) else None
+    conn.close()
+    return {"size_mb": os.path.getsize(path) / 1024 / 1024, "hot_pages": hot_pages, **timings}
+
+def _has_dbstat(conn) -> bool:
+    try:
+        conn.execute("SELECT 1 FROM dbstat LIMIT 1")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+async def migrate(path: str):
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{path}"
+    from src.storage.database import DatabaseManager
+    db = DatabaseManager()
+    await db.init_db()
+    await db.close()
+    conn = sqlite3.connect(path)
+    conn.execute("VACUUM")
+    conn.close()
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        print(f"Building legacy database with {rows} rows...")
+        build_legacy_db(path, rows)
+        before = measure(path)
+        
+        start = time.perf_counter()
+        asyncio.run(migrate(path))
+        migration_s = time.perf_counter() - start
+        after = measure(path)
+    
+    print(f"\nMigration + VACUUM took {migration_s:.2f}s\n")
+    print(f"{'metric':<20}{'inline':>12}{'side table':>14}")
+    for key in before:
+        if before[key] is None:
+            continue
+        print(f"{key:<20}{before[key]:>12.2f}{after[key]:>14.2f}")
+
+if __name__ == "__main__":
+    main()
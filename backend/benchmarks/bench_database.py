@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""DatabaseManager micro-benchmarks at 1k, 100k and 1M activities, with JSON baselines.
+
+Each tier is a synthetic database from synthetic_data.py (power-law
+activity per user), generated once into --data-dir and copied to a
+scratch file per run so writes never leak into the next run. Reads are
+timed for the heaviest ("hot"), a median and a single-activity ("tail")
+user.
+
+compare exits 1 when any operation's median got slower than the
+baseline by more than --threshold (and by at least --min-delta-ms, so
+sub-millisecond noise doesn't fail the check).
+
+Usage: python benchmarks/bench_database.py run [--tiers 1k,100k,1M] [--repeat 20]
+       [--data-dir benchmarks/.data] [--output benchmarks/baselines/database.json]
+       python benchmarks/bench_database.py compare BASELINE CURRENT [--threshold 0.25] [--min-delta-ms 0.5]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.config import config
+from synthetic_data import generate, load_manifest
+
+TIERS = {"1k": 1_000, "100k": 100_000, "1M": 1_000_000}
+DEFAULT_OUTPUT = str(Path(__file__).parent / "baselines" / "database.json")
+
+def sample_activity(i: int) -> dict:
+    return {
+        "user_id": "bench_writer",
+        "platform": "github",
+        "url": f"https://github.com/bench_writer?tab=repositories&page={i}",
+        "title": f"bench_writer repository {i}",
+        "content": "Benchmark repository for crawling and parsing " * 20,
+        "extracted_data": {"skills/interests": ["python", "sqlite"], "followers": i}
+    }
+
+def sample_profile(i: int) -> dict:
+    return {
+        "user_id": "bench_profile",
+        "generated_at": datetime.now().isoformat(),
+        "ai_analysis": {"interests": ["python", "sqlite"], "revision": i},
+        "timeline_highlights": [{"platform": "github", "title": f"highlight {j}"} for j in range(10)]
+    }
+
+def prepare_tier(tier: str, data_dir: str) -> str:
+    """Path to the tier's pristine database, generating it on first use"""
+    path = os.path.join(data_dir, f"tier-{tier}.db")
+    try:
+        if load_manifest(path)["activities"] == TIERS[tier]:
+            return path
+    except (OSError, ValueError, KeyError):
+        pass
+    for stale in (path, path + ".manifest.json", path + "-wal", path + "-shm"):
+        if os.path.exists(stale):
+            os.remove(stale)
+    print(f"Generating {tier} tier ({TIERS[tier]} activities)...", flush=True)
+    generate(path, activities=TIERS[tier])
+    return path
+
+async def time_op(func, repeat: int, warmup: int = 2) -> dict:
+    for i in range(warmup):
+        await func(-1 - i)
+    timings = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        await func(i)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        "median_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[min(len(timings) - 1, int(0.95 * len(timings)))], 3),
+        "min_ms": round(timings[0], 3),
+        "ops_per_sec": round(1000 / statistics.mean(timings), 1),
+        "runs": repeat
+    }
+
+async def bench_tier(path: str, repeat: int) -> dict:
+    manifest = load_manifest(path)
+    users = {tier: sample[0][0] for tier, sample in manifest["sample_users"].items()}
+    
+    config.DATABASE_URL = f"sqlite+aiosqlite:///{path}"
+    from src.storage.database import DatabaseManager
+    db = DatabaseManager()
+    await db.init_db()
+    
+    operations = {
+        "add_activity": lambda i: db.add_activity(sample_activity(i)),
+        "save_user_profile[insert]": lambda i: db.save_user_profile(f"bench_profile_{i}", sample_profile(i)),
+        "save_user_profile[update]": lambda i: db.save_user_profile("bench_profile", sample_profile(i)),
+        "get_user_profile": lambda i: db.get_user_profile(users["hot"])
+    }
+    for tier, user in users.items():
+        operations[f"get_user_activities[{tier}]"] = lambda i, user=user: db.get_user_activities(user)
+        operations[f"get_user_activities[{tier},platform]"] = (
+            lambda i, user=user: db.get_user_activities(user, platform="github")
+        )
+        operations[f"get_user_activities[{tier},content]"] = (
+            lambda i, user=user: db.get_user_activities(user, with_content=True)
+        )
+        operations[f"get_timeline_data[{tier}]"] = lambda i, user=user: db.get_timeline_data(user)
+        operations[f"get_platform_statistics[{tier}]"] = lambda i, user=user: db.get_platform_statistics(user)
+    
+    results = {}
+    try:
+        for name, func in operations.items():
+            results[name] = await time_op(func, repeat)
+            print(f"  {name:<44}{results[name]['median_ms']:>10.2f} ms{results[name]['p95_ms']:>10.2f} ms", flush=True)
+    finally:
+        await db.close()
+    return results
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, cwd=Path(__file__).parent
+        ).stdout.strip()
+    except OSError:
+        return ""
+
+def run(args):
+    tiers = [tier.strip() for tier in args.tiers.split(",")]
+    unknown = [tier for tier in tiers if tier not in TIERS]
+    if unknown:
+        raise SystemExit(f"Unknown tier(s) {', '.join(unknown)}; choose from {', '.join(TIERS)}")
+    os.makedirs(args.data_dir, exist_ok=True)
+    
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "machine": f"{platform.system()} {platform.machine()}, {os.cpu_count()} CPU",
+            "repeat": args.repeat
+        },
+        "tiers": {}
+    }
+    for tier in tiers:
+        pristine = prepare_tier(tier, args.data_dir)
+        with tempfile.TemporaryDirectory() as tmp:
+            # Writes go to a scratch copy so every run starts from the same data
+            scratch = os.path.join(tmp, "bench.db")
+            shutil.copyfile(pristine, scratch)
+            shutil.copyfile(pristine + ".manifest.json", scratch + ".manifest.json")
+            print(f"\n{tier} ({TIERS[tier]} activities){'median':>28}{'p95':>13}")
+            report["tiers"][tier] = asyncio.run(bench_tier(scratch, args.repeat))
+    
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+def compare(args) -> int:
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    
+    regressions = 0
+    print(f"{'tier':<6}{'operation':<44}{'baseline':>12}{'current':>12}{'change':>9}")
+    for tier, operations in current["tiers"].items():
+        for name, result in operations.items():
+            old = baseline["tiers"].get(tier, {}).get(name)
+            if old is None:
+                continue
+            before, after = old["median_ms"], result["median_ms"]
+            change = (after - before) / before if before else 0.0
+            regressed = change > args.threshold and after - before >= args.min_delta_ms
+            regressions += regressed
+            flag = "  REGRESSION" if regressed else ""
+            print(f"{tier:<6}{name:<44}{before:>10.2f}ms{after:>10.2f}ms{change:>+9.0%}{flag}")
+    
+    print(f"\n{regressions} regression(s) beyond {args.threshold:.0%} "
+          f"(baseline {baseline['meta']['commit'] or baseline['meta']['timestamp']}, "
+          f"current {current['meta']['commit'] or current['meta']['timestamp']})")
+    return 1 if regressions else 0
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    run_parser = commands.add_parser("run", help="benchmark and write a JSON result file")
+    run_parser.add_argument("--tiers", default="1k,100k,1M")
+    run_parser.add_argument("--repeat", type=int, default=20)
+    run_parser.add_argument("--data-dir", default=str(Path(__file__).parent / ".data"))
+    run_parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    
+    compare_parser = commands.add_parser("compare", help="flag regressions between two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown, 0.25 = 25%%")
+    compare_parser.add_argument("--min-delta-ms", type=float, default=0.5)
+    
+    args = parser.parse_args()
+    if args.command == "run":
+        run(args)
+    else:
+        sys.exit(compare(args))
+
+if __name__ == "__main__":
+    main()
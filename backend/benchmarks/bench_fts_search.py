@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""FTS5 search latency on a synthetic corpus vs. scanning activities in Python.
+
+Usage: python benchmarks/bench_fts_search.py [rows]
+"""
+
+import asyncio
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+import zlib
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import orjson
+from src.config import config
+
+VOCABULARY = [f"word{i}" for i in range(5000)]
+TECH = ["python", "rust", "golang", "kubernetes", "react", "pytorch", "sqlite", "tokio", "fastapi", "vue"]
+PLATFORMS = ["github", "zhihu", "search_google", "search_bing"]
+
+QUERIES = [
+    ("common term", "python", {}),
+    ("rare term", "word4999", {}),
+    ("two terms", "rust tokio", {}),
+    ("prefix", "kube*", {}),
+    ("per-user", "python", {"user_id": "user42"}),
+    ("per-platform", "rust", {"platform": "zhihu"}),
+]
+
+def populate(path: str, rows: int):
+    from src.storage.search import fts_row, INSERT_FTS_ROW
+    rng = random.Random(7)
+    conn = sqlite3.connect(path)
+    users = max(rows // 100, 1)
+    batch_size = 10000
+    for start in range(0, rows, batch_size):
+        activities, contents, fts = [], [], []
+        for activity_id in range(start + 1, min(start + batch_size, rows) + 1):
+            skills = rng.sample(TECH, 2)
+            title = f"{rng.choice(TECH)} {rng.choice(VOCABULARY)}"
+            content = " ".join(rng.choice(VOCABULARY) for _ in range(40))
+            extracted = {"skills/interests": skills}
+            activities.append((
+                activity_id, f"user{int(rng.paretovariate(1.2)) % users}", rng.choice(PLATFORMS),
+                f"https://example.com/{activity_id}", title, orjson.dumps(extracted).decode(),
+                "2024-01-01 00:00:00", "2024-01-01 00:00:00"
+            ))
+            contents.append((activity_id, zlib.compress(content.encode())))
+            row = fts_row(activity_id, title, content, extracted)
+            fts.append((row["id"], row["title"], row["content"], row["topics"]))
+        conn.executemany("INSERT INTO user_activities VALUES (?, ?, ?, ?, ?, ?, ?, ?)", activities)
+        conn.executemany("INSERT INTO user_activity_contents VALUES (?, ?)", contents)
+        conn.executemany(
+            "INSERT INTO user_activities_fts (rowid, title, content, topics) VALUES (?, ?, ?, ?)", fts
+        )
+        conn.commit()
+    conn.close()
+
+def python_scan(path: str, term: str) -> int:
+    conn = sqlite3.connect(path)
+    hits = 0
+    for title, extracted, body in conn.execute(
+        "SELECT a.title, a.extracted_data, c.body FROM user_activities a "
+        "LEFT JOIN user_activity_contents c ON c.activity_id = a.id"
+    ):
+        text = f"{title} {zlib.decompress(body).decode() if body else ''} {extracted}".lower()
+        if term in text:
+            hits += 1
+    conn.close()
+    return hits
+
+async def bench(path: str) -> list:
+    from src.storage.database import DatabaseManager
+    db = DatabaseManager()
+    results = []
+    for name, query, filters in QUERIES:
+        timings = []
+        for _ in range(10):
+            start = time.perf_counter()
+            total, _ = await db.search_activities(query, limit=20, **filters)
+            timings.append((time.perf_counter() - start) * 1000)
+        results.append((name, query, total, statistics.median(timings), max(timings)))
+    await db.close()
+    return results
+
+async def init(path: str):
+    from src.storage.database import DatabaseManager
+    db = DatabaseManager()
+    await db.init_db()
+    await db.close()
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "search.db")
+        config.DATABASE_URL = f"sqlite+aiosqlite:///{path}"
+        asyncio.run(init(path))
+        
+        start = time.perf_counter()
+        populate(path, rows)
+        print(f"Indexed {rows} activities in {time.perf_counter() - start:.1f}s "
+              f"({os.path.getsize(path) / 1024 / 1024:.0f} MB)\n")
+        
+        print(f"{'query':<14}{'q':<12}{'total':>9}{'median ms':>11}{'max ms':>9}")
+        for name, query, total, median, worst in asyncio.run(bench(path)):
+            print(f"{name:<14}{query:<12}{total:>9}{median:>11.2f}{worst:>9.2f}")
+        
+        start = time.perf_counter()
+        hits = python_scan(path, "word4999")
+        print(f"\nPython scan for 'word4999': {hits} hits in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Ingestion throughput with per-row commits vs. the group-commit writer.
+
+Each simulated crawl awaits its inserts one by one, like UserProfiler does
+per page; crawls run concurrently on one event loop.
+
+Usage: python benchmarks/bench_group_commit.py [rows_per_crawl]
+"""
+
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.config import config
+
+def activity(crawl: int, i: int) -> dict:
+    return {
+        "user_id": f"user{crawl}",
+        "platform": "github",
+        "url": f"https://github.com/user{crawl}?page={i}",
+        "title": f"Activity {i}",
+        "content": "benchmark content " * 50,
+        "extracted_data": {"type": "github_profile", "page": i},
+    }
+
+async def commit_per_row(db, data: dict):
+    from src.storage.database import _build_activity
+    async with db.async_session() as session:
+        session.add(_build_activity(data))
+        await session.commit()
+
+async def run(mode: str, crawls: int, rows: int) -> float:
+    from src.storage.database import DatabaseManager
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        config.DATABASE_URL = f"sqlite+aiosqlite:///{tmp}/bench.db"
+        db = DatabaseManager()
+        await db.init_db()
+        
+        async def crawl(index: int):
+            for i in range(rows):
+                if mode == "per-row":
+                    await commit_per_row(db, activity(index, i))
+                else:
+                    await db.add_activity(activity(index, i))
+        
+        start = time.perf_counter()
+        await asyncio.gather(*(crawl(i) for i in range(crawls)))
+        elapsed = time.perf_counter() - start
+        await db.close()
+    
+    return crawls * rows / elapsed
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    print(f"{rows} sequential inserts per crawl\n")
+    print(f"{'crawls':>7}{'per-row rows/s':>17}{'group rows/s':>15}")
+    for crawls in (1, 4, 16, 64):
+        per_row = asyncio.run(run("per-row", crawls, rows))
+        grouped = asyncio.run(run("group", crawls, rows))
+        print(f"{crawls:>7}{per_row:>17.1f}{grouped:>15.1f}")
+
+if __name__ == "__main__":
+    main()
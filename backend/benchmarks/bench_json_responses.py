@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Compare the default FastAPI response path with the ORJSON path.
+
+Usage: python benchmarks/bench_json_responses.py
+"""
+
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
+from fastapi.testclient import TestClient
+
+from src.api.main import serialize_activity
+from src.models import ActivityResponse
+
+def make_activities(count: int) -> list:
+    base = datetime(2024, 1, 1)
+    return [
+        SimpleNamespace(
+            id=i,
+            user_id="benchuser",
+            platform=("github", "zhihu", "search_google")[i % 3],
+            url=f"https://github.com/benchuser?page={i}",
+            title=f"Activity {i}",
+            content="Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 20,
+            extracted_data={
+                "type": "github_profile",
+                "followers": i,
+                "skills": ["python", "rust", "sql"],
+                "recent_activities": [{"action": "Pushed to", "target": f"repo-{i}"}],
+            },
+            timestamp=base + timedelta(minutes=i),
+        )
+        for i in range(count)
+    ]
+
+def build_app(activities: list) -> FastAPI:
+    app = FastAPI()
+    
+    @app.get("/default", response_model=List[ActivityResponse])
+    async def default_path():
+        return activities
+    
+    @app.get("/orjson", response_model=List[ActivityResponse], response_class=ORJSONResponse)
+    async def orjson_path():
+        return ORJSONResponse([serialize_activity(activity) for activity in activities])
+    
+    return app
+
+def bench(client: TestClient, path: str, repeat: int, headers: dict = None) -> tuple:
+    client.get(path, headers=headers)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        response = client.get(path, headers=headers)
+    elapsed = (time.perf_counter() - start) / repeat * 1000
+    return elapsed, len(response.content)
+
+def main():
+    print(f"{'rows':>6} {'path':<10} {'ms/req':>10} {'bytes':>12}")
+    for count, repeat in ((1000, 20), (10000, 5)):
+        client = TestClient(build_app(make_activities(count)))
+        for path in ("/default", "/orjson"):
+            elapsed, size = bench(client, path, repeat)
+            print(f"{count:>6} {path[1:]:<10} {elapsed:>10.2f} {size:>12}")
+    
+    print("\nWire size through CompressionMiddleware (10k rows, orjson path):")
+    from src.api.compression import CompressionMiddleware
+    app = build_app(make_activities(10000))
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+    client = TestClient(app)
+    for encoding in ("identity", "gzip", "br"):
+        response = client.get("/orjson", headers={"Accept-Encoding": encoding})
+        elapsed, _ = bench(client, "/orjson", 5, headers={"Accept-Encoding": encoding})
+        wire = int(response.headers.get("content-length", len(response.content)))
+        print(f"  {encoding:<9} {wire:>10} bytes {elapsed:>9.2f} ms/req")
+
+if __name__ == "__main__":
+    main()
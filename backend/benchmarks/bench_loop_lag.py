@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Measure event-loop lag while pages are converted and parsed, inline vs offloaded.
+
+A probe coroutine sleeps 5 ms in a loop and records how late it wakes up,
+which is the delay every API request on the same loop would see. Meanwhile
+profile-sized HTML pages "arrive" every few milliseconds and go through the
+same path as a crawl: html_to_markdown, then the GitHub parser.
+
+Usage: python benchmarks/bench_loop_lag.py [pages] [workers]
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.collectors import GitHubCollector
+from src.collectors.fetcher import html_to_markdown
+from src.utils import offload
+from src.utils.offload import CPUOffloader
+
+def profile_html(i: int) -> str:
+    repos = "".join(
+        f"<li><a href='/user{i}/repo-{j}'>repo-{j}</a><p>Tool number {j} for parsing and crawling</p>"
+        f"<span>Python</span> <span>{j * 3} stars</span></li>"
+        for j in range(300)
+    )
+    return (
+        f"<html><body><nav>{'<a href=/x>Menu</a>' * 50}</nav><h1>user{i}</h1>"
+        f"<p><b>Bio:</b> Builds data tools</p><p>{i % 90} repositories</p><p>{i * 3} followers</p>"
+        f"<ul>{repos}</ul></body></html>"
+    )
+
+async def probe(lags: list, stop: asyncio.Event):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.005)
+        lags.append(time.perf_counter() - start - 0.005)
+
+async def run(mode: str, pages: list, workers: int) -> dict:
+    offloader = CPUOffloader(mode=mode, workers=workers)
+    offload.cpu_offloader = offloader
+    # Modules bound the global at import time; point them at this run's pool
+    import src.collectors.base_collector as base_collector
+    base_collector.cpu_offloader = offloader
+    
+    collector = GitHubCollector()
+    if offloader.enabled:
+        await offloader.run(len, "warm-up")  # Pay worker start-up before timing
+    
+    async def handle(i: int, html: str):
+        await asyncio.sleep(i * 0.004)  # Pages trickle in like network responses
+        if offloader.worth_offloading(len(html)):
+            markdown = await offloader.run(html_to_markdown, html, "https://github.com/")
+        else:
+            markdown = html_to_markdown(html, "https://github.com/")
+        return await collector.parse(f"https://github.com/user{i}", markdown, "http")
+    
+    lags = []
+    stop = asyncio.Event()
+    probe_task = asyncio.create_task(probe(lags, stop))
+    start = time.perf_counter()
+    items = await asyncio.gather(*(handle(i, html) for i, html in enumerate(pages)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await probe_task
+    offloader.close()
+    
+    lags_ms = sorted(lag * 1000 for lag in lags)
+    return {
+        "elapsed": elapsed,
+        "parsed": sum(1 for item in items if item),
+        "p50": statistics.median(lags_ms),
+        "p99": lags_ms[int(len(lags_ms) * 0.99) - 1],
+        "max": lags_ms[-1],
+        "batches": offloader.batches,
+    }
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+    pages = [profile_html(i) for i in range(count)]
+    print(f"{count} pages of ~{len(pages[0]) // 1024} KB HTML, {workers} workers")
+    
+    for mode in ("inline", "thread", "process"):
+        result = asyncio.run(run(mode, pages, workers))
+        print(f"  {mode:8s}: {result['elapsed']:5.2f}s, parsed {result['parsed']}/{count}, "
+              f"loop lag p50 {result['p50']:6.2f} ms  p99 {result['p99']:7.2f} ms  max {result['max']:7.2f} ms"
+              f"  ({result['batches']} batches)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Readers-vs-writers concurrency benchmark for the default and tuned SQLite modes.
+
+Writers and readers run in separate processes, like concurrent crawl workers
+writing while the API serves the dashboard.
+
+Usage: python benchmarks/bench_sqlite_concurrency.py [writers] [readers] [writes_per_writer]
+"""
+
+import asyncio
+import multiprocessing
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.config import config
+
+def _manager(database_url: str, tuned: bool):
+    config.DATABASE_URL = database_url
+    config.SQLITE_TUNED = tuned
+    from src.storage.database import DatabaseManager
+    return DatabaseManager()
+
+async def _write(database_url: str, tuned: bool, index: int, writes: int) -> dict:
+    db = _manager(database_url, tuned)
+    stats = {"ops": 0, "errors": 0}
+    for i in range(writes):
+        try:
+            await db.add_activity({
+                "user_id": f"user{index}",
+                "platform": "github",
+                "url": f"https://github.com/user{index}?page={i}",
+                "title": f"Activity {i}",
+                "content": "benchmark content " * 50,
+                "extracted_data": {"type": "github_profile", "page": i},
+            })
+            stats["ops"] += 1
+        except Exception:
+            stats["errors"] += 1
+    await db.close()
+    return stats
+
+async def _read(database_url: str, tuned: bool, index: int, stop) -> dict:
+    db = _manager(database_url, tuned)
+    stats = {"ops": 0, "errors": 0}
+    while not stop.is_set():
+        try:
+            await db.get_timeline_data(f"user{index % 4}")
+            stats["ops"] += 1
+        except Exception:
+            stats["errors"] += 1
+    await db.close()
+    return stats
+
+def writer_process(args):
+    return asyncio.run(_write(*args))
+
+def reader_process(args):
+    return asyncio.run(_read(*args))
+
+async def _init(database_url: str, tuned: bool):
+    db = _manager(database_url, tuned)
+    await db.init_db()
+    await db.close()
+
+def run_mode(tuned: bool, writers: int, readers: int, writes: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite+aiosqlite:///{tmp}/bench.db"
+        asyncio.run(_init(database_url, tuned))
+        
+        manager = multiprocessing.Manager()
+        stop = manager.Event()
+        with multiprocessing.Pool(writers + readers) as pool:
+            start = time.perf_counter()
+            read_results = pool.map_async(
+                reader_process, [(database_url, tuned, i, stop) for i in range(readers)]
+            )
+            write_stats = pool.map(
+                writer_process, [(database_url, tuned, i, writes) for i in range(writers)]
+            )
+            elapsed = time.perf_counter() - start
+            stop.set()
+            read_stats = read_results.get()
+        manager.shutdown()
+    
+    return {
+        "writes/s": sum(s["ops"] for s in write_stats) / elapsed,
+        "reads/s": sum(s["ops"] for s in read_stats) / elapsed,
+        "write_errors": sum(s["errors"] for s in write_stats),
+        "read_errors": sum(s["errors"] for s in read_stats),
+        "elapsed_s": elapsed,
+    }
+
+def main():
+    writers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    readers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    writes = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+    
+    print(f"{writers} writer processes x {writes} inserts, {readers} reader processes\n")
+    print(f"{'mode':<10}{'writes/s':>10}{'reads/s':>10}{'w_err':>7}{'r_err':>7}{'elapsed_s':>11}")
+    for tuned in (False, True):
+        result = run_mode(tuned, writers, readers, writes)
+        name = "tuned" if tuned else "default"
+        print(
+            f"{name:<10}{result['writes/s']:>10.1f}{result['reads/s']:>10.1f}"
+            f"{result['write_errors']:>7}{result['read_errors']:>7}{result['elapsed_s']:>11.2f}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Measure cold import time of the API and CLI entry points.
+
+Each measurement runs in a fresh interpreter. The script fails (exit 1)
+when the median import time exceeds the threshold or when a module that
+should load lazily (crawl4ai, openai, playwright) is imported at startup,
+so it can guard against regressions in CI.
+
+Usage: python benchmarks/bench_startup.py [--runs 5] [--max-seconds 2.0]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+LAZY_MODULES = ("crawl4ai", "openai", "playwright")
+
+ENTRY_POINTS = {
+    "api": "src.api.main",
+    "profiler": "src.profiler.user_profiler",
+    "collectors": "src.collectors",
+}
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "lazy_loaded": [m for m in {lazy!r} if m in sys.modules]}}))
+"""
+
+def measure(module: str) -> dict:
+    env = dict(os.environ)
+    env.pop("OPENAI_API_KEY", None)  # Startup must not need it
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module, lazy=LAZY_MODULES)],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-seconds", type=float, default=2.0, help="Regression threshold for the median")
+    args = parser.parse_args()
+    
+    failed = False
+    for name, module in ENTRY_POINTS.items():
+        samples = [measure(module) for _ in range(args.runs)]
+        median = statistics.median(sample["seconds"] for sample in samples)
+        lazy_loaded = sorted(set(m for sample in samples for m in sample["lazy_loaded"]))
+        
+        status = "ok"
+        if median > args.max_seconds:
+            status = f"SLOW (> {args.max_seconds}s)"
+            failed = True
+        if lazy_loaded:
+            status = f"EAGER IMPORT {lazy_loaded}"
+            failed = True
+        print(f"{name:10s} import {module:28s} median {median:.3f}s "
+              f"(min {min(s['seconds'] for s in samples):.3f}s)  {status}")
+    
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
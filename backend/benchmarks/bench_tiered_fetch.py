@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""Compare a pooled keep-alive HTTP client against one client per request.
+
+Serves a profile-like page from a local stand-in server and fetches it
+through TieredFetcher's HTTP tier and through a fresh httpx client per URL,
+which is what the old one-browser-context-per-crawl path amounted to at the
+connection level. The browser tier is reported but only timed when
+Playwright browsers are installed.
+
+Usage: python benchmarks/bench_tiered_fetch.py [requests] [concurrency]
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+
+from src.collectors import GitHubCollector
+from src.collectors.fetcher import TieredFetcher, html_to_markdown
+
+PAGE = (
+    "<html><head><title>benchuser</title></head><body>"
+    "<h1>benchuser</h1><p><b>Bio:</b> Builds crawlers and data tools</p>"
+    + "".join(f"<p>Pushed to <a href='/benchuser/repo-{i}'>repo-{i}</a></p>" for i in range(40))
+    + "<p>42 repositories</p><p>1200 followers</p><p>80 following</p></body></html>"
+).encode()
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like a real site
+    
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(PAGE)))
+        self.end_headers()
+        self.wfile.write(PAGE)
+    
+    def log_message(self, *args):
+        pass
+
+async def run_pooled(base_url: str, total: int, concurrency: int) -> float:
+    fetcher = TieredFetcher()
+    limit = asyncio.Semaphore(concurrency)
+    
+    async def one(i: int):
+        async with limit:
+            result = await fetcher.fetch(f"{base_url}/benchuser?page={i}", "http")
+            assert result.success
+    
+    await one(-1)  # warm-up
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    elapsed = time.perf_counter() - start
+    await fetcher.close()
+    return elapsed
+
+async def run_per_request(base_url: str, total: int, concurrency: int) -> float:
+    limit = asyncio.Semaphore(concurrency)
+    
+    async def one(i: int):
+        async with limit:
+            async with httpx.AsyncClient() as client:
+                response = await client.get(f"{base_url}/benchuser?page={i}")
+                html_to_markdown(response.text, str(response.url))
+    
+    await one(-1)
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    return time.perf_counter() - start
+
+def browser_available() -> bool:
+    try:
+        from playwright.sync_api import sync_playwright
+        with sync_playwright() as p:
+            return Path(p.chromium.executable_path).exists()
+    except Exception:
+        return False
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    
+    markdown = html_to_markdown(PAGE.decode(), base_url)
+    parsed = GitHubCollector().extract_user_info(markdown, base_url)
+    print(f"Stand-in page: {len(PAGE)} bytes HTML -> {len(markdown)} chars markdown, "
+          f"parsed fields: {sorted(k for k in parsed if k != 'timestamp')}")
+    print(f"{total} requests, concurrency {concurrency}")
+    
+    pooled = asyncio.run(run_pooled(base_url, total, concurrency))
+    fresh = asyncio.run(run_per_request(base_url, total, concurrency))
+    print(f"  pooled client      : {pooled:6.2f}s  ({total / pooled:7.1f} req/s)")
+    print(f"  client per request : {fresh:6.2f}s  ({total / fresh:7.1f} req/s)")
+    print(f"  speedup            : {fresh / pooled:6.2f}x")
+    
+    if browser_available():
+        fetcher = TieredFetcher()
+        
+        async def browser_run():
+            await fetcher.fetch_browser(base_url)
+            start = time.perf_counter()
+            for i in range(20):
+                await fetcher.fetch_browser(f"{base_url}/benchuser?page={i}")
+            elapsed = time.perf_counter() - start
+            await fetcher.close()
+            return elapsed
+        
+        elapsed = asyncio.run(browser_run())
+        print(f"  browser tier       : {elapsed / 20 * 1000:6.1f} ms/page (20 pages, shared browser)")
+    else:
+        print("  browser tier       : unavailable (Playwright browsers not installed)")
+    
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""Open-loop load test of the read endpoints against a synthetic database.
+
+Requests are started on a fixed schedule at the target rate, whether or
+not earlier ones have finished, and latency is measured from the
+scheduled start. That way a stalled server shows up as latency instead of
+as a slower request rate (no coordinated omission). Users are drawn from
+the same power law the data was generated with, so hot users get most
+of the traffic.
+
+By default the app runs in this process over httpx's ASGI transport,
+which shares the CPU with the load generator; pass --url to drive a
+separately started server (pointed at the same DATABASE_URL) instead.
+
+Usage: python benchmarks/synthetic_data.py /tmp/load.db --activities 1000000
+       python benchmarks/load_test.py /tmp/load.db [--rps 50] [--duration 30]
+       [--mix activities=1,timeline=1,stats=1,profile=1] [--url http://localhost:8000]
+       [--output report.json] [--compare baseline.json]
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+import httpx
+from synthetic_data import load_manifest, user_id, zipf_cum_weights
+
+ENDPOINTS = {
+    "activities": "/users/{user}/activities",
+    "timeline": "/users/{user}/timeline",
+    "stats": "/users/{user}/stats",
+    "profile": "/users/{user}/profile"
+}
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    # Nearest rank
+    index = min(len(sorted_values) - 1, max(0, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+def parse_mix(value: str) -> dict:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ENDPOINTS:
+            raise SystemExit(f"Unknown endpoint {name!r}; choose from {', '.join(ENDPOINTS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+class UserPicker:
+    """Draw user ids with the power law from the data manifest; profiles only exist for the top ranks"""
+    
+    def __init__(self, manifest: dict, seed: int):
+        self.rng = random.Random(seed)
+        self.cum_weights = zipf_cum_weights(manifest["users"], manifest["zipf"])
+        self.ranks = range(1, manifest["users"] + 1)
+        self.profiles = manifest["profiles"]
+    
+    def pick(self, endpoint: str) -> str:
+        if endpoint == "profile" and self.profiles:
+            cum_weights = self.cum_weights[:self.profiles]
+            return user_id(self.rng.choices(self.ranks[:self.profiles], cum_weights=cum_weights)[0])
+        return user_id(self.rng.choices(self.ranks, cum_weights=self.cum_weights)[0])
+
+async def run_load(client: httpx.AsyncClient, picker: UserPicker, mix: dict, rps: float,
+                   duration: float, max_in_flight: int, seed: int) -> dict:
+    loop = asyncio.get_running_loop()
+    rng = random.Random(seed)
+    names, weights = list(mix), list(mix.values())
+    results = defaultdict(lambda: {"latencies": [], "errors": 0, "dropped": 0, "statuses": defaultdict(int)})
+    in_flight = set()
+    
+    async def one(endpoint: str, path: str, scheduled: float):
+        entry = results[endpoint]
+        try:
+            response = await client.get(path)
+            entry["statuses"][response.status_code] += 1
+            if response.status_code >= 400:
+                entry["errors"] += 1
+        except Exception as e:
+            entry["statuses"][type(e).__name__] += 1
+            entry["errors"] += 1
+        entry["latencies"].append((loop.time() - scheduled) * 1000)
+    
+    total = int(rps * duration)
+    start = loop.time() + 0.05
+    for i in range(total):
+        scheduled = start + i / rps
+        delay = scheduled - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        
+        endpoint = rng.choices(names, weights)[0]
+        if len(in_flight) >= max_in_flight:
+            # The server has fallen this far behind; count it instead of piling on
+            results[endpoint]["dropped"] += 1
+            continue
+        path = ENDPOINTS[endpoint].format(user=picker.pick(endpoint))
+        task = asyncio.create_task(one(endpoint, path, scheduled))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+    
+    if in_flight:
+        await asyncio.gather(*in_flight)
+    elapsed = loop.time() - start
+    
+    report = {}
+    for endpoint in names:
+        entry = results[endpoint]
+        latencies = sorted(entry["latencies"])
+        sent = len(latencies) + entry["dropped"]
+        report[endpoint] = {
+            "sent": sent,
+            "completed": len(latencies),
+            "dropped": entry["dropped"],
+            "errors": entry["errors"],
+            "error_rate": round((entry["errors"] + entry["dropped"]) / sent, 4) if sent else 0.0,
+            "throughput_rps": round((len(latencies) - entry["errors"]) / elapsed, 2),
+            "p50_ms": round(percentile(latencies, 0.50), 2),
+            "p90_ms": round(percentile(latencies, 0.90), 2),
+            "p99_ms": round(percentile(latencies, 0.99), 2),
+            "max_ms": round(latencies[-1], 2) if latencies else 0.0,
+            "statuses": {str(status): count for status, count in entry["statuses"].items()}
+        }
+    return report
+
+async def run(args, manifest: dict) -> dict:
+    picker = UserPicker(manifest, args.seed)
+    mix = parse_mix(args.mix)
+    
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout)
+        db_manager = None
+    else:
+        # The database manager binds DATABASE_URL when src.api.main is imported
+        from src.config import config
+        config.DATABASE_URL = f"sqlite+aiosqlite:///{args.db}"
+        config.LOG_LEVEL = "WARNING"
+        from src.api.main import app, db_manager
+        await db_manager.init_db()
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://loadtest", timeout=args.timeout
+        )
+    
+    try:
+        if args.warmup:
+            await run_load(client, picker, mix, args.rps, args.warmup, args.max_in_flight, args.seed + 1)
+        return await run_load(client, picker, mix, args.rps, args.duration, args.max_in_flight, args.seed)
+    finally:
+        await client.aclose()
+        if db_manager is not None:
+            await db_manager.close()
+
+def print_report(report: dict, baseline: dict = None):
+    header = f"{'endpoint':<12}{'sent':>7}{'rps':>9}{'err %':>8}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}"
+    print(header)
+    for endpoint, entry in report["endpoints"].items():
+        print(
+            f"{endpoint:<12}{entry['sent']:>7}{entry['throughput_rps']:>9.1f}{entry['error_rate'] * 100:>8.2f}"
+            f"{entry['p50_ms']:>10.1f}{entry['p90_ms']:>10.1f}{entry['p99_ms']:>10.1f}{entry['max_ms']:>10.1f}"
+        )
+    
+    if not baseline:
+        return
+    print(f"\nvs baseline from {baseline['meta']['timestamp']}:")
+    print(f"{'endpoint':<12}{'p50':>16}{'p99':>16}{'rps':>14}{'err %':>14}")
+    for endpoint, entry in report["endpoints"].items():
+        old = baseline["endpoints"].get(endpoint)
+        if not old:
+            continue
+        
+        def delta(key: str, scale: float = 1.0) -> str:
+            before, after = old[key] * scale, entry[key] * scale
+            change = f"{(after - before) / before * 100:+.0f}%" if before else "n/a"
+            return f"{after:.1f} ({change})"
+        
+        print(f"{endpoint:<12}{delta('p50_ms'):>16}{delta('p99_ms'):>16}"
+              f"{delta('throughput_rps'):>14}{delta('error_rate', 100):>14}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("db", help="database generated by synthetic_data.py (its manifest is read too)")
+    parser.add_argument("--rps", type=float, default=50.0, help="target request rate across all endpoints")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of measured load")
+    parser.add_argument("--warmup", type=float, default=3.0, help="seconds of unmeasured load first")
+    parser.add_argument("--mix", default=",".join(ENDPOINTS), help="endpoint weights, e.g. activities=3,profile=1")
+    parser.add_argument("--max-in-flight", type=int, default=500)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--url", help="drive a running server instead of the in-process app")
+    parser.add_argument("--seed", type=int, default=11)
+    parser.add_argument("--output", help="write the report as JSON")
+    parser.add_argument("--compare", help="earlier JSON report to diff against")
+    args = parser.parse_args()
+    
+    manifest = load_manifest(args.db)
+    endpoints = asyncio.run(run(args, manifest))
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "target_rps": args.rps,
+            "duration": args.duration,
+            "mix": parse_mix(args.mix),
+            "mode": args.url or "in-process",
+            "activities": manifest["activities"],
+            "users": manifest["users"],
+            "profiles": manifest["profiles"]
+        },
+        "endpoints": endpoints
+    }
+    
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print(f"{manifest['activities']} activities, {args.rps:g} rps for {args.duration:g}s ({report['meta']['mode']})\n")
+    print_report(report, baseline)
+    
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""Fill a SQLite database with synthetic users, activities and profiles.
+
+Activity per user follows a Zipf power law (user1 is the heaviest, most
+users have a handful of rows), spread over several platforms with
+platform-shaped extracted_data payloads, compressed content and the
+full-text index. The heaviest users also get a stored profile. A
+manifest (<db>.manifest.json) records the parameters so load tests and
+benchmarks can pick hot, median and tail users.
+
+Usage: python benchmarks/synthetic_data.py DB_PATH [--activities 1000000] [--users N]
+       [--profiles N] [--zipf 1.1] [--content-words 60] [--no-search-index] [--seed 7]
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import sqlite3
+import sys
+import time
+import zlib
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import orjson
+from src.config import config
+
+VOCABULARY = [f"word{i}" for i in range(5000)]
+TECH = [
+    "python", "rust", "golang", "kubernetes", "react", "pytorch", "sqlite", "tokio",
+    "fastapi", "vue", "typescript", "postgres", "redis", "llm", "crawler", "docker"
+]
+# Share of activities per platform
+PLATFORM_WEIGHTS = {
+    "github": 0.35,
+    "zhihu": 0.25,
+    "xiaohongshu": 0.15,
+    "search_google": 0.15,
+    "search_bing": 0.10
+}
+HISTORY_DAYS = 730
+BATCH_SIZE = 10000
+
+def user_id(rank: int) -> str:
+    return f"user{rank}"
+
+def zipf_cum_weights(users: int, exponent: float) -> list:
+    return list(itertools.accumulate(1.0 / rank ** exponent for rank in range(1, users + 1)))
+
+def extracted_payload(rng: random.Random, platform: str, username: str) -> dict:
+    skills = rng.sample(TECH, rng.randint(1, 4))
+    if platform == "github":
+        return {
+            "username": username,
+            "followers": int(rng.paretovariate(1.2)) - 1,
+            "repositories": rng.randint(0, 200),
+            "skills/interests": skills,
+            "activity_type": rng.choice(["profile", "repository", "commit"]),
+            "fetch_tier": "http"
+        }
+    if platform == "zhihu":
+        return {
+            "username": username,
+            "answers": rng.randint(0, 500),
+            "articles": rng.randint(0, 80),
+            "followers": int(rng.paretovariate(1.1)) - 1,
+            "topics/tags": skills,
+            "activity_type": rng.choice(["answer", "article", "profile"]),
+            "fetch_tier": "browser"
+        }
+    if platform == "xiaohongshu":
+        return {
+            "username": username,
+            "notes": rng.randint(0, 300),
+            "likes": int(rng.paretovariate(1.0)) - 1,
+            "tags": skills,
+            "activity_type": "note",
+            "fetch_tier": "browser"
+        }
+    return {
+        "search_engine": platform.split("_", 1)[1],
+        "query": f'"{username}"',
+        "rank": rng.randint(1, 10),
+        "snippet_topics": skills,
+        "activity_type": "search_result",
+        "fetch_tier": "http"
+    }
+
+def profile_payload(rng: random.Random, username: str, activity_count: int, now: datetime) -> dict:
+    platforms = rng.sample(list(PLATFORM_WEIGHTS), rng.randint(1, len(PLATFORM_WEIGHTS)))
+    return {
+        "user_id": username,
+        "generated_at": now.isoformat(),
+        "activity_summary": {
+            "total_activities": activity_count,
+            "platform_breakdown": {platform: rng.randint(1, max(activity_count, 1)) for platform in platforms},
+            "date_range": {
+                "earliest": (now - timedelta(days=HISTORY_DAYS)).isoformat(),
+                "latest": now.isoformat(),
+                "span_days": HISTORY_DAYS
+            },
+            "activity_frequency": {"daily_average": round(activity_count / HISTORY_DAYS, 3)}
+        },
+        "ai_analysis": {
+            "interests": rng.sample(TECH, 4),
+            "technical_skills": rng.sample(TECH, 5),
+            "activity_pattern": "Posts in bursts around project releases",
+            "social_presence": "Active on " + ", ".join(platforms)
+        },
+        "timeline_highlights": [
+            {"platform": rng.choice(platforms), "title": f"{rng.choice(TECH)} {rng.choice(VOCABULARY)}"}
+            for _ in range(10)
+        ],
+        "digital_footprint": {
+            "platforms_active": platforms,
+            "content_types": {"profile": rng.randint(1, 20), "post": rng.randint(0, 200)},
+            "engagement_patterns": {"peak_hours": sorted(rng.sample(range(24), 3))}
+        }
+    }
+
+async def create_schema(path: str):
+    config.DATABASE_URL = f"sqlite+aiosqlite:///{path}"
+    from src.storage.database import DatabaseManager
+    db = DatabaseManager()
+    await db.init_db()
+    await db.close()
+
+def generate(
+    path: str,
+    activities: int = 1_000_000,
+    users: int = None,
+    profiles: int = None,
+    zipf: float = 1.1,
+    content_words: int = 60,
+    search_index: bool = True,
+    seed: int = 7
+) -> dict:
+    """Populate path (created if missing) and write its manifest; returns the manifest"""
+    from src.storage.search import fts_row
+    
+    users = users or max(activities // 20, 1)
+    profiles = users // 5 if profiles is None else min(profiles, users)
+    asyncio.run(create_schema(path))
+    
+    conn = sqlite3.connect(path)
+    if conn.execute("SELECT COUNT(*) FROM user_activities").fetchone()[0]:
+        conn.close()
+        raise SystemExit(f"{path} already has activities; generate into a fresh file")
+    conn.execute("PRAGMA synchronous = OFF")
+    
+    rng = random.Random(seed)
+    cum_weights = zipf_cum_weights(users, zipf)
+    ranks = range(1, users + 1)
+    platforms = list(PLATFORM_WEIGHTS)
+    platform_weights = list(PLATFORM_WEIGHTS.values())
+    now = datetime.now().replace(microsecond=0)
+    counts = [0] * (users + 1)
+    started = time.perf_counter()
+    
+    for batch_start in range(1, activities + 1, BATCH_SIZE):
+        batch_ids = range(batch_start, min(batch_start + BATCH_SIZE, activities + 1))
+        owners = rng.choices(ranks, cum_weights=cum_weights, k=len(batch_ids))
+        rows, contents, fts = [], [], []
+        for activity_id, rank in zip(batch_ids, owners):
+            counts[rank] += 1
+            username = user_id(rank)
+            platform = rng.choices(platforms, platform_weights)[0]
+            extracted = extracted_payload(rng, platform, username)
+            title = f"{rng.choice(TECH)} {rng.choice(VOCABULARY)} {rng.choice(VOCABULARY)}"
+            content = " ".join(rng.choices(VOCABULARY, k=max(1, int(rng.expovariate(1 / content_words)))))
+            timestamp = now - timedelta(seconds=rng.randrange(HISTORY_DAYS * 86400))
+            rows.append((
+                activity_id, username, platform, f"https://example.com/{platform}/{username}/{activity_id}",
+                title, orjson.dumps(extracted).decode(), str(timestamp), str(timestamp)
+            ))
+            contents.append((activity_id, zlib.compress(content.encode("utf-8"))))
+            if search_index:
+                row = fts_row(activity_id, title, content, extracted)
+                fts.append((row["id"], row["title"], row["content"], row["topics"]))
+        
+        conn.executemany(
+            "INSERT INTO user_activities (id, user_id, platform, url, title, extracted_data, timestamp, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            rows
+        )
+        conn.executemany("INSERT INTO user_activity_contents (activity_id, body) VALUES (?, ?)", contents)
+        if fts:
+            conn.executemany(
+                "INSERT INTO user_activities_fts (rowid, title, content, topics) VALUES (?, ?, ?, ?)", fts
+            )
+        conn.commit()
+    
+    conn.executemany(
+        "INSERT INTO user_profiles (user_id, profile_data, last_updated, created_at) VALUES (?, ?, ?, ?)",
+        (
+            (user_id(rank), orjson.dumps(profile_payload(rng, user_id(rank), counts[rank], now)).decode(),
+             str(now), str(now))
+            for rank in range(1, profiles + 1)
+        )
+    )
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+    
+    by_count = sorted(range(1, users + 1), key=lambda rank: -counts[rank])
+    active = [rank for rank in by_count if counts[rank]]
+    manifest = {
+        "path": os.path.abspath(path),
+        "activities": activities,
+        "users": users,
+        "active_users": len(active),
+        "profiles": profiles,
+        "zipf": zipf,
+        "seed": seed,
+        "search_index": search_index,
+        "generated_seconds": round(time.perf_counter() - started, 1),
+        "size_mb": round(os.path.getsize(path) / 1024 / 1024, 1),
+        # Representative users for targeted queries: [user_id, activity count]
+        "sample_users": {
+            "hot": [[user_id(rank), counts[rank]] for rank in active[:5]],
+            "median": [[user_id(rank), counts[rank]] for rank in active[len(active) // 2:len(active) // 2 + 5]],
+            "tail": [[user_id(rank), counts[rank]] for rank in active[-5:]]
+        }
+    }
+    with open(path + ".manifest.json", "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+def load_manifest(path: str) -> dict:
+    with open(path + ".manifest.json") as f:
+        return json.load(f)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path")
+    parser.add_argument("--activities", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=None, help="default: activities / 20")
+    parser.add_argument("--profiles", type=int, default=None, help="default: users / 5, heaviest first")
+    parser.add_argument("--zipf", type=float, default=1.1, help="power-law exponent of activities per user")
+    parser.add_argument("--content-words", type=int, default=60, help="mean words of stored content")
+    parser.add_argument("--no-search-index", action="store_true")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    
+    manifest = generate(
+        args.path, args.activities, args.users, args.profiles, args.zipf,
+        args.content_words, not args.no_search_index, args.seed
+    )
+    print(f"Generated {manifest['activities']} activities for {manifest['active_users']} active users "
+          f"({manifest['profiles']} profiles) in {manifest['generated_seconds']}s, {manifest['size_mb']} MB")
+    for tier, sample in manifest["sample_users"].items():
+        print(f"  {tier:<7}" + ", ".join(f"{user} ({count})" for user, count in sample))
+
+if __name__ == "__main__":
+    main()
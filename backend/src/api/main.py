@@ -1,20 +1,33 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Query, Header
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, ORJSONResponse, FileResponse, PlainTextResponse
 from contextlib import asynccontextmanager
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import uvicorn
 import asyncio
 import json
 import signal
 import sys
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
 
+from src.api.compression import CompressionMiddleware
+from src.api.profiling import ProfilingMiddleware
 from src.models import CrawlRequest, ActivityResponse, ProfileResponse
 from src.storage.database import db_manager
+from src.collectors.fetcher import page_fetcher
+from src.collectors.resilience import host_resilience
 from src.profiler.user_profiler import user_profiler
+from src.extractors.content_reducer import content_reducer
+from src.extractors.field_rules import llm_gate
+from src.extractors.routing import model_router
+from src.extractors.usage import llm_usage
 from src.config import config
+from src.utils.singleflight import single_flight
+from src.utils.offload import cpu_offloader
+from src.utils.loop_monitor import loop_monitor
+from src.utils.profiling import profile_manager
+from src.utils.tracing import tracer, waterfall
 from src.utils.logger import setup_logging, get_logger, LogContext
 
 # Setup logging
@@ -34,6 +47,8 @@ async def lifespan(app: FastAPI):
     # Setup graceful shutdown
     setup_signal_handlers()
     
+    loop_monitor.start()
+    
     yield
     # Shutdown
     logger.info("🛑 Shutting down User Profiler API server")
@@ -54,13 +69,23 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(CompressionMiddleware, minimum_size=config.RESPONSE_COMPRESSION_MIN_BYTES)
+app.add_middleware(ProfilingMiddleware, manager=profile_manager)
+
+def serialize_activity(activity) -> Dict[str, Any]:
+    """Build the ActivityResponse payload straight from an ORM row without re-validation"""
+    return {field: getattr(activity, field) for field in ActivityResponse.model_fields}
 
 @app.get("/")
 async def root():
     return {"message": "User Profiler API", "version": "1.0.0"}
 
+def require_admin(admin_token: Optional[str]):
+    if not profile_manager.authorized(admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
 @app.post("/crawl")
-async def crawl_user(request: CrawlRequest, background_tasks: BackgroundTasks):
+async def crawl_user(request: CrawlRequest, admin_token: Optional[str] = Header(None, alias="X-Admin-Token")):
     """Start crawling user data across platforms"""
     
     with LogContext(user_id=request.user_id, operation="crawl_request") as log_ctx:
@@ -69,43 +94,84 @@ async def crawl_user(request: CrawlRequest, background_tasks: BackgroundTasks):
             log_ctx.error("Invalid user_id provided", user_id=request.user_id)
             raise HTTPException(status_code=400, detail="Invalid user_id")
         
+        profile_mode = None
+        if request.profile:
+            require_admin(admin_token)
+            profile_mode = profile_manager.requested_mode(request.profile)
+            if profile_mode is None:
+                raise HTTPException(status_code=400, detail="profile must be 'sample' or 'cprofile'")
+        
         log_ctx.info(
             f"Starting crawl request for user: {request.user_id}",
             platforms=request.platforms,
             search_engines=request.search_engines
         )
         
-        # Add crawling task to background
-        background_tasks.add_task(
-            user_profiler.crawl_user_data,
-            request.user_id,
-            request.platforms,
-            request.search_engines,
-            True  # use_llm
-        )
+        if request.fresh_within_minutes:
+            last_activity = await db_manager.get_last_activity_time(request.user_id)
+            if last_activity and datetime.now() - last_activity <= timedelta(minutes=request.fresh_within_minutes):
+                log_ctx.info(f"Skipping crawl, data is fresh for user: {request.user_id}")
+                return {
+                    "message": f"Recent data already available for user: {request.user_id}",
+                    "user_id": request.user_id,
+                    "status": "fresh",
+                    "last_activity": last_activity.isoformat()
+                }
+        
+        crawl = user_profiler.crawl_user_data
+        crawl_args = (request.user_id, request.platforms, request.search_engines, True)  # use_llm
+        profile_id = None
+        if profile_mode:
+            profile_id = profile_manager.new_id()
+            crawl_args = (profile_mode, f"crawl_user_data {request.user_id}", profile_id, crawl, *crawl_args)
+            crawl = profile_manager.run_profiled
+        
+        # A duplicate request attaches to the crawl already running for this user.
+        # The crawl task inherits this span, so the whole crawl shares its trace.
+        with tracer.span("crawl_request", user_id=request.user_id) as request_span:
+            _, joined = single_flight.start(("crawl", request.user_id), crawl, *crawl_args)
+            request_span.set(joined=joined)
+        
+        if joined:
+            log_ctx.info(f"Crawl already in progress for user: {request.user_id}")
+            return {
+                "message": f"Crawl already in progress for user: {request.user_id}",
+                "user_id": request.user_id,
+                "status": "in_progress"
+            }
         
         log_ctx.info(f"Background crawl task scheduled for user: {request.user_id}")
         
-        return {
+        response = {
             "message": f"Started crawling data for user: {request.user_id}",
             "user_id": request.user_id,
             "platforms": request.platforms,
-            "search_engines": request.search_engines
+            "search_engines": request.search_engines,
+            "status": "started",
+            "trace_id": request_span.trace_id
         }
+        if profile_id:
+            # Downloadable from /profiles/{profile_id} once the crawl finishes
+            response["profile_id"] = profile_id
+        return response
 
-@app.get("/users/{user_id}/activities", response_model=List[ActivityResponse])
+@app.get(
+    "/users/{user_id}/activities",
+    response_model=List[ActivityResponse],
+    response_class=ORJSONResponse
+)
 async def get_user_activities(user_id: str, platform: str = None, limit: int = 100):
     """Get user activities with optional platform filter"""
     
-    activities = await db_manager.get_user_activities(user_id, platform, limit)
-    return activities
+    activities = await db_manager.get_user_activities(user_id, platform, limit, with_content=True)
+    return ORJSONResponse([serialize_activity(activity) for activity in activities])
 
-@app.get("/users/{user_id}/timeline")
+@app.get("/users/{user_id}/timeline", response_class=ORJSONResponse)
 async def get_user_timeline(user_id: str):
     """Get user timeline organized by dates"""
     
     timeline = await db_manager.get_timeline_data(user_id)
-    return {"user_id": user_id, "timeline": timeline}
+    return ORJSONResponse({"user_id": user_id, "timeline": timeline})
 
 @app.get("/users/{user_id}/profile", response_model=ProfileResponse) 
 async def get_user_profile(user_id: str):
@@ -118,9 +184,20 @@ async def get_user_profile(user_id: str):
     return profile
 
 @app.post("/users/{user_id}/profile/generate")
-async def generate_user_profile(user_id: str, background_tasks: BackgroundTasks):
+async def generate_user_profile(user_id: str, fresh_within_minutes: int = Query(None, ge=1)):
     """Generate new user profile from collected activities"""
     
+    if fresh_within_minutes:
+        profile = await db_manager.get_user_profile(user_id)
+        if profile and datetime.now() - profile.last_updated <= timedelta(minutes=fresh_within_minutes):
+            return {
+                "message": f"Recent profile already available for user: {user_id}",
+                "user_id": user_id,
+                "status": "fresh",
+                "profile": profile.profile_data,
+                "last_updated": profile.last_updated.isoformat()
+            }
+    
     # Check if activities exist
     activities = await db_manager.get_user_activities(user_id, limit=1)
     if not activities:
@@ -129,12 +206,19 @@ async def generate_user_profile(user_id: str, background_tasks: BackgroundTasks)
             detail="No activities found. Please crawl user data first."
         )
     
-    # Generate profile in background
-    background_tasks.add_task(user_profiler.generate_user_profile, user_id)
+    # Generate profile in background; a duplicate request attaches to the running one
+    _, joined = single_flight.start(("profile", user_id), user_profiler.generate_user_profile, user_id)
+    if joined:
+        return {
+            "message": f"Profile generation already in progress for user: {user_id}",
+            "user_id": user_id,
+            "status": "in_progress"
+        }
     
     return {
         "message": f"Started generating profile for user: {user_id}",
-        "user_id": user_id
+        "user_id": user_id,
+        "status": "started"
     }
 
 @app.get("/users/{user_id}/stats")
@@ -151,10 +235,150 @@ async def get_user_stats(user_id: str):
         "last_activity": activities[0].timestamp.isoformat() if activities else None
     }
 
-@app.get("/health")
+@app.get("/search", response_class=ORJSONResponse)
+async def search_activities(
+    q: str,
+    user_id: str = None,
+    platform: str = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0)
+):
+    """Full-text search over collected activities, ranked by relevance"""
+    
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="Query must not be empty")
+    if not db_manager.search_enabled:
+        raise HTTPException(status_code=501, detail="Full-text search requires SQLite FTS5")
+    
+    total, results = await db_manager.search_activities(q, user_id, platform, limit, offset)
+    return ORJSONResponse({
+        "query": q,
+        "total": total,
+        "limit": limit,
+        "offset": offset,
+        "results": results
+    })
+
+@app.get("/extraction/stats")
+async def get_extraction_stats():
+    """Get LLM input reduction, batching, confidence-gating and per-route model statistics"""
+    return {
+        "content_reduction": content_reducer.get_stats(),
+        "batching": user_profiler.get_batch_stats(),
+        "llm_gate": llm_gate.get_stats(),
+        "routing": model_router.get_stats()
+    }
+
+@app.get("/llm/usage", response_class=ORJSONResponse)
+async def get_llm_usage(
+    days: int = Query(1, ge=1, le=90),
+    group_by: str = Query("platform", pattern="^(platform|user|crawl|model|route|operation|day)$"),
+    user_id: Optional[str] = None
+):
+    """LLM token spend, cost, prompt-cache hits and latency over the last days, grouped by one dimension"""
+    # Include calls made since the last flush
+    await llm_usage.flush(db_manager)
+    since = datetime.combine(datetime.now().date() - timedelta(days=days - 1), datetime.min.time())
+    return {
+        "since": since.isoformat(),
+        "group_by": group_by,
+        "groups": await db_manager.get_llm_usage_summary(since, group_by, user_id),
+        "budgets": llm_usage.get_stats()
+    }
+
+@app.get("/resilience")
+async def get_resilience_state():
+    """Get circuit breaker state and adaptive concurrency per crawled host"""
+    return {"hosts": host_resilience.get_stats()}
+
+@app.get("/traces")
+async def list_traces(limit: int = Query(20, ge=1, le=200)):
+    """Most recent traces still held in memory"""
+    return {"traces": tracer.recent(limit)}
+
+@app.get("/traces/{trace_id}", response_class=ORJSONResponse)
+async def get_trace(trace_id: str):
+    """Waterfall of one trace: spans in start order with offsets, durations and nesting depth"""
+    # Falls back to scanning the JSONL export for traces evicted from memory
+    spans = await asyncio.to_thread(tracer.get_trace, trace_id)
+    if not spans:
+        raise HTTPException(status_code=404, detail="Trace not found")
+    return waterfall(spans)
+
+@app.get("/profiles")
+async def list_profiles(admin_token: Optional[str] = Header(None, alias="X-Admin-Token")):
+    """List stored request and crawl profiles, newest first"""
+    require_admin(admin_token)
+    return {"profiles": profile_manager.list(), "stats": profile_manager.get_stats()}
+
+@app.get("/profiles/{profile_id}")
+async def download_profile(
+    profile_id: str,
+    format: str = Query("raw", pattern="^(raw|text)$"),
+    admin_token: Optional[str] = Header(None, alias="X-Admin-Token")
+):
+    """Download a profile: pstats for cProfile, folded stacks (flamegraph.pl/speedscope input) for sampling"""
+    require_admin(admin_token)
+    artifact = profile_manager.get(profile_id)
+    if not artifact:
+        raise HTTPException(status_code=404, detail="Profile not found (still running or expired)")
+    
+    if format == "text":
+        return PlainTextResponse(await asyncio.to_thread(profile_manager.render_text, artifact))
+    media_type = "text/plain" if artifact["mode"] == "sample" else "application/octet-stream"
+    return FileResponse(profile_manager.path(artifact), media_type=media_type, filename=artifact["file"])
+
+async def collect_health() -> Dict[str, Any]:
+    db_ping_ms = None
+    db_error = None
+    try:
+        db_ping_ms = round(await db_manager.ping() * 1000, 2)
+    except Exception as e:
+        db_error = str(e)
+    
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "loop": loop_monitor.get_stats(),
+        "database": {"ping_ms": db_ping_ms, "error": db_error, "write_queue": db_manager.writer.pending},
+        "crawls": {"in_flight": single_flight.count("crawl"), "profiles_in_flight": single_flight.count("profile")},
+        "fetcher": {
+            **page_fetcher.get_stats(),
+            "host_queue": host_resilience.queued(),
+            "open_circuits": host_resilience.open_hosts()
+        },
+        "offload": cpu_offloader.get_stats(),
+        "profiling": profile_manager.get_stats()
+    }
+
+def saturation_reasons(health: Dict[str, Any]) -> List[str]:
+    reasons = []
+    lag_p99 = health["loop"]["p99_ms"]
+    if lag_p99 is not None and lag_p99 > config.READY_MAX_LOOP_LAG_MS:
+        reasons.append(f"loop lag p99 {lag_p99:.0f} ms > {config.READY_MAX_LOOP_LAG_MS:.0f} ms")
+    database = health["database"]
+    if database["error"]:
+        reasons.append(f"database unavailable: {database['error']}")
+    elif database["ping_ms"] > config.READY_MAX_DB_PING_MS:
+        reasons.append(f"database ping {database['ping_ms']:.0f} ms > {config.READY_MAX_DB_PING_MS:.0f} ms")
+    if database["write_queue"] > config.READY_MAX_WRITE_QUEUE:
+        reasons.append(f"write queue {database['write_queue']} > {config.READY_MAX_WRITE_QUEUE}")
+    if health["crawls"]["in_flight"] >= config.READY_MAX_INFLIGHT_CRAWLS:
+        reasons.append(f"{health['crawls']['in_flight']} crawls in flight (limit {config.READY_MAX_INFLIGHT_CRAWLS})")
+    return reasons
+
+@app.get("/health", response_class=ORJSONResponse)
 async def health_check():
-    """Health check endpoint"""
-    return {"status": "healthy", "timestamp": "2024-01-01T00:00:00Z"}
+    """Liveness: the process is up; reports loop, database and crawl load"""
+    return {"status": "healthy", **(await collect_health())}
+
+@app.get("/ready", response_class=ORJSONResponse)
+async def readiness_check():
+    """Readiness: 503 while saturated so a load balancer can shed traffic"""
+    health = await collect_health()
+    reasons = saturation_reasons(health)
+    if reasons:
+        return ORJSONResponse({"status": "saturated", "reasons": reasons, **health}, status_code=503)
+    return {"status": "ready", **health}
 
 @app.get("/logs/stream")
 async def stream_logs():
@@ -212,24 +436,28 @@ async def get_recent_logs(lines: int = 100):
     if not log_file_path.exists():
         return {"logs": [], "message": "Log file not found"}
     
-    try:
+    def read_lines() -> List[str]:
         with open(log_file_path, 'r', encoding='utf-8') as f:
-            all_lines = f.readlines()
-            recent_lines = all_lines[-lines:] if len(all_lines) > lines else all_lines
-            
-            logs = []
-            for line in recent_lines:
-                if line.strip():
-                    logs.append({
-                        "message": line.strip(),
-                        "timestamp": datetime.now().isoformat()
-                    })
-            
-            return {
-                "logs": logs,
-                "total_lines": len(all_lines),
-                "returned_lines": len(logs)
-            }
+            return f.readlines()
+    
+    try:
+        # Log files grow without bound; don't read them on the event loop
+        all_lines = await asyncio.to_thread(read_lines)
+        recent_lines = all_lines[-lines:] if len(all_lines) > lines else all_lines
+        
+        logs = []
+        for line in recent_lines:
+            if line.strip():
+                logs.append({
+                    "message": line.strip(),
+                    "timestamp": datetime.now().isoformat()
+                })
+        
+        return {
+            "logs": logs,
+            "total_lines": len(all_lines),
+            "returned_lines": len(logs)
+        }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error reading logs: {str(e)}")
 
@@ -253,23 +481,42 @@ async def graceful_shutdown():
     """Perform graceful shutdown operations"""
     logger.info("🧹 Starting graceful shutdown sequence...")
     
-    # Close database connections
-    try:
-        await db_manager.close()
-        logger.info("✅ Database connections closed")
-    except Exception as e:
-        logger.error(f"❌ Error closing database: {e}")
+    await loop_monitor.stop()
     
-    # Wait for any background tasks to complete (with timeout)
+    # Let in-flight crawls finish first: they still submit rows to the
+    # activity writer and use the fetcher and process pool
     try:
-        # Gather all running tasks except the current one
-        pending_tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        # Gather all running tasks except the current one and the writer loop, which runs until closed
+        pending_tasks = [
+            t for t in asyncio.all_tasks()
+            if t is not asyncio.current_task() and t is not db_manager.writer.task
+        ]
         if pending_tasks:
             await asyncio.wait_for(asyncio.gather(*pending_tasks), timeout=5.0)
         logger.info("✅ Background tasks completed")
     except asyncio.TimeoutError:
         logger.warning("⚠️ Some background tasks may not have completed")
     
+    # Close database connections; this drains rows still queued in the writer
+    try:
+        await db_manager.close()
+        logger.info("✅ Database connections closed")
+    except Exception as e:
+        logger.error(f"❌ Error closing database: {e}")
+    
+    # Close pooled HTTP connections and the shared browser
+    try:
+        await page_fetcher.close()
+        logger.info("✅ Page fetcher closed")
+    except Exception as e:
+        logger.error(f"❌ Error closing page fetcher: {e}")
+    
+    cpu_offloader.close()
+    model_router.close()
+    
+    # Flush spans last, including the ones from closing the database and fetcher
+    await asyncio.to_thread(tracer.close)
+    
     logger.info("✅ Graceful shutdown completed")
 
 if __name__ == "__main__":
@@ -0,0 +1,52 @@
+from urllib.parse import parse_qs
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from src.utils.profiling import ProfileBusyError, ProfileManager
+
+class ProfilingMiddleware:
+    """Profile a request on demand (admin token + X-Profile or ?profile=) or at the sampling rate.
+    
+    The artifact id is returned in the X-Profile-Id response header.
+    Requests to the profile download endpoints are never profiled.
+    """
+    
+    def __init__(self, app: ASGIApp, manager: ProfileManager, exclude_prefix: str = "/profiles"):
+        self.app = app
+        self.manager = manager
+        self.exclude_prefix = exclude_prefix
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(self.exclude_prefix):
+            await self.app(scope, receive, send)
+            return
+        
+        headers = Headers(scope=scope)
+        requested = headers.get("X-Profile")
+        if requested is None:
+            requested = parse_qs(scope.get("query_string", b"").decode("latin-1")).get("profile", [None])[0]
+        
+        mode, trigger = None, None
+        if requested is not None and self.manager.authorized(headers.get("X-Admin-Token")):
+            mode, trigger = self.manager.requested_mode(requested), "manual"
+        elif self.manager.should_sample():
+            mode, trigger = "sample", "sampled"
+        
+        if mode is None:
+            await self.app(scope, receive, send)
+            return
+        
+        try:
+            session = self.manager.start(mode, f"{scope['method']} {scope['path']}", trigger)
+        except ProfileBusyError:
+            await self.app(scope, receive, send)
+            return
+        
+        async def send_with_profile_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("X-Profile-Id", session.id)
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            await self.manager.finish(session)
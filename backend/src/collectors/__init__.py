@@ -1,5 +1,22 @@
 from .github_collector import GitHubCollector
 from .zhihu_collector import ZhihuCollector
+from .xiaohongshu_collector import XiaohongshuCollector
 from .search_collector import SearchEngineCollector
+from .page_collector import PageCollector
+from .frontier import CrawlFrontier, canonicalize_url
+from .registry import create_collector
+from .fetcher import TieredFetcher, FetchResult, page_fetcher
 
-__all__ = ["GitHubCollector", "ZhihuCollector", "SearchEngineCollector"]
\ No newline at end of file
+__all__ = [
+    "GitHubCollector",
+    "ZhihuCollector",
+    "XiaohongshuCollector",
+    "SearchEngineCollector",
+    "PageCollector",
+    "CrawlFrontier",
+    "canonicalize_url",
+    "create_collector",
+    "TieredFetcher",
+    "FetchResult",
+    "page_fetcher",
+]
\ No newline at end of file
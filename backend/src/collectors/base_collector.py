@@ -1,23 +1,35 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator, Set
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 import asyncio
 import time
-from crawl4ai import AsyncWebCrawler
 from src.config import config
+from src.utils.offload import cpu_offloader
+from src.utils.tracing import tracer
+from src.extractors.field_rules import score_fields
+from .fetcher import page_fetcher, is_host_failure, TIER_HTTP
+from .resilience import host_resilience, CircuitOpenError
 
 class BaseCollector(ABC):
     def __init__(self, platform: str):
         self.platform = platform
         self.config = config.PLATFORMS.get(platform, {})
         self.rate_limit = self.config.get("rate_limit", 1.0)
+        self.fetch_tier = self.config.get("fetch_tier", "auto")
+        self.url_timeout = self.config.get("url_timeout", config.URL_TIMEOUT_SECONDS)
+        self.fetcher = page_fetcher
+        self.resilience = host_resilience
         self.last_request_time = 0
+        self._rate_limit_lock = asyncio.Lock()
     
     async def _rate_limit_wait(self):
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        if time_since_last < self.rate_limit:
-            await asyncio.sleep(self.rate_limit - time_since_last)
-        self.last_request_time = time.time()
+        # Serialized so concurrent fetches still start at most once per rate_limit
+        async with self._rate_limit_lock:
+            current_time = time.time()
+            time_since_last = current_time - self.last_request_time
+            if time_since_last < self.rate_limit:
+                await asyncio.sleep(self.rate_limit - time_since_last)
+            self.last_request_time = time.time()
     
     @abstractmethod
     def build_search_urls(self, user_id: str) -> List[str]:
@@ -30,29 +42,141 @@ class BaseCollector(ABC):
     async def collect_user_data(self, user_id: str) -> List[Dict[str, Any]]:
         if user_id.lower() in config.EXCLUDED_IDS:
             return []
-            
+        
         urls = self.build_search_urls(user_id)
+        return await self.collect_urls(urls)
+    
+    async def collect_urls(self, urls: List[str]) -> List[Dict[str, Any]]:
         results = []
+        for url in urls:
+            item = await self.collect_url(url)
+            if item:
+                results.append(item)
+        return results
+    
+    def paginated_urls(self, user_id: str) -> List[str]:
+        """First pages of listings that continue on ?page=2, 3, ...; none by default"""
+        return []
+    
+    def page_url(self, url: str, page: int) -> str:
+        parts = urlsplit(url)
+        query = [(key, value) for key, value in parse_qsl(parts.query) if key != "page"]
+        query.append(("page", str(page)))
+        return urlunsplit(parts._replace(query=urlencode(query)))
+    
+    async def collect_more_pages(
+        self,
+        user_id: str,
+        first_pages: List[Dict[str, Any]],
+        known_entries: Set[str],
+        max_pages: int = None,
+        time_budget: float = None
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Follow paginated listings past the first page, yielding each window of pages as it lands.
+        
+        A listing stops at the first page that fails, has no entries, or only
+        has entries that are already stored (known_entries) or were seen
+        earlier in this crawl. Pages after the stopping page in the same
+        window are dropped. The time budget is checked between windows.
+        """
+        max_pages = max_pages or config.PAGINATION_MAX_PAGES
+        deadline = time.monotonic() + (time_budget or config.PAGINATION_TIME_BUDGET_SECONDS)
+        first_by_url = {item["url"]: item for item in first_pages}
+        seen: Set[str] = set()
         
-        async with AsyncWebCrawler(verbose=True) as crawler:
-            for url in urls:
-                try:
-                    await self._rate_limit_wait()
-                    result = await crawler.arun(url=url)
-                    
-                    if result.success:
-                        extracted_info = self.extract_user_info(result.markdown, url)
-                        if extracted_info:
-                            results.append({
-                                "platform": self.platform,
-                                "url": url,
-                                "title": extracted_info.get("title", ""),
-                                "content": result.markdown[:2000],  # Limit content size
-                                "extracted_data": extracted_info,
-                                "timestamp": extracted_info.get("timestamp")
-                            })
-                except Exception as e:
-                    print(f"Error crawling {url}: {str(e)}")
-                    continue
+        for listing_url in self.paginated_urls(user_id):
+            first = first_by_url.get(listing_url)
+            if first is None or not self._has_new_entries(first, known_entries, seen):
+                continue
+            
+            page = 2
+            while page <= max_pages and time.monotonic() < deadline:
+                window = range(page, min(page + config.PAGINATION_CONCURRENCY, max_pages + 1))
+                items = await asyncio.gather(*(self.collect_url(self.page_url(listing_url, n)) for n in window))
+                
+                fresh = []
+                for number, item in zip(window, items):
+                    if item is None or not self._has_new_entries(item, known_entries, seen):
+                        break
+                    item["extracted_data"]["page"] = number
+                    fresh.append(item)
+                if fresh:
+                    yield fresh
+                if len(fresh) < len(window):
+                    break
+                page += len(window)
+    
+    def _has_new_entries(self, item: Dict[str, Any], known_entries: Set[str], seen: Set[str]) -> bool:
+        entries = item["extracted_data"].get("entries") or []
+        new = [entry for entry in entries if entry not in known_entries and entry not in seen]
+        seen.update(entries)
+        return bool(new)
+    
+    async def collect_url(self, url: str) -> Optional[Dict[str, Any]]:
+        # Fails fast while the host's breaker is open; the timeout bounds the whole fetch
+        guard = self.resilience.for_url(url)
+        with tracer.span("fetch", url=url, platform=self.platform) as span:
+            try:
+                # Politeness delay outside the guard: it isn't the host's latency
+                await self._rate_limit_wait()
+                result, item = await guard.call(
+                    lambda: self._fetch_item(url),
+                    self.url_timeout,
+                    is_failure=lambda outcome: is_host_failure(outcome[0])
+                )
+                span.set(tier=result.tier, status_code=result.status_code, parsed=item is not None)
+                return item
+            except CircuitOpenError as e:
+                span.set(outcome="circuit_open")
+                print(f"Skipping {url}: {str(e)}")
+            except asyncio.TimeoutError:
+                span.set(outcome="timeout")
+                print(f"Timed out crawling {url} after {self.url_timeout}s")
+            except Exception as e:
+                span.set(outcome="error", error=str(e))
+                print(f"Error crawling {url}: {str(e)}")
+        return None
+    
+    async def _fetch_item(self, url: str):
+        result = await self.fetcher.fetch(url, self.fetch_tier)
+        item = await self.parse(url, result.markdown, result.tier, result.html) if result.success else None
         
-        return results
\ No newline at end of file
+        # Server-rendered HTML that the parser can't use gets one browser retry
+        if item is None and result.success and self.fetch_tier == "auto" and result.tier == TIER_HTTP:
+            self.fetcher.stats["escalations"] += 1
+            result = await self.fetcher.fetch_browser(url)
+            if result.success:
+                item = await self.parse(url, result.markdown, result.tier, result.html)
+        return result, item
+    
+    async def parse(self, url: str, markdown: str, fetch_tier: str, html: str = "") -> Optional[Dict[str, Any]]:
+        """build_item, in the CPU pool when the page is large enough to be worth the IPC"""
+        offload = cpu_offloader.worth_offloading(max(len(markdown), len(html)))
+        with tracer.span("parse", chars=len(markdown), offloaded=offload):
+            if not offload:
+                return self.build_item(url, markdown, fetch_tier, html)
+            
+            # Imported here: registry imports every collector module, including this one
+            from .registry import parse_page
+            item = await cpu_offloader.run(parse_page, self.platform, url, markdown, fetch_tier, html)
+        if item:
+            item["raw_content"] = markdown
+        return item
+    
+    def build_item(self, url: str, markdown: str, fetch_tier: str, html: str = "") -> Optional[Dict[str, Any]]:
+        extracted_info = self.extract_user_info(markdown, url)
+        if not extracted_info:
+            return None
+        # Schema fields from the HTML, and a confidence for every field, so the LLM only sees pages that need it
+        score_fields(extracted_info, html)
+        extracted_info["fetch_tier"] = fetch_tier
+        return {
+            "platform": self.platform,
+            "url": url,
+            "title": extracted_info.get("title", ""),
+            "content": markdown[:2000],  # Limit content size
+            "raw_content": markdown,  # Full page for archiving; not stored in the DB
+            "extracted_data": extracted_info,
+            "fetch_tier": fetch_tier,
+            "timestamp": extracted_info.get("timestamp")
+        }
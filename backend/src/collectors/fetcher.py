@@ -0,0 +1,277 @@
+import asyncio
+import importlib.util
+import re
+import secrets
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, Optional
+from urllib.parse import urljoin
+
+import httpx
+from bs4 import BeautifulSoup, NavigableString, Tag
+
+from src.config import config
+from src.utils.offload import cpu_offloader
+
+if TYPE_CHECKING:
+    from crawl4ai import AsyncWebCrawler
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+TIER_HTTP = "http"
+TIER_BROWSER = "browser"
+
+# Status codes where a real browser has a better chance than a bare client
+BROWSER_STATUS_CODES = {403, 429, 503}
+
+JS_REQUIRED_MARKERS = re.compile(
+    r"enable javascript|javascript is (?:required|disabled)|"
+    r"<div id=\"(?:root|app|__next)\">\s*</div>|unusual traffic|captcha",
+    re.IGNORECASE
+)
+
+# Scroll the feed to the bottom so infinite-scroll pages load their next batch
+SCROLL_JS = "window.scrollTo(0, document.body.scrollHeight);"
+
+SKIPPED_TAGS = {"script", "style", "noscript", "svg", "template", "iframe", "head"}
+BLOCK_TAGS = {
+    "p", "div", "section", "article", "header", "footer", "nav", "main", "aside",
+    "ul", "ol", "li", "table", "tr", "blockquote", "pre", "br", "hr", "form", "dd", "dt"
+}
+
+@dataclass
+class FetchResult:
+    url: str
+    success: bool
+    markdown: str = ""
+    html: str = ""
+    status_code: Optional[int] = None
+    tier: str = TIER_HTTP
+    error: Optional[str] = None
+
+def html_to_markdown(html: str, base_url: str = "") -> str:
+    """Lightweight HTML to markdown: headings, links, emphasis and text blocks"""
+    soup = BeautifulSoup(html, "html.parser")
+    root = soup.body or soup
+    blocks = []
+    inline = []
+    
+    def flush():
+        text = re.sub(r"[ \t\r\f\v]+", " ", "".join(inline)).strip()
+        if text:
+            blocks.append(text)
+        inline.clear()
+    
+    def walk(node):
+        for child in node.children:
+            if isinstance(child, NavigableString):
+                if child.__class__ is NavigableString:
+                    inline.append(str(child).replace("\n", " "))
+                continue
+            if not isinstance(child, Tag) or child.name in SKIPPED_TAGS:
+                continue
+            
+            name = child.name
+            if re.fullmatch(r"h[1-6]", name):
+                flush()
+                text = child.get_text(" ", strip=True)
+                if text:
+                    blocks.append(f"{'#' * int(name[1])} {text}")
+            elif name == "a":
+                text = child.get_text(" ", strip=True)
+                href = child.get("href")
+                if text and href and not href.startswith(("#", "javascript:")):
+                    inline.append(f"[{text}]({urljoin(base_url, href)})")
+                elif text:
+                    inline.append(text)
+            elif name in ("strong", "b"):
+                text = child.get_text(" ", strip=True)
+                if text:
+                    inline.append(f"**{text}**")
+            elif name in BLOCK_TAGS:
+                flush()
+                if name == "li":
+                    inline.append("- ")
+                walk(child)
+                flush()
+            else:
+                walk(child)
+    
+    walk(root)
+    flush()
+    return "\n\n".join(blocks)
+
+def is_host_failure(result: FetchResult) -> bool:
+    """Transport errors, blocks and server errors count against the host; a 404 does not"""
+    if result.success:
+        return False
+    status = result.status_code
+    return status is None or status in BROWSER_STATUS_CODES or status >= 500
+
+def needs_browser(html: str, markdown: str, status_code: Optional[int]) -> bool:
+    """Heuristic: does this server-side response look like it needs JS rendering?"""
+    if status_code in BROWSER_STATUS_CODES:
+        return True
+    visible_text = re.sub(r"\[([^\]]*)\]\([^\)]*\)", r"\1", markdown)
+    if len(visible_text.strip()) < config.FETCH_MIN_TEXT_CHARS:
+        return True
+    return bool(JS_REQUIRED_MARKERS.search(html[:20000])) and len(visible_text) < 2000
+
+class TieredFetcher:
+    """Fetch pages with a pooled HTTP client and escalate to the browser on demand.
+    
+    The keep-alive client (HTTP/2 when h2 is installed) serves everything it
+    can. The crawl4ai browser is started on the first escalation and reused
+    until close().
+    """
+    
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+        self._crawler: Optional["AsyncWebCrawler"] = None
+        self._crawler_lock: Optional[asyncio.Lock] = None
+        self.stats: Dict[str, int] = {TIER_HTTP: 0, TIER_BROWSER: 0, "escalations": 0}
+    
+    def _http_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE,
+                follow_redirects=True,
+                timeout=config.FETCH_HTTP_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=config.FETCH_MAX_CONNECTIONS,
+                    max_keepalive_connections=config.FETCH_MAX_CONNECTIONS
+                ),
+                headers={
+                    "User-Agent": config.FETCH_USER_AGENT,
+                    "Accept": "text/html,application/xhtml+xml;q=0.9,*/*;q=0.8",
+                    "Accept-Language": "en-US,en;q=0.9,zh-CN;q=0.8",
+                }
+            )
+        return self._client
+    
+    async def _browser(self) -> "AsyncWebCrawler":
+        if self._crawler_lock is None:
+            self._crawler_lock = asyncio.Lock()
+        async with self._crawler_lock:
+            if self._crawler is None:
+                # crawl4ai pulls in Playwright and friends; only pay for it on first escalation
+                from crawl4ai import AsyncWebCrawler
+                crawler = AsyncWebCrawler(verbose=True)
+                await crawler.__aenter__()
+                self._crawler = crawler
+        return self._crawler
+    
+    async def fetch(self, url: str, tier: str = "auto") -> FetchResult:
+        """Fetch url; tier is "http", "browser" or "auto" (HTTP first, browser if needed)"""
+        if tier == TIER_BROWSER:
+            return await self.fetch_browser(url)
+        
+        result = await self.fetch_http(url)
+        if tier == TIER_HTTP:
+            return result
+        # A 404, 410 or transport error won't render any better in the browser;
+        # only bot blocks and JS shells are worth the expensive tier
+        if not result.success and result.status_code not in BROWSER_STATUS_CODES:
+            return result
+        if needs_browser(result.html, result.markdown, result.status_code):
+            self.stats["escalations"] += 1
+            return await self.fetch_browser(url)
+        return result
+    
+    async def fetch_http(self, url: str) -> FetchResult:
+        try:
+            response = await self._http_client().get(url)
+        except httpx.HTTPError as e:
+            return FetchResult(url, False, tier=TIER_HTTP, error=str(e))
+        
+        self.stats[TIER_HTTP] += 1
+        html = response.text
+        if "html" not in response.headers.get("content-type", "html"):
+            return FetchResult(url, response.is_success, html, html, response.status_code, TIER_HTTP)
+        if cpu_offloader.worth_offloading(len(html)):
+            markdown = await cpu_offloader.run(html_to_markdown, html, str(response.url))
+        else:
+            markdown = html_to_markdown(html, str(response.url))
+        return FetchResult(
+            url,
+            response.is_success,
+            markdown=markdown,
+            html=html,
+            status_code=response.status_code,
+            tier=TIER_HTTP
+        )
+    
+    async def fetch_browser(self, url: str) -> FetchResult:
+        crawler = await self._browser()
+        result = await crawler.arun(url=url)
+        self.stats[TIER_BROWSER] += 1
+        return self._browser_result(url, result)
+    
+    def scroll_session(self, url: str, scroll_delay: float) -> "ScrollSession":
+        return ScrollSession(self, url, scroll_delay)
+    
+    def _browser_result(self, url: str, result) -> FetchResult:
+        return FetchResult(
+            url,
+            bool(result.success),
+            markdown=str(result.markdown or ""),
+            html=result.html or "",
+            status_code=getattr(result, "status_code", None),
+            tier=TIER_BROWSER,
+            error=getattr(result, "error_message", None)
+        )
+    
+    def get_stats(self) -> Dict[str, object]:
+        return {
+            "http_client_open": self._client is not None and not self._client.is_closed,
+            "http2": HTTP2_AVAILABLE,
+            "browser_started": self._crawler is not None,
+            "requests": dict(self.stats)
+        }
+    
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self._crawler is not None:
+            await self._crawler.__aexit__(None, None, None)
+            self._crawler = None
+
+class ScrollSession:
+    """A browser page kept open across scroll steps.
+    
+    Each step() scrolls to the bottom, waits scroll_delay for the feed to
+    render more and returns the whole page so far; callers diff it against
+    what they already have. The first step also loads the page, so opening
+    the session costs no extra render. Steps are separate calls so each can
+    run under the host guard and its timeout.
+    """
+    
+    def __init__(self, fetcher: TieredFetcher, url: str, scroll_delay: float):
+        self.fetcher = fetcher
+        self.url = url
+        self.scroll_delay = scroll_delay
+        self.session_id = f"scroll-{secrets.token_hex(6)}"
+        self.steps = 0
+    
+    async def step(self) -> FetchResult:
+        from crawl4ai import CacheMode, CrawlerRunConfig
+        crawler = await self.fetcher._browser()
+        run_config = CrawlerRunConfig(
+            session_id=self.session_id,
+            js_code=SCROLL_JS,
+            # Later steps run the scroll in the already open page instead of navigating again
+            js_only=self.steps > 0,
+            delay_before_return_html=self.scroll_delay,
+            cache_mode=CacheMode.BYPASS
+        )
+        self.steps += 1
+        result = self.fetcher._browser_result(self.url, await crawler.arun(url=self.url, config=run_config))
+        self.fetcher.stats[TIER_BROWSER] += 1
+        return result
+    
+    async def close(self):
+        if self.steps and self.fetcher._crawler is not None:
+            await self.fetcher._crawler.crawler_strategy.kill_session(self.session_id)
+
+# Global fetcher shared by all collectors
+page_fetcher = TieredFetcher()
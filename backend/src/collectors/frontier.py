@@ -0,0 +1,163 @@
+import asyncio
+import heapq
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from src.config import config
+from .base_collector import BaseCollector
+
+TRACKING_PARAMS = {"ref", "ref_src", "source", "from", "spm", "fbclid", "gclid", "share_source"}
+TRAILING_PUNCTUATION = ")]}>,.;:'\""
+
+# First path segments on GitHub that are site pages rather than user profiles
+GITHUB_RESERVED = {"search", "topics", "orgs", "features", "about", "login", "marketplace", "explore"}
+
+def canonicalize_url(url: str) -> Optional[str]:
+    """Normalize a discovered URL so trivially different spellings dedupe to one entry"""
+    url = url.strip().rstrip(TRAILING_PUNCTUATION)
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return None
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        return None
+    
+    host = parts.hostname.lower()
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    
+    # Unwrap search engine redirect links
+    if host.endswith("google.com") and parts.path == "/url":
+        target = dict(query).get("q") or dict(query).get("url")
+        return canonicalize_url(target) if target else None
+    
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    
+    path = parts.path.rstrip("/") or "/"
+    query = sorted(
+        (key, value) for key, value in query
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    )
+    return urlunsplit(("https", host, path, urlencode(query), ""))
+
+@dataclass(order=True)
+class FrontierEntry:
+    sort_key: float
+    url: str = field(compare=False)
+    host: str = field(compare=False)
+    platform: str = field(compare=False)
+    score: float = field(compare=False)
+    depth: int = field(compare=False, default=0)
+    source: Optional[str] = field(compare=False, default=None)
+
+class CrawlFrontier:
+    """Priority queue of discovered URLs for one user, crawled under a page budget.
+    
+    URLs are canonicalized and deduped against everything already seen, scored
+    by how likely they are to describe the user, and dispatched to the platform
+    collector owning the host or to the generic page collector.
+    """
+    
+    def __init__(
+        self,
+        user_id: str,
+        collectors: Dict[str, BaseCollector],
+        page_collector: BaseCollector,
+        page_budget: int = None,
+        host_concurrency: int = None,
+        max_depth: int = None
+    ):
+        self.user_id = user_id
+        self.user_key = user_id.lower()
+        self.collectors = collectors
+        self.page_collector = page_collector
+        self.page_budget = page_budget if page_budget is not None else config.FRONTIER_PAGE_BUDGET
+        self.host_concurrency = host_concurrency or config.FRONTIER_HOST_CONCURRENCY
+        self.max_depth = max_depth if max_depth is not None else config.FRONTIER_MAX_DEPTH
+        self.host_platforms = {
+            canonicalize_url(settings["base_url"]).split("/")[2]: platform
+            for platform, settings in config.PLATFORMS.items()
+            if "base_url" in settings and platform in collectors
+        }
+        self.seen: Set[str] = set()
+        self.queue: List[FrontierEntry] = []
+        self.host_limits: Dict[str, asyncio.Semaphore] = {}
+        self.pages_fetched = 0
+    
+    def mark_seen(self, urls: List[str]):
+        for url in urls:
+            canonical = canonicalize_url(url)
+            if canonical:
+                self.seen.add(canonical)
+    
+    def add(self, url: str, rank: int = 0, depth: int = 0, source: Optional[str] = None) -> bool:
+        canonical = canonicalize_url(url)
+        if not canonical or canonical in self.seen:
+            return False
+        self.seen.add(canonical)
+        
+        host = canonical.split("/")[2]
+        platform = self.host_platforms.get(host, self.page_collector.platform)
+        score = self.score(canonical, host, platform, rank, depth)
+        if score < config.FRONTIER_MIN_SCORE:
+            return False
+        
+        heapq.heappush(self.queue, FrontierEntry(-score, canonical, host, platform, score, depth, source))
+        return True
+    
+    def add_search_results(self, items: List[Dict[str, Any]]):
+        for item in items:
+            links = (item.get("extracted_data") or {}).get("relevant_links", [])
+            for rank, link in enumerate(links):
+                self.add(link.get("url", ""), rank=rank, source=item.get("url"))
+    
+    def score(self, url: str, host: str, platform: str, rank: int, depth: int) -> float:
+        path = urlsplit(url).path.lower()
+        segments = [segment for segment in path.split("/") if segment]
+        
+        if platform == "github":
+            if not segments or segments[0] in GITHUB_RESERVED:
+                return 0.0
+            score = 1.0 if segments[0] == self.user_key else 0.4
+        elif platform != self.page_collector.platform:
+            score = 0.9 if self.user_key in segments else 0.5
+        else:
+            score = 0.3
+            if self.user_key in host or self.user_key in path:
+                score += 0.3
+            if any(keyword in url for keyword in ("blog", "portfolio", "about")):
+                score += 0.1
+        
+        return score - 0.02 * rank - 0.2 * depth
+    
+    def _collector_for(self, entry: FrontierEntry) -> BaseCollector:
+        return self.collectors.get(entry.platform, self.page_collector)
+    
+    async def _fetch(self, entry: FrontierEntry) -> Optional[Dict[str, Any]]:
+        limit = self.host_limits.setdefault(entry.host, asyncio.Semaphore(self.host_concurrency))
+        async with limit:
+            item = await self._collector_for(entry).collect_url(entry.url)
+        if item:
+            item["extracted_data"]["discovered_from"] = entry.source
+            item["extracted_data"]["frontier_score"] = round(entry.score, 3)
+            if entry.depth < self.max_depth:
+                for link in item["extracted_data"].get("links", []):
+                    self.add(link["url"], depth=entry.depth + 1, source=entry.url)
+        return item
+    
+    async def run(self) -> List[Dict[str, Any]]:
+        """Crawl the highest-priority URLs until the queue drains or the budget is spent"""
+        results = []
+        while self.queue and self.pages_fetched < self.page_budget:
+            # Dispatch the best remaining entries as one wave; pages found in
+            # this wave can add deeper links for the next one
+            wave = []
+            while self.queue and self.pages_fetched + len(wave) < self.page_budget:
+                wave.append(heapq.heappop(self.queue))
+            self.pages_fetched += len(wave)
+            
+            items = await asyncio.gather(*(self._fetch(entry) for entry in wave))
+            results.extend(item for item in items if item)
+        return results
@@ -1,6 +1,7 @@
 import re
 from datetime import datetime
 from typing import List, Dict, Any
+from urllib.parse import urlsplit
 from .base_collector import BaseCollector
 
 class GitHubCollector(BaseCollector):
@@ -16,6 +17,9 @@ class GitHubCollector(BaseCollector):
             f"{base_url}/{user_id}?tab=following"
         ]
     
+    def paginated_urls(self, user_id: str) -> List[str]:
+        return [f"{self.config['base_url']}/{user_id}?tab=repositories"]
+    
     def extract_user_info(self, markdown_content: str, url: str) -> Dict[str, Any]:
         info = {
             "type": "github_profile",
@@ -41,7 +45,7 @@ class GitHubCollector(BaseCollector):
         followers_match = re.search(r'(\d+)\s*followers', markdown_content, re.IGNORECASE)
         if followers_match:
             info["followers"] = int(followers_match.group(1))
-            
+        
         following_match = re.search(r'(\d+)\s*following', markdown_content, re.IGNORECASE)
         if following_match:
             info["following"] = int(following_match.group(1))
@@ -54,4 +58,13 @@ class GitHubCollector(BaseCollector):
                 for match in activity_matches[:5]
             ]
         
+        # Repository names on a repositories tab page, used to detect the end of the listing
+        if "tab=repositories" in url:
+            owner = urlsplit(url).path.strip("/").split("/")[0]
+            repos = re.findall(
+                rf'\]\(https?://github\.com/{re.escape(owner)}/([A-Za-z0-9_.-]+)\)', markdown_content, re.IGNORECASE
+            )
+            if repos:
+                info["entries"] = list(dict.fromkeys(repos))
+        
         return info if len(info) > 2 else None  # Return None if no meaningful data extracted
\ No newline at end of file
@@ -0,0 +1,38 @@
+import re
+from datetime import datetime
+from typing import List, Dict, Any
+from .base_collector import BaseCollector
+
+class PageCollector(BaseCollector):
+    """Generic collector for blogs, portfolios and other discovered pages"""
+    
+    def __init__(self):
+        super().__init__("web")
+    
+    def build_search_urls(self, user_id: str) -> List[str]:
+        # Generic pages have no fixed URL scheme; they are only fed by the frontier
+        return []
+    
+    def extract_user_info(self, markdown_content: str, url: str) -> Dict[str, Any]:
+        info = {
+            "type": "web_page",
+            "timestamp": datetime.now().isoformat(),
+            "page_url": url
+        }
+        
+        title_match = re.search(r'^#{1,2} ([^\n]+)', markdown_content, re.MULTILINE)
+        if title_match:
+            info["title"] = title_match.group(1).strip()
+        
+        # First prose paragraph as description
+        for block in re.split(r'\n\s*\n', markdown_content):
+            text = block.strip()
+            if len(text) >= 40 and not text.startswith(('#', '[', '!', '|', '-', '*')):
+                info["description"] = text[:300]
+                break
+        
+        links = re.findall(r'\[([^\]]+)\]\((https?://[^\s\)]+)\)', markdown_content)
+        if links:
+            info["links"] = [{"title": title, "url": link} for title, link in links[:50]]
+        
+        return info if "title" in info or "description" in info else None
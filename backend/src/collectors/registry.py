@@ -0,0 +1,40 @@
+from typing import Any, Dict, Optional
+from .base_collector import BaseCollector
+from .github_collector import GitHubCollector
+from .zhihu_collector import ZhihuCollector
+from .xiaohongshu_collector import XiaohongshuCollector
+from .search_collector import SearchEngineCollector
+from .page_collector import PageCollector
+
+PLATFORM_COLLECTORS = {
+    "github": GitHubCollector,
+    "zhihu": ZhihuCollector,
+    "xiaohongshu": XiaohongshuCollector,
+    "web": PageCollector,
+}
+
+def create_collector(platform: str) -> Optional[BaseCollector]:
+    """Build the collector that produces items for a stored platform name"""
+    if platform.startswith("search_"):
+        return SearchEngineCollector(platform[len("search_"):])
+    collector_class = PLATFORM_COLLECTORS.get(platform)
+    return collector_class() if collector_class else None
+
+
+# Per-process collectors for parse_page; worker processes build their own
+_parsers: Dict[str, Optional[BaseCollector]] = {}
+
+def parse_page(platform: str, url: str, markdown: str, fetch_tier: str, html: str = "") -> Optional[Dict[str, Any]]:
+    """Offload entry point: run a platform's parser over a fetched page.
+    
+    The full markdown is left out of the result; the caller already has it.
+    """
+    if platform not in _parsers:
+        _parsers[platform] = create_collector(platform)
+    collector = _parsers[platform]
+    if collector is None:
+        return None
+    item = collector.build_item(url, markdown, fetch_tier, html)
+    if item:
+        item.pop("raw_content", None)
+    return item
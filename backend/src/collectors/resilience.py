@@ -0,0 +1,217 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+from urllib.parse import urlsplit
+import httpx
+from src.config import config
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Exceptions that say something about the host; anything else (a parser bug, say) is ours
+TRANSPORT_ERRORS = (OSError, httpx.TransportError)
+
+class CircuitOpenError(Exception):
+    """Raised instead of fetching when a host's breaker is open"""
+
+class CircuitBreaker:
+    """Open after consecutive failures, then let one trial call through after a cool-down"""
+    
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+    
+    def allow(self) -> bool:
+        if self.state == OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN:
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+        return True
+    
+    def record_success(self):
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self._trial_in_flight = False
+    
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+        self._trial_in_flight = False
+    
+    def cancel_trial(self):
+        """The half-open trial never ran; let the next caller try instead"""
+        self._trial_in_flight = False
+    
+    def retry_in(self) -> float:
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit: +1/limit per fast success, multiplicative cut on errors or slow calls"""
+    
+    def __init__(self, initial: int, max_limit: int, slow_call_seconds: float, backoff: float = 0.5):
+        self.limit = float(initial)
+        self.max_limit = max_limit
+        self.slow_call_seconds = slow_call_seconds
+        self.backoff = backoff
+        self.in_flight = 0
+        # Futures rather than an asyncio.Condition, so the shared limiter
+        # isn't bound to whichever event loop used it first
+        self._waiters: Deque[asyncio.Future] = deque()
+    
+    async def acquire(self):
+        while self.in_flight >= int(self.limit):
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                # _wake handed this waiter a slot just before it was cancelled; pass the slot on
+                if waiter.done() and not waiter.cancelled():
+                    self._wake()
+                raise
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+        self.in_flight += 1
+    
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+    
+    def release(self, ok: Optional[bool], latency: float):
+        """Free a slot; ok=None (cancelled call) leaves the limit unchanged"""
+        self.in_flight -= 1
+        if ok is not None:
+            if ok and latency <= self.slow_call_seconds:
+                self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            else:
+                self.limit = max(1.0, self.limit * self.backoff)
+        self._wake()
+    
+    def _wake(self):
+        free = int(self.limit) - self.in_flight
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+class HostGuard:
+    """Breaker, adaptive limiter and counters for one host"""
+    
+    def __init__(self, host: str):
+        self.host = host
+        self.breaker = CircuitBreaker(config.BREAKER_FAILURE_THRESHOLD, config.BREAKER_RESET_SECONDS)
+        self.limiter = AdaptiveLimiter(
+            config.ADAPTIVE_INITIAL_CONCURRENCY,
+            config.ADAPTIVE_MAX_CONCURRENCY,
+            config.ADAPTIVE_SLOW_CALL_SECONDS
+        )
+        self.requests = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self.latency_ewma: Optional[float] = None
+    
+    async def call(
+        self,
+        func: Callable[[], Awaitable[Any]],
+        timeout: float,
+        is_failure: Optional[Callable[[Any], bool]] = None
+    ) -> Any:
+        if not self.breaker.allow():
+            self.rejected += 1
+            raise CircuitOpenError(f"Circuit open for {self.host}, retry in {self.breaker.retry_in():.0f}s")
+        
+        try:
+            await self.limiter.acquire()
+        except asyncio.CancelledError:
+            self.breaker.cancel_trial()
+            raise
+        
+        start = time.monotonic()
+        ok = False
+        try:
+            result = await asyncio.wait_for(func(), timeout)
+            ok = not (is_failure and is_failure(result))
+            return result
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise
+        except TRANSPORT_ERRORS:
+            raise
+        except (asyncio.CancelledError, Exception):
+            # The caller gave up, or our own code failed; neither says anything about the host
+            ok = None
+            self.breaker.cancel_trial()
+            raise
+        finally:
+            latency = time.monotonic() - start
+            self.limiter.release(ok, latency)
+            if ok is not None:
+                self.requests += 1
+                self.latency_ewma = latency if self.latency_ewma is None else 0.8 * self.latency_ewma + 0.2 * latency
+                if ok:
+                    self.breaker.record_success()
+                else:
+                    self.failures += 1
+                    self.breaker.record_failure()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.breaker.state,
+            "consecutive_failures": self.breaker.consecutive_failures,
+            "retry_in_seconds": round(self.breaker.retry_in(), 1),
+            "concurrency_limit": round(self.limiter.limit, 2),
+            "in_flight": self.limiter.in_flight,
+            "queued": self.limiter.queued,
+            "requests": self.requests,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "rejected": self.rejected,
+            "latency_ewma_ms": round(self.latency_ewma * 1000, 1) if self.latency_ewma is not None else None
+        }
+
+class HostResilience:
+    """Per-host guards, created on first use"""
+    
+    def __init__(self):
+        self.guards: Dict[str, HostGuard] = {}
+    
+    def for_url(self, url: str) -> HostGuard:
+        host = (urlsplit(url).hostname or "").lower()
+        if host.startswith("www."):
+            host = host[4:]
+        guard = self.guards.get(host)
+        if guard is None:
+            guard = self.guards[host] = HostGuard(host)
+        return guard
+    
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        return {host: guard.get_stats() for host, guard in sorted(self.guards.items())}
+    
+    def queued(self) -> int:
+        return sum(guard.limiter.queued for guard in self.guards.values())
+    
+    def open_hosts(self) -> list:
+        return [host for host, guard in self.guards.items() if guard.breaker.state != CLOSED]
+    
+    def reset(self):
+        self.guards.clear()
+
+# Global per-host guards shared by all collectors
+host_resilience = HostResilience()
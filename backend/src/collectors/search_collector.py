@@ -1,32 +1,75 @@
+import asyncio
+import copy
 import re
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from src.config import config
+from src.utils.cache import TTLCache
 from .base_collector import BaseCollector
 
+SEARCH_URL_TEMPLATES = {
+    "google": "https://www.google.com/search?q={}",
+    "bing": "https://www.bing.com/search?q={}",
+    "baidu": "https://www.baidu.com/s?wd={}",
+}
+
+# Parsed SERP items keyed by (engine, query), shared by all collectors
+serp_cache = TTLCache(config.SERP_CACHE_TTL, config.SERP_CACHE_MAX_ENTRIES)
+
 class SearchEngineCollector(BaseCollector):
     def __init__(self, search_engine: str):
         super().__init__(f"search_{search_engine}")
         self.search_engine = search_engine
+        self.concurrency = self.config.get("concurrency", 1)
     
-    def build_search_urls(self, user_id: str) -> List[str]:
-        search_queries = [
+    def build_search_queries(self, user_id: str) -> List[str]:
+        return [
             f'"{user_id}" site:github.com',
             f'"{user_id}" site:zhihu.com', 
             f'"{user_id}" site:xiaohongshu.com',
             f'"{user_id}" blog',
             f'"{user_id}" portfolio'
         ]
+    
+    def build_search_url(self, query: str) -> Optional[str]:
+        template = SEARCH_URL_TEMPLATES.get(self.search_engine)
+        return template.format(query.replace(' ', '+')) if template else None
+    
+    def build_search_urls(self, user_id: str) -> List[str]:
+        urls = [self.build_search_url(query) for query in self.build_search_queries(user_id)]
+        return [url for url in urls if url]
+    
+    async def collect_user_data(self, user_id: str) -> List[Dict[str, Any]]:
+        if user_id.lower() in config.EXCLUDED_IDS:
+            return []
+        
+        queries = [q for q in self.build_search_queries(user_id) if self.build_search_url(q)]
+        results: List[Optional[Dict[str, Any]]] = [None] * len(queries)
+        
+        misses = []
+        for index, query in enumerate(queries):
+            cached = serp_cache.get((self.search_engine, query))
+            if cached is not None:
+                item = copy.deepcopy(cached)
+                item["extracted_data"]["serp_cache_hit"] = True
+                results[index] = item
+            else:
+                misses.append(index)
         
-        urls = []
-        for query in search_queries:
-            if self.search_engine == "google":
-                urls.append(f"https://www.google.com/search?q={query.replace(' ', '+')}")
-            elif self.search_engine == "bing":
-                urls.append(f"https://www.bing.com/search?q={query.replace(' ', '+')}")
-            elif self.search_engine == "baidu":
-                urls.append(f"https://www.baidu.com/s?wd={query.replace(' ', '+')}")
+        if misses:
+            limit = asyncio.Semaphore(self.concurrency)
+            
+            async def fetch(index: int):
+                query = queries[index]
+                async with limit:
+                    item = await self.collect_url(self.build_search_url(query))
+                if item:
+                    serp_cache.set((self.search_engine, query), copy.deepcopy(item))
+                    results[index] = item
+            
+            await asyncio.gather(*(fetch(index) for index in misses))
         
-        return urls
+        return [item for item in results if item]
     
     def extract_user_info(self, markdown_content: str, url: str) -> Dict[str, Any]:
         info = {
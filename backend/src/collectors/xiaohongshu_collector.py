@@ -0,0 +1,185 @@
+import asyncio
+import re
+import time
+from datetime import datetime
+from typing import List, Dict, Any, Optional, AsyncIterator, Set
+from urllib.parse import urlsplit
+from src.config import config
+from src.extractors.field_rules import parse_count, score_fields
+from .base_collector import BaseCollector
+from .fetcher import is_host_failure
+from .resilience import CircuitOpenError
+
+# Note links on a profile feed or in search results; note ids are 24 hex characters
+NOTE_LINK = re.compile(
+    r'\[([^\]]*)\]\((https?://(?:www\.)?xiaohongshu\.com/'
+    r'(?:explore|discovery/item|user/profile/[0-9a-f]{24})/([0-9a-f]{24})[^)\s]*)\)'
+)
+COUNT = r'(\d+(?:\.\d+)?[万wW]?\+?)'
+
+def parse_notes(markdown_content: str) -> List[Dict[str, Any]]:
+    """Note cards in feed order: id, url, title and like count.
+    
+    A card renders as a title link to the note followed by the author link
+    and the like count, so the first count after a closing parenthesis
+    before the next note link is that note's likes.
+    """
+    notes: Dict[str, Dict[str, Any]] = {}
+    matches = list(NOTE_LINK.finditer(markdown_content))
+    for i, match in enumerate(matches):
+        title, url, note_id = match.group(1).strip(), match.group(2), match.group(3)
+        if note_id in notes:
+            continue
+        note = notes[note_id] = {"note_id": note_id, "url": url, "title": title}
+        
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(markdown_content)
+        likes_match = re.search(rf'\)\s*{COUNT}(?!\S)', markdown_content[match.end():end])
+        if likes_match:
+            note["likes"] = parse_count(likes_match.group(1))
+    return list(notes.values())
+
+class XiaohongshuCollector(BaseCollector):
+    """Profiles and notes from Xiaohongshu.
+    
+    The profile page only renders the first screen of notes; the rest of
+    the feed loads on scroll, so collect_more_pages drives a browser
+    session that scrolls the feed and yields each batch of new notes as
+    it appears.
+    """
+    
+    def __init__(self):
+        super().__init__("xiaohongshu")
+        self.max_notes = self.config.get("max_notes", 100)
+        self.max_scrolls = self.config.get("max_scrolls", 20)
+        self.scroll_delay = self.config.get("scroll_delay", 1.5)
+    
+    def build_search_urls(self, user_id: str) -> List[str]:
+        return [f"{self.config['base_url']}/user/profile/{user_id}"]
+    
+    def extract_user_info(self, markdown_content: str, url: str) -> Dict[str, Any]:
+        path = urlsplit(url).path
+        if re.match(r'/(explore|discovery/item)/', path):
+            return self._extract_note_page(markdown_content)
+        
+        info = {
+            "type": "xiaohongshu_profile",
+            "timestamp": datetime.now().isoformat()
+        }
+        
+        # Extract nickname
+        name_match = re.search(r'# ([^\n]+)', markdown_content)
+        if name_match:
+            info["nickname"] = name_match.group(1).strip()
+        
+        # Extract Xiaohongshu number and IP location
+        red_id_match = re.search(r'小红书号[：:]\s*(\S+)', markdown_content)
+        if red_id_match:
+            info["red_id"] = red_id_match.group(1)
+        location_match = re.search(r'IP属地[：:]\s*(\S+)', markdown_content)
+        if location_match:
+            info["ip_location"] = location_match.group(1)
+        
+        # Extract following/follower/like counts
+        for key, label in (("following", "关注"), ("followers", "粉丝"), ("likes_and_collects", "获赞与收藏")):
+            count_match = re.search(rf'{COUNT}\s*{label}', markdown_content)
+            if count_match:
+                info[key] = parse_count(count_match.group(1))
+        
+        # Notes on the first screen; their ids tell a repeat crawl whether the feed has anything new
+        notes = parse_notes(markdown_content)
+        if notes:
+            info["recent_notes"] = [note["title"] for note in notes[:5] if note["title"]]
+            info["entries"] = [note["note_id"] for note in notes]
+        
+        return info if len(info) > 2 else None
+    
+    def _extract_note_page(self, markdown_content: str) -> Optional[Dict[str, Any]]:
+        info = {
+            "type": "xiaohongshu_note",
+            "timestamp": datetime.now().isoformat()
+        }
+        title_match = re.search(r'# ([^\n]+)', markdown_content)
+        if title_match:
+            info["title"] = title_match.group(1).strip()
+        tags = re.findall(r'#([^\s#\[]+)\[话题\]', markdown_content)
+        if tags:
+            info["tags"] = list(dict.fromkeys(tags))
+        return info if len(info) > 2 else None
+    
+    def build_note_item(self, note: Dict[str, Any], fetch_tier: str) -> Dict[str, Any]:
+        extracted_info = {
+            "type": "xiaohongshu_note",
+            "note_id": note["note_id"],
+            "title": note["title"],
+            "entries": [note["note_id"]],
+            "fetch_tier": fetch_tier,
+            "timestamp": datetime.now().isoformat()
+        }
+        if "likes" in note:
+            extracted_info["likes"] = note["likes"]
+        score_fields(extracted_info)
+        return {
+            "platform": self.platform,
+            "url": note["url"],
+            "title": note["title"],
+            "content": note["title"],
+            "extracted_data": extracted_info,
+            "fetch_tier": fetch_tier,
+            "timestamp": extracted_info["timestamp"]
+        }
+    
+    async def collect_more_pages(
+        self,
+        user_id: str,
+        first_pages: List[Dict[str, Any]],
+        known_entries: Set[str],
+        max_pages: int = None,
+        time_budget: float = None
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Scroll the notes feed, yielding the notes each scroll adds as soon as they render.
+        
+        Skipped when the first screen had no notes or only notes stored by an
+        earlier crawl. Every scroll goes through the host guard with the URL
+        timeout. Stops at max_notes new notes, max_scrolls (or max_pages)
+        scrolls, the pagination time budget, a failed or timed out scroll, or
+        a scroll that adds nothing but known notes.
+        """
+        profile_url = self.build_search_urls(user_id)[0]
+        first = next((item for item in first_pages if item["url"] == profile_url), None)
+        if first is None or not set(first["extracted_data"].get("entries", ())) - known_entries:
+            return
+        
+        max_scrolls = max_pages or self.max_scrolls
+        deadline = time.monotonic() + (time_budget or config.PAGINATION_TIME_BUDGET_SECONDS)
+        seen: Set[str] = set()
+        remaining = self.max_notes
+        
+        guard = self.resilience.for_url(profile_url)
+        session = self.fetcher.scroll_session(profile_url, self.scroll_delay)
+        try:
+            for _ in range(max_scrolls):
+                await self._rate_limit_wait()
+                try:
+                    result = await guard.call(session.step, self.url_timeout, is_failure=is_host_failure)
+                except CircuitOpenError as e:
+                    print(f"Stopped scrolling {profile_url}: {str(e)}")
+                    break
+                except asyncio.TimeoutError:
+                    print(f"Timed out scrolling {profile_url} after {self.url_timeout}s")
+                    break
+                if not result.success:
+                    print(f"Error scrolling {profile_url}: {result.error}")
+                    break
+                
+                notes = [note for note in parse_notes(result.markdown) if note["note_id"] not in seen]
+                seen.update(note["note_id"] for note in notes)
+                fresh = [note for note in notes if note["note_id"] not in known_entries][:remaining]
+                if not fresh:
+                    break
+                remaining -= len(fresh)
+                yield [self.build_note_item(note, result.tier) for note in fresh]
+                
+                if remaining <= 0 or time.monotonic() >= deadline:
+                    break
+        finally:
+            await session.close()
@@ -1,6 +1,7 @@
 import re
 from datetime import datetime
 from typing import List, Dict, Any
+from urllib.parse import urlsplit
 from .base_collector import BaseCollector
 
 class ZhihuCollector(BaseCollector):
@@ -15,6 +16,10 @@ class ZhihuCollector(BaseCollector):
             f"{base_url}/people/{user_id}/articles"
         ]
     
+    def paginated_urls(self, user_id: str) -> List[str]:
+        base_url = self.config["base_url"]
+        return [f"{base_url}/people/{user_id}/answers", f"{base_url}/people/{user_id}/articles"]
+    
     def extract_user_info(self, markdown_content: str, url: str) -> Dict[str, Any]:
         info = {
             "type": "zhihu_profile", 
@@ -46,7 +51,7 @@ class ZhihuCollector(BaseCollector):
             answers_match = re.search(r'(\d+)\s*answers', markdown_content, re.IGNORECASE)
         if answers_match:
             info["answers_count"] = int(answers_match.group(1))
-            
+        
         articles_match = re.search(r'(\d+)\s*篇文章', markdown_content)
         if not articles_match:
             articles_match = re.search(r'(\d+)\s*articles', markdown_content, re.IGNORECASE)
@@ -57,5 +62,8 @@ class ZhihuCollector(BaseCollector):
         title_matches = re.findall(r'## ([^\n]+)', markdown_content)
         if title_matches:
             info["recent_posts"] = title_matches[:5]
+            # Every title on an answers/articles page, used to detect the end of the listing
+            if re.search(r'/(answers|articles)/?$', urlsplit(url).path):
+                info["entries"] = list(dict.fromkeys(title.strip() for title in title_matches))
         
         return info if len(info) > 2 else None
\ No newline at end of file
@@ -6,30 +6,200 @@ load_dotenv()
 
 class Config:
     OPENAI_API_KEY: Optional[str] = os.getenv("OPENAI_API_KEY")
+    
+    # Page content is stripped of chrome and packed into this many tokens per LLM call
+    LLM_CONTENT_TOKEN_BUDGET: int = int(os.getenv("LLM_CONTENT_TOKEN_BUDGET", "1200"))
+    
+    # Batched extraction: several pages of one user share a single LLM request
+    LLM_BATCH_ENABLED: bool = os.getenv("LLM_BATCH_ENABLED", "true").lower() == "true"
+    LLM_BATCH_TOKEN_BUDGET: int = int(os.getenv("LLM_BATCH_TOKEN_BUDGET", "6000"))
+    LLM_BATCH_MAX_PAGES: int = int(os.getenv("LLM_BATCH_MAX_PAGES", "8"))
+    
+    # Rule/schema extraction runs first; a page goes to the LLM only when a
+    # required field is missing or below this confidence
+    LLM_GATE_ENABLED: bool = os.getenv("LLM_GATE_ENABLED", "true").lower() == "true"
+    LLM_CONFIDENCE_THRESHOLD: float = float(os.getenv("LLM_CONFIDENCE_THRESHOLD", "0.7"))
+    
+    # Token budgets (prompt + completion); once one is spent the remaining
+    # pages keep their rule-only extraction. 0 disables a budget.
+    LLM_CRAWL_TOKEN_BUDGET: int = int(os.getenv("LLM_CRAWL_TOKEN_BUDGET", "60000"))
+    LLM_DAILY_TOKEN_BUDGET: int = int(os.getenv("LLM_DAILY_TOKEN_BUDGET", "2000000"))
+    
+    # Any OpenAI-compatible endpoint (a local server, a proxy or a stub); unset uses OpenAI
+    LLM_BASE_URL: Optional[str] = os.getenv("LLM_BASE_URL") or None
+    
+    # Model routing: page extraction runs often on short inputs, the profile
+    # summary once per user, so each has its own model, completion limit,
+    # concurrency and timeout. Both default to the model used before routing;
+    # point extraction at a cheaper tier or the summary at a stronger one per
+    # deployment. max_tokens is per page for extraction (a batch gets one
+    # share per page, capped at 4000).
+    LLM_ROUTES = {
+        "extraction": {
+            "model": os.getenv("LLM_EXTRACTION_MODEL", "gpt-3.5-turbo"),
+            "max_tokens": int(os.getenv("LLM_EXTRACTION_MAX_TOKENS", "500")),
+            "temperature": 0.1,
+            "concurrency": int(os.getenv("LLM_EXTRACTION_CONCURRENCY", "4")),
+            "timeout": float(os.getenv("LLM_EXTRACTION_TIMEOUT", "30"))
+        },
+        "summary": {
+            "model": os.getenv("LLM_SUMMARY_MODEL", "gpt-3.5-turbo"),
+            "max_tokens": int(os.getenv("LLM_SUMMARY_MAX_TOKENS", "1000")),
+            "temperature": 0.2,
+            "concurrency": int(os.getenv("LLM_SUMMARY_CONCURRENCY", "2")),
+            "timeout": float(os.getenv("LLM_SUMMARY_TIMEOUT", "90"))
+        }
+    }
+    
+    # USD per million tokens: (input, cached input, output). Models missing
+    # here are still routed, just reported without a cost.
+    LLM_PRICING = {
+        "gpt-4o-mini": (0.15, 0.075, 0.60),
+        "gpt-4o": (2.50, 1.25, 10.00),
+        "gpt-4.1-mini": (0.40, 0.10, 1.60),
+        "gpt-4.1": (2.00, 0.50, 8.00),
+        "gpt-3.5-turbo": (0.50, 0.50, 1.50)
+    }
+    
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./user_profiler.db")
+    
+    # SQLite tuning: WAL journal, connection pragmas and a single-writer /
+    # pooled-reader engine split. Ignored for in-memory and non-SQLite URLs.
+    SQLITE_TUNED: bool = os.getenv("SQLITE_TUNED", "true").lower() == "true"
+    SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    SQLITE_MMAP_SIZE: int = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+    SQLITE_CACHE_SIZE_KB: int = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+    DB_READER_POOL_SIZE: int = int(os.getenv("DB_READER_POOL_SIZE", "4"))
+    
+    # Group commit: activity inserts from all crawls are batched into one
+    # transaction per DB_WRITE_BATCH_SIZE rows or DB_WRITE_BATCH_MS window.
+    # With 0 ms a batch is whatever queued up while the previous commit ran.
+    DB_WRITE_BATCH_SIZE: int = int(os.getenv("DB_WRITE_BATCH_SIZE", "200"))
+    DB_WRITE_BATCH_MS: float = float(os.getenv("DB_WRITE_BATCH_MS", "0"))
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
     LOG_FILE: str = os.getenv("LOG_FILE", "logs/user_profiler.log")
     LOG_JSON_FORMAT: bool = os.getenv("LOG_JSON_FORMAT", "false").lower() == "true"
     
-    # Platform configurations
+    # Responses larger than this are brotli/gzip compressed when the client accepts it
+    RESPONSE_COMPRESSION_MIN_BYTES: int = int(os.getenv("RESPONSE_COMPRESSION_MIN_BYTES", "1024"))
+    
+    # Raw page archive: full fetched markdown in compressed append-only segments
+    ARCHIVE_ENABLED: bool = os.getenv("ARCHIVE_ENABLED", "true").lower() == "true"
+    ARCHIVE_DIR: str = os.getenv("ARCHIVE_DIR", "archive")
+    ARCHIVE_SEGMENT_BYTES: int = int(os.getenv("ARCHIVE_SEGMENT_BYTES", str(64 * 1024 * 1024)))
+    ARCHIVE_COMPRESSION_LEVEL: int = int(os.getenv("ARCHIVE_COMPRESSION_LEVEL", "6"))
+    
+    # Tiered fetching: pooled HTTP client first, headless browser on demand
+    FETCH_HTTP_TIMEOUT: float = float(os.getenv("FETCH_HTTP_TIMEOUT", "15"))
+    FETCH_MAX_CONNECTIONS: int = int(os.getenv("FETCH_MAX_CONNECTIONS", "20"))
+    FETCH_MIN_TEXT_CHARS: int = int(os.getenv("FETCH_MIN_TEXT_CHARS", "200"))
+    FETCH_USER_AGENT: str = os.getenv(
+        "FETCH_USER_AGENT",
+        "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/124.0 Safari/537.36"
+    )
+    
+    # Event-loop lag sampling and readiness limits; /ready returns 503 past any of these
+    LOOP_LAG_INTERVAL_MS: float = float(os.getenv("LOOP_LAG_INTERVAL_MS", "100"))
+    LOOP_STALL_THRESHOLD_MS: float = float(os.getenv("LOOP_STALL_THRESHOLD_MS", "250"))
+    READY_MAX_LOOP_LAG_MS: float = float(os.getenv("READY_MAX_LOOP_LAG_MS", "500"))
+    READY_MAX_DB_PING_MS: float = float(os.getenv("READY_MAX_DB_PING_MS", "1000"))
+    READY_MAX_INFLIGHT_CRAWLS: int = int(os.getenv("READY_MAX_INFLIGHT_CRAWLS", "8"))
+    READY_MAX_WRITE_QUEUE: int = int(os.getenv("READY_MAX_WRITE_QUEUE", "5000"))
+    
+    # On-demand profiling: requests carrying X-Admin-Token and X-Profile (or
+    # ?profile=) are profiled; PROFILE_SAMPLE_RATE stack-samples a fraction
+    # of all requests. On-demand profiling is off while the token is unset.
+    PROFILE_ADMIN_TOKEN: str = os.getenv("PROFILE_ADMIN_TOKEN", "")
+    PROFILE_SAMPLE_RATE: float = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+    PROFILE_SAMPLE_INTERVAL_MS: float = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "10"))
+    PROFILE_DIR: str = os.getenv("PROFILE_DIR", "profiles")
+    PROFILE_MAX_ARTIFACTS: int = int(os.getenv("PROFILE_MAX_ARTIFACTS", "50"))
+    
+    # Tracing: spans for crawls, collectors, fetches, LLM calls and DB writes,
+    # appended to a JSONL file (OTLP field names) and kept in memory for /traces
+    TRACING_ENABLED: bool = os.getenv("TRACING_ENABLED", "true").lower() == "true"
+    TRACE_EXPORT_PATH: str = os.getenv("TRACE_EXPORT_PATH", "traces/spans.jsonl")
+    TRACE_FILE_MAX_BYTES: int = int(os.getenv("TRACE_FILE_MAX_BYTES", str(50 * 1024 * 1024)))
+    TRACE_MAX_TRACES: int = int(os.getenv("TRACE_MAX_TRACES", "200"))
+    TRACE_MAX_SPANS_PER_TRACE: int = int(os.getenv("TRACE_MAX_SPANS_PER_TRACE", "5000"))
+    
+    # Per-host resilience: circuit breaker, AIMD concurrency and per-URL timeouts
+    BREAKER_FAILURE_THRESHOLD: int = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "3"))
+    BREAKER_RESET_SECONDS: float = float(os.getenv("BREAKER_RESET_SECONDS", "60"))
+    ADAPTIVE_INITIAL_CONCURRENCY: int = int(os.getenv("ADAPTIVE_INITIAL_CONCURRENCY", "2"))
+    ADAPTIVE_MAX_CONCURRENCY: int = int(os.getenv("ADAPTIVE_MAX_CONCURRENCY", "8"))
+    ADAPTIVE_SLOW_CALL_SECONDS: float = float(os.getenv("ADAPTIVE_SLOW_CALL_SECONDS", "10"))
+    URL_TIMEOUT_SECONDS: float = float(os.getenv("URL_TIMEOUT_SECONDS", "30"))
+    
+    # CPU-bound parsing runs in a worker pool: "process", "thread" or "inline"
+    OFFLOAD_MODE: str = os.getenv("OFFLOAD_MODE", "process")
+    OFFLOAD_WORKERS: int = int(os.getenv("OFFLOAD_WORKERS", "0"))  # 0 = min(4, CPU count)
+    OFFLOAD_BATCH_SIZE: int = int(os.getenv("OFFLOAD_BATCH_SIZE", "32"))
+    OFFLOAD_MIN_BYTES: int = int(os.getenv("OFFLOAD_MIN_BYTES", "16384"))
+    
+    # Platform configurations. fetch_tier is "auto" (HTTP first, browser when
+    # the page looks JS-rendered or fails to parse), "http" or "browser".
     PLATFORMS = {
         "github": {
             "base_url": "https://github.com",
-            "rate_limit": 1.0  # seconds between requests
+            "rate_limit": 1.0,  # seconds between requests
+            "fetch_tier": "auto"
         },
         "zhihu": {
             "base_url": "https://www.zhihu.com",
-            "rate_limit": 2.0
+            "rate_limit": 2.0,
+            "fetch_tier": "browser",  # Client-rendered and blocks bare HTTP clients
+            "url_timeout": 45.0
         },
         "xiaohongshu": {
             "base_url": "https://www.xiaohongshu.com",
-            "rate_limit": 3.0
+            "rate_limit": 3.0,  # also applies between feed scrolls
+            "fetch_tier": "browser",
+            "url_timeout": 45.0,
+            # The notes feed loads on scroll: at most max_notes notes over
+            # max_scrolls scrolls, waiting scroll_delay seconds for each batch
+            "max_notes": int(os.getenv("XIAOHONGSHU_MAX_NOTES", "100")),
+            "max_scrolls": int(os.getenv("XIAOHONGSHU_MAX_SCROLLS", "20")),
+            "scroll_delay": float(os.getenv("XIAOHONGSHU_SCROLL_DELAY", "1.5"))
+        },
+        # Search engines: queries start at most every rate_limit seconds and
+        # up to concurrency of them may be in flight at once
+        "search_google": {
+            "rate_limit": 2.0,
+            "concurrency": 2
+        },
+        "search_bing": {
+            "rate_limit": 1.0,
+            "concurrency": 3
+        },
+        "search_baidu": {
+            "rate_limit": 2.0,
+            "concurrency": 2
         }
     }
     
     # Search engines
     SEARCH_ENGINES = ["google", "bing", "baidu"]
     
+    # Parsed SERP results are reused for identical (engine, query) pairs within this window
+    SERP_CACHE_TTL: float = float(os.getenv("SERP_CACHE_TTL", "3600"))
+    SERP_CACHE_MAX_ENTRIES: int = int(os.getenv("SERP_CACHE_MAX_ENTRIES", "2048"))
+    
+    # Crawl frontier for links discovered in search results
+    FRONTIER_ENABLED: bool = os.getenv("FRONTIER_ENABLED", "true").lower() == "true"
+    FRONTIER_PAGE_BUDGET: int = int(os.getenv("FRONTIER_PAGE_BUDGET", "10"))
+    FRONTIER_HOST_CONCURRENCY: int = int(os.getenv("FRONTIER_HOST_CONCURRENCY", "2"))
+    FRONTIER_MAX_DEPTH: int = int(os.getenv("FRONTIER_MAX_DEPTH", "1"))
+    FRONTIER_MIN_SCORE: float = float(os.getenv("FRONTIER_MIN_SCORE", "0.2"))
+    
+    # Deep pagination of repository/answer/article listings: pages past the
+    # first are fetched PAGINATION_CONCURRENCY at a time and stored as they
+    # land, until a page has nothing new or a page/time budget runs out
+    PAGINATION_MAX_PAGES: int = int(os.getenv("PAGINATION_MAX_PAGES", "10"))
+    PAGINATION_CONCURRENCY: int = int(os.getenv("PAGINATION_CONCURRENCY", "3"))
+    PAGINATION_TIME_BUDGET_SECONDS: float = float(os.getenv("PAGINATION_TIME_BUDGET_SECONDS", "120"))
+    
     # Common IDs to exclude
     EXCLUDED_IDS = ["abc", "admin", "user", "test", "demo", "example"]
 
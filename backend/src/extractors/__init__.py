@@ -1,3 +1,12 @@
 from .llm_extractor import LLMExtractor
+from .content_reducer import ContentReducer, content_reducer, estimate_tokens
+from .field_rules import LLMGate, llm_gate, score_fields, extract_schema
+from .usage import LLMUsageTracker, LLMBudgetExceeded, llm_usage
+from .routing import ModelRouter, model_router
 
-__all__ = ["LLMExtractor"]
\ No newline at end of file
+__all__ = [
+    "LLMExtractor", "ContentReducer", "content_reducer", "estimate_tokens",
+    "LLMGate", "llm_gate", "score_fields", "extract_schema",
+    "LLMUsageTracker", "LLMBudgetExceeded", "llm_usage",
+    "ModelRouter", "model_router"
+]
\ No newline at end of file
@@ -0,0 +1,156 @@
+import hashlib
+import re
+import threading
+from typing import Dict, Any, List, Optional
+from src.config import config
+
+CJK_CHAR = re.compile(r'[぀-ヿ㐀-䶿一-鿿가-힯]')
+MARKDOWN_LINK = re.compile(r'!?\[([^\]]*)\]\([^\)]*\)')
+BARE_URL = re.compile(r'https?://\S+')
+WORD = re.compile(r'[A-Za-z][A-Za-z0-9+#.\-]*|\d+|[一-鿿]')
+
+# Lines that are page chrome on every site we crawl
+BOILERPLATE_LINE = re.compile(
+    r'^\s*(?:[-*]\s*)?(?:'
+    r'skip to (?:main )?content|sign (?:in|up)|log ?in|register|toggle navigation|'
+    r'terms(?: of (?:service|use))?|privacy(?: policy)?|cookies?(?: settings| policy)?|'
+    r'(?:©|\(c\)|copyright)\s*\d{4}.*|all rights reserved|back to top|'
+    r'you signed (?:in|out) .*|reload to refresh.*|'
+    r'登录|注册|下载\s*app|打开\s*app|京icp.*|用户协议|隐私政策|举报|侵权举报.*'
+    r')\s*$',
+    re.IGNORECASE
+)
+
+# Facts the extraction prompt asks for; blocks mentioning them are kept first
+SIGNAL_TERMS = re.compile(
+    r'bio|about|followers?|following|repositor|stars?|contributions?|'
+    r'answers?|articles?|posts?|joined|location|company|skills?|'
+    r'个人简介|关注者|回答|文章|获赞|笔记|粉丝',
+    re.IGNORECASE
+)
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count: ~4 chars per token for Latin text, 1 per CJK char.
+    
+    Close enough to budget prompts without loading a tokenizer.
+    """
+    if not text:
+        return 0
+    cjk = len(CJK_CHAR.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+class ContentReducer:
+    """Strip page chrome and pack the most informative blocks into a token budget.
+    
+    Blocks are paragraphs split on blank lines. Boilerplate lines and
+    link-list blocks are dropped, repeated blocks (ignoring numbers) are
+    kept once, and the rest are ranked by how much profile signal they
+    carry. The selected blocks are emitted in their original page order.
+    """
+    
+    def __init__(self, token_budget: int = None):
+        self.token_budget = token_budget or config.LLM_CONTENT_TOKEN_BUDGET
+        self.stats: Dict[str, Dict[str, int]] = {}
+        # Extraction runs on several route threads at once
+        self._lock = threading.Lock()
+    
+    def reduce(self, content: str, platform: str = "unknown", token_budget: Optional[int] = None) -> str:
+        budget = token_budget or self.token_budget
+        blocks = self._clean_blocks(content or "")
+        
+        candidates = []
+        for position, block in enumerate(blocks):
+            tokens = estimate_tokens(block)
+            candidates.append((self._score(block, position, tokens), position, block, tokens))
+        
+        selected = []
+        used = 0
+        for score, position, block, tokens in sorted(candidates, key=lambda c: (-c[0], c[1])):
+            if used + tokens > budget:
+                if selected or tokens <= budget:
+                    continue
+                # A single oversized block: keep its head rather than nothing
+                block = self._truncate(block, budget)
+                tokens = estimate_tokens(block)
+            selected.append((position, block))
+            used += tokens
+        
+        reduced = "\n\n".join(block for _, block in sorted(selected))
+        self._record(platform, content or "", used)
+        return reduced
+    
+    def _clean_blocks(self, content: str) -> List[str]:
+        blocks = []
+        seen = set()
+        for raw_block in re.split(r'\n\s*\n', content):
+            lines = [
+                line.strip() for line in raw_block.splitlines()
+                if line.strip() and not BOILERPLATE_LINE.match(line)
+            ]
+            if not lines or self._is_link_list(lines):
+                continue
+            
+            block = "\n".join(lines)
+            # Numbers are masked so repeated cards ("★ 12", "★ 30") count as one block
+            normalized = re.sub(r'\d+', '0', MARKDOWN_LINK.sub(r'\1', block))
+            fingerprint = hashlib.md5(re.sub(r'\s+', ' ', normalized).lower().encode()).digest()
+            if fingerprint in seen:
+                continue
+            seen.add(fingerprint)
+            blocks.append(block)
+        return blocks
+    
+    def _is_link_list(self, lines: List[str]) -> bool:
+        text = "\n".join(lines)
+        links = MARKDOWN_LINK.findall(text) + BARE_URL.findall(text)
+        if not links:
+            return False
+        if MARKDOWN_LINK.fullmatch(text.strip()) and len(lines) == 1:
+            return True  # Lone icon/menu link
+        prose = BARE_URL.sub('', MARKDOWN_LINK.sub('', text))
+        prose = re.sub(r'[\s\-*|•·>]+', '', prose)
+        return len(links) >= 3 and len(prose) < 0.2 * len(text)
+    
+    def _score(self, block: str, position: int, tokens: int) -> float:
+        words = WORD.findall(MARKDOWN_LINK.sub(r'\1', block))
+        if not words:
+            return 0.0
+        
+        score = len(set(w.lower() for w in words)) / max(tokens, 1)
+        score += 0.5 * len(SIGNAL_TERMS.findall(block))
+        if block.startswith('#'):
+            score += 1.0
+        if re.search(r'\d', block):
+            score += 0.2
+        # Profile headers come first on every platform we crawl
+        return score + 1.0 / (1 + position * 0.1)
+    
+    def _truncate(self, block: str, budget: int) -> str:
+        chars = budget * 3
+        while chars > 0 and estimate_tokens(block[:chars]) > budget:
+            chars = int(chars * 0.8)
+        return block[:chars]
+    
+    def _record(self, platform: str, content: str, tokens_out: int):
+        tokens_in = estimate_tokens(content)
+        with self._lock:
+            entry = self.stats.setdefault(platform, {"pages": 0, "tokens_in": 0, "tokens_out": 0})
+            entry["pages"] += 1
+            entry["tokens_in"] += tokens_in
+            entry["tokens_out"] += tokens_out
+    
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = {platform: dict(entry) for platform, entry in self.stats.items()}
+        report = {}
+        for platform, entry in stats.items():
+            saved = entry["tokens_in"] - entry["tokens_out"]
+            report[platform] = {
+                **entry,
+                "tokens_saved": saved,
+                "saved_ratio": round(saved / entry["tokens_in"], 3) if entry["tokens_in"] else 0.0
+            }
+        return report
+
+# Global reducer shared by extraction calls
+content_reducer = ContentReducer()
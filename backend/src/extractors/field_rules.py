@@ -0,0 +1,307 @@
+import importlib.util
+import json
+import re
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+from bs4 import BeautifulSoup
+from src.config import config
+
+@dataclass(frozen=True)
+class FieldRule:
+    """Where a field lives in the page HTML: a CSS selector or a dotted path into embedded JSON.
+    
+    JSON paths use "*" for "the first value" (entity maps keyed by id) and
+    numbers for list indexes.
+    """
+    kind: str  # "css" or "json"
+    path: str
+    attr: Optional[str] = None  # css: read this attribute instead of the text
+    count: bool = False  # parse "1.2k" / "3.4万" style numbers
+    confidence: float = 0.9
+
+def css(selector: str, attr: str = None, count: bool = False, confidence: float = 0.9) -> FieldRule:
+    return FieldRule("css", selector, attr, count, confidence)
+
+def json_path(path: str, count: bool = False, confidence: float = 0.95) -> FieldRule:
+    return FieldRule("json", path, None, count, confidence)
+
+# Schemas per extracted_data type, tried before the markdown regexes are trusted.
+# Rules for a field are tried in order; the first one that matches wins.
+SCHEMAS: Dict[str, Dict[str, List[FieldRule]]] = {
+    "github_profile": {
+        "username": [css("span.p-nickname"), css('meta[property="profile:username"]', attr="content")],
+        "display_name": [css("span.p-name")],
+        "bio": [css("div.p-note"), css("div.user-profile-bio", attr="data-bio-text")],
+        "followers": [css('a[href$="?tab=followers"] span.text-bold', count=True)],
+        "following": [css('a[href$="?tab=following"] span.text-bold', count=True)],
+        "repositories_count": [css('a[data-tab-item="repositories"] span.Counter', attr="title", count=True)],
+        "location": [css('li[itemprop="homeLocation"] span.p-label')],
+        "company": [css("span.p-org")]
+    },
+    "zhihu_profile": {
+        "display_name": [json_path("initialState.entities.users.*.name"), css("span.ProfileHeader-name")],
+        "description": [json_path("initialState.entities.users.*.headline"), css("span.ProfileHeader-headline")],
+        "followers": [json_path("initialState.entities.users.*.followerCount", count=True)],
+        "answers_count": [json_path("initialState.entities.users.*.answerCount", count=True)],
+        "articles_count": [json_path("initialState.entities.users.*.articlesCount", count=True)]
+    },
+    "xiaohongshu_profile": {
+        "nickname": [json_path("user.userPageData.basicInfo.nickname"), css("div.user-name")],
+        "red_id": [json_path("user.userPageData.basicInfo.redId"), css("span.user-redId")],
+        "ip_location": [json_path("user.userPageData.basicInfo.ipLocation")],
+        "description": [json_path("user.userPageData.basicInfo.desc"), css("div.user-desc")],
+        # interactions is [follows, fans, likes and collects]
+        "following": [json_path("user.userPageData.interactions.0.count", count=True, confidence=0.85)],
+        "followers": [json_path("user.userPageData.interactions.1.count", count=True, confidence=0.85)],
+        "likes_and_collects": [json_path("user.userPageData.interactions.2.count", count=True, confidence=0.85)]
+    },
+    "xiaohongshu_note": {
+        "title": [json_path("note.noteDetailMap.*.note.title"), css("div#detail-title")],
+        "description": [json_path("note.noteDetailMap.*.note.desc"), css("div#detail-desc")]
+    }
+}
+
+# Confidence of the collectors' markdown regexes: labelled counts are
+# reliable, "first heading is the name" less so, free text least
+RULE_CONFIDENCE: Dict[str, Dict[str, float]] = {
+    "github_profile": {
+        "username": 0.7, "bio": 0.6, "repositories_count": 0.8, "followers": 0.8, "following": 0.8
+    },
+    "zhihu_profile": {
+        "display_name": 0.7, "description": 0.7, "followers": 0.8, "answers_count": 0.8, "articles_count": 0.8
+    },
+    "xiaohongshu_profile": {
+        "nickname": 0.7, "red_id": 0.9, "ip_location": 0.9,
+        "following": 0.8, "followers": 0.8, "likes_and_collects": 0.8
+    },
+    "xiaohongshu_note": {"title": 0.7, "note_id": 1.0}
+}
+DEFAULT_RULE_CONFIDENCE = 0.6
+AGREEMENT_BONUS = 0.05
+DISAGREEMENT_PENALTY = 0.8
+
+# Fields a page must have, confidently, to skip the LLM. Page types without
+# an entry (search results, generic web pages) always go to the LLM.
+REQUIRED_FIELDS: Dict[str, List[str]] = {
+    "github_profile": ["username", "followers"],
+    "zhihu_profile": ["display_name", "followers"],
+    "xiaohongshu_profile": ["nickname", "followers"],
+    "xiaohongshu_note": ["title"]
+}
+
+# Bookkeeping keys in extracted_data that aren't profile fields
+META_FIELDS = {"type", "timestamp", "fetch_tier", "entries", "page", "field_confidence"}
+
+# lxml parses pages about 20x faster than html.parser; BeautifulSoup is the fallback
+LXML_AVAILABLE = all(importlib.util.find_spec(name) is not None for name in ("lxml", "cssselect"))
+
+EMBEDDED_JSON = [
+    re.compile(r'<script id="js-initialData" type="text/json">(.*?)</script>', re.DOTALL),
+    re.compile(r'window\.__INITIAL_STATE__\s*=\s*(\{.*?\})\s*;?\s*</script>', re.DOTALL)
+]
+
+def parse_count(value: Any) -> Optional[int]:
+    """Counts as pages render them: 1234, "1,234", "1.2k", "3.4万", "10w+" """
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = re.search(r'(\d+(?:\.\d+)?)\s*([kKmM万wW]?)', str(value).replace(",", ""))
+    if not match:
+        return None
+    multiplier = {"k": 1000, "m": 1000000, "万": 10000, "w": 10000}.get(match.group(2).lower(), 1)
+    return int(float(match.group(1)) * multiplier)
+
+def _walk(data: Any, path: str) -> Any:
+    for key in path.split("."):
+        if key == "*":
+            if isinstance(data, dict) and data:
+                data = next(iter(data.values()))
+            elif isinstance(data, list) and data:
+                data = data[0]
+            else:
+                return None
+        elif isinstance(data, list) and key.isdigit():
+            index = int(key)
+            data = data[index] if index < len(data) else None
+        elif isinstance(data, dict):
+            data = data.get(key)
+        else:
+            return None
+        if data is None:
+            return None
+    return data
+
+def _embedded_json(html: str) -> List[Any]:
+    documents = []
+    for pattern in EMBEDDED_JSON:
+        match = pattern.search(html)
+        if not match:
+            continue
+        # __INITIAL_STATE__ is a JS literal; undefined is its only non-JSON value in practice
+        text = re.sub(r'(?<=[:\[,])\s*undefined\b', 'null', match.group(1))
+        try:
+            documents.append(json.loads(text))
+        except json.JSONDecodeError:
+            continue
+    return documents
+
+class _HtmlDocument:
+    """First-match CSS selection over one parsed page"""
+    
+    def __init__(self, html: str):
+        self._root = None
+        self._soup = None
+        if LXML_AVAILABLE:
+            import lxml.html
+            self._root = lxml.html.fromstring(html)
+        else:
+            self._soup = BeautifulSoup(html, "html.parser")
+    
+    def first(self, selector: str, attr: str = None) -> Optional[str]:
+        if self._root is not None:
+            nodes = self._root.cssselect(selector)
+            node = nodes[0] if nodes else None
+            if node is None:
+                return None
+            return node.get(attr) if attr else " ".join(node.text_content().split())
+        node = self._soup.select_one(selector)
+        if node is None:
+            return None
+        return node.get(attr) if attr else node.get_text(" ", strip=True)
+
+def extract_schema(item_type: str, html: str) -> Dict[str, Tuple[Any, float]]:
+    """Run the type's schema over the page HTML: {field: (value, confidence)}"""
+    schema = SCHEMAS.get(item_type)
+    if not schema or not html:
+        return {}
+    
+    documents = _embedded_json(html) if any(r.kind == "json" for rules in schema.values() for r in rules) else []
+    document = None
+    results = {}
+    for field, rules in schema.items():
+        for rule in rules:
+            value = None
+            if rule.kind == "json":
+                value = next((v for v in (_walk(d, rule.path) for d in documents) if v not in (None, "")), None)
+            else:
+                if document is None:
+                    document = _HtmlDocument(html)
+                value = document.first(rule.path, rule.attr)
+            if rule.count and value is not None:
+                value = parse_count(value)
+            if isinstance(value, str):
+                value = value.strip()
+            if value not in (None, ""):
+                results[field] = (value, rule.confidence)
+                break
+    return results
+
+def _same_value(a: Any, b: Any) -> bool:
+    return str(a).strip().lower() == str(b).strip().lower()
+
+def score_fields(info: Dict[str, Any], html: str = "") -> Dict[str, Any]:
+    """Merge schema values into the regex-extracted info and attach per-field confidence.
+    
+    Schema and regex agreeing raises confidence; where they disagree the
+    schema value wins at reduced confidence.
+    """
+    item_type = info.get("type")
+    rule_confidence = RULE_CONFIDENCE.get(item_type, {})
+    confidence = dict(info.get("field_confidence") or {})
+    for field in info:
+        if field not in META_FIELDS and field not in confidence:
+            confidence[field] = rule_confidence.get(field, DEFAULT_RULE_CONFIDENCE)
+    
+    for field, (value, score) in extract_schema(item_type, html).items():
+        current = info.get(field)
+        if current is None:
+            info[field] = value
+            confidence[field] = score
+        elif _same_value(current, value):
+            confidence[field] = round(min(1.0, max(score, confidence[field]) + AGREEMENT_BONUS), 2)
+        else:
+            info[field] = value
+            confidence[field] = round(score * DISAGREEMENT_PENALTY, 2)
+    
+    info["field_confidence"] = confidence
+    return info
+
+class LLMGate:
+    """Send a page to the LLM only when its required fields are missing or low-confidence.
+    
+    Counts, per platform, how many pages were checked and how many went to
+    the LLM, and the LLM time per page, to estimate the latency the skipped
+    pages saved.
+    """
+    
+    def __init__(self, enabled: bool = None, threshold: float = None):
+        self.enabled = config.LLM_GATE_ENABLED if enabled is None else enabled
+        self.threshold = config.LLM_CONFIDENCE_THRESHOLD if threshold is None else threshold
+        self.stats: Dict[str, Dict[str, float]] = defaultdict(
+            lambda: {"pages": 0, "llm_pages": 0, "timed_pages": 0, "llm_seconds": 0.0}
+        )
+        # Pages are gated on the worker thread that runs the LLM calls
+        self._lock = threading.Lock()
+    
+    def weak_fields(self, extracted_data: Dict[str, Any]) -> List[str]:
+        """Required fields that are missing or below the threshold; ["*"] when the page type has no rules"""
+        required = REQUIRED_FIELDS.get(extracted_data.get("type"))
+        if required is None:
+            return ["*"]
+        confidence = extracted_data.get("field_confidence") or {}
+        return [
+            field for field in required
+            if extracted_data.get(field) in (None, "", []) or confidence.get(field, 0.0) < self.threshold
+        ]
+    
+    def needs_llm(self, item: Dict[str, Any]) -> bool:
+        needed = not self.enabled or bool(self.weak_fields(item.get("extracted_data") or {}))
+        with self._lock:
+            entry = self.stats[item.get("platform", "unknown")]
+            entry["pages"] += 1
+            entry["llm_pages"] += needed
+        return needed
+    
+    def record_latency(self, platforms: List[str], seconds: float):
+        """Spread one LLM call's time over the pages it covered"""
+        if not platforms:
+            return
+        per_page = seconds / len(platforms)
+        with self._lock:
+            for platform in platforms:
+                entry = self.stats[platform]
+                entry["timed_pages"] += 1
+                entry["llm_seconds"] += per_page
+    
+    def merge(self, extracted_data: Dict[str, Any], enhanced: Dict[str, Any]):
+        """Add LLM output without overwriting fields the rules already got confidently"""
+        confidence = extracted_data.get("field_confidence") or {}
+        for key, value in enhanced.items():
+            if confidence.get(key, 0.0) >= self.threshold and extracted_data.get(key) not in (None, ""):
+                continue
+            extracted_data[key] = value
+    
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = {platform: dict(entry) for platform, entry in self.stats.items()}
+        timed = sum(entry["timed_pages"] for entry in stats.values())
+        overall_per_page = sum(entry["llm_seconds"] for entry in stats.values()) / timed if timed else None
+        
+        platforms = {}
+        for platform, entry in stats.items():
+            per_page = entry["llm_seconds"] / entry["timed_pages"] if entry["timed_pages"] else overall_per_page
+            skipped = entry["pages"] - entry["llm_pages"]
+            platforms[platform] = {
+                "pages": entry["pages"],
+                "llm_pages": entry["llm_pages"],
+                "skipped": skipped,
+                "llm_call_rate": round(entry["llm_pages"] / entry["pages"], 3) if entry["pages"] else 0.0,
+                "llm_seconds_per_page": round(per_page, 3) if per_page is not None else None,
+                # Estimated from the LLM time per page this platform (or all platforms) actually took
+                "latency_saved_seconds": round(skipped * per_page, 2) if per_page is not None else None
+            }
+        return {"enabled": self.enabled, "threshold": self.threshold, "platforms": platforms}
+
+# Global gate shared by the profiler and the stats endpoint
+llm_gate = LLMGate()
@@ -1,30 +1,62 @@
 import json
-import openai
+import re
+import threading
+import time
 from typing import Dict, Any, List, Optional
 from src.config import config
+from src.utils.tracing import tracer
+from .content_reducer import content_reducer, estimate_tokens
+from .routing import model_router
+from .usage import LLMBudgetExceeded, llm_usage, token_counts
+
+EXTRACTION_SYSTEM_PROMPT = "You are an expert at extracting structured information from web content for user profiling."
+
+SUMMARY_SYSTEM_PROMPT = "You are an expert at creating user profiles from digital footprint analysis."
+
+EXTRACTION_FIELDS = """- username/display_name
+- bio/description
+- skills/interests (as array)
+- activity_type (post, comment, profile, repository, etc.)
+- activity_date (if available)
+- key_metrics (followers, posts, stars, etc.)
+- topics/tags mentioned
+- any other relevant profile information"""
+
+class MalformedBatchResponse(ValueError):
+    pass
 
 class LLMExtractor:
-    def __init__(self):
-        if not config.OPENAI_API_KEY:
+    def __init__(self, client=None, http_client=None):
+        """client replaces the OpenAI client outright; http_client is an httpx.Client for it
+        (e.g. on a mock transport). With either one injected no API key is needed."""
+        injected = client is not None or http_client is not None
+        if not config.OPENAI_API_KEY and not injected:
             raise ValueError("OpenAI API key not found. Please set OPENAI_API_KEY environment variable.")
-        openai.api_key = config.OPENAI_API_KEY
-        self.client = openai.OpenAI(api_key=config.OPENAI_API_KEY)
+        # Imported here so modules that only need the reducer don't load the SDK
+        import openai
+        if client is None:
+            client = openai.OpenAI(
+                api_key=config.OPENAI_API_KEY or "unused",
+                base_url=config.LLM_BASE_URL,
+                http_client=http_client
+            )
+        self.client = client
+        self.timeout_errors = (openai.APITimeoutError,)
+        self.batch_stats = {"requests": 0, "pages": 0, "splits": 0}
+        self._stats_lock = threading.Lock()
+    
+    def get_batch_stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return dict(self.batch_stats)
     
     def extract_structured_info(self, content: str, platform: str, url: str) -> Dict[str, Any]:
+        return self._extract_reduced(content_reducer.reduce(content, platform), platform, url)
+    
+    def _extract_reduced(self, content: str, platform: str, url: str) -> Dict[str, Any]:
         prompt = self._build_extraction_prompt(content, platform, url)
         
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are an expert at extracting structured information from web content for user profiling."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.1,
-                max_tokens=800
-            )
-            
-            extracted_text = response.choices[0].message.content.strip()
+            extracted_text = self._complete(prompt, platform=platform)
             
             # Try to parse as JSON
             try:
@@ -32,7 +64,9 @@ class LLMExtractor:
             except json.JSONDecodeError:
                 # If not valid JSON, return as structured text
                 return self._parse_structured_text(extracted_text)
-                
+        
+        except LLMBudgetExceeded:
+            raise
         except Exception as e:
             print(f"Error extracting with LLM: {str(e)}")
             return {"error": str(e), "raw_content": content[:500]}
@@ -42,20 +76,177 @@ class LLMExtractor:
 Extract key information from this {platform} profile/content for user profiling:
 
 URL: {url}
-Content: {content[:3000]}
+Content: {content}
 
 Please extract and return a JSON object with the following information:
-- username/display_name
-- bio/description
-- skills/interests (as array)
-- activity_type (post, comment, profile, repository, etc.)
-- activity_date (if available)
-- key_metrics (followers, posts, stars, etc.)
-- topics/tags mentioned
-- any other relevant profile information
+{EXTRACTION_FIELDS}
 
 Return only valid JSON. If information is not available, omit the field or use null.
 """
+
+    def _complete(
+        self,
+        prompt: str,
+        max_tokens: int = None,
+        platform: str = None,
+        pages: int = 1,
+        operation: str = "extract",
+        system_prompt: str = EXTRACTION_SYSTEM_PROMPT,
+        route: str = "extraction"
+    ) -> str:
+        """One chat completion on a route's model with its token limit and timeout.
+        
+        Blocking; async callers run it through model_router.run so the
+        route's thread pool bounds how many are in flight.
+        """
+        model_route = model_router.route(route)
+        model = model_route.model
+        max_tokens = max_tokens or model_route.max_tokens
+        estimated_tokens = estimate_tokens(prompt)
+        # Worst case (a full completion) so a budget is never knowingly overrun
+        llm_usage.check(estimated_tokens + max_tokens)
+        
+        with tracer.span("llm.complete", model=model, route=route, operation=operation, prompt_tokens=estimated_tokens) as span:
+            start = time.perf_counter()
+            try:
+                response = self.client.chat.completions.create(
+                    model=model,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=model_route.temperature,
+                    max_tokens=max_tokens,
+                    timeout=model_route.timeout
+                )
+            except Exception as e:
+                latency = time.perf_counter() - start
+                status = "timeout" if isinstance(e, self.timeout_errors) else "error"
+                model_router.record(model_route, latency, status=status)
+                llm_usage.record(operation, model, None, latency, platform, pages, status=status, route=route)
+                raise
+            latency = time.perf_counter() - start
+            
+            usage = getattr(response, "usage", None)
+            prompt_tokens, completion_tokens, cached_tokens = token_counts(usage)
+            cost = model_router.cost(model, prompt_tokens, completion_tokens, cached_tokens)
+            model_router.record(model_route, latency, prompt_tokens, completion_tokens, cost)
+            llm_usage.record(operation, model, usage, latency, platform, pages, route=route, cost_usd=cost)
+            if usage:
+                span.set(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens, cost_usd=cost)
+        return response.choices[0].message.content.strip()
+    
+    def extract_batch(self, pages: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+        """Extract several pages of one user in as few requests as the batch budget allows.
+        
+        Each page is a dict with content, platform and url. Results come back
+        in input order, one dict per page. A batch request that fails outright
+        (transport or API error) raises instead of filling in error results.
+        """
+        documents = [
+            {
+                "platform": page["platform"],
+                "url": page["url"],
+                "content": content_reducer.reduce(page["content"], page["platform"])
+            }
+            for page in pages
+        ]
+        
+        results = []
+        for batch in self._pack_batches(documents):
+            try:
+                results.extend(self._extract_documents(batch))
+            except LLMBudgetExceeded:
+                # Out of tokens: these pages keep their rule-only extraction
+                llm_usage.skip_pages(len(batch))
+                results.extend({} for _ in batch)
+        return results
+    
+    def _pack_batches(self, documents: List[Dict[str, str]]) -> List[List[Dict[str, str]]]:
+        batches = []
+        current = []
+        current_tokens = 0
+        for document in documents:
+            tokens = estimate_tokens(document["content"])
+            if current and (
+                current_tokens + tokens > config.LLM_BATCH_TOKEN_BUDGET
+                or len(current) >= config.LLM_BATCH_MAX_PAGES
+            ):
+                batches.append(current)
+                current = []
+                current_tokens = 0
+            current.append(document)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+    
+    def _extract_documents(self, documents: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+        if len(documents) == 1:
+            document = documents[0]
+            return [self._extract_reduced(document["content"], document["platform"], document["url"])]
+        
+        try:
+            with self._stats_lock:
+                self.batch_stats["requests"] += 1
+                self.batch_stats["pages"] += len(documents)
+            platforms = {document["platform"] for document in documents}
+            response_text = self._complete(
+                self._build_batch_prompt(documents),
+                max_tokens=min(model_router.route("extraction").max_tokens * len(documents), 4000),
+                platform=platforms.pop() if len(platforms) == 1 else "mixed",
+                pages=len(documents),
+                operation="extract_batch"
+            )
+            return self._parse_batch_response(response_text, len(documents))
+        except MalformedBatchResponse as e:
+            # Halve the batch; each half gets a fresh, smaller request
+            print(f"Malformed batch extraction response ({str(e)}), splitting {len(documents)} pages")
+            with self._stats_lock:
+                self.batch_stats["splits"] += 1
+            middle = len(documents) // 2
+            return self._extract_documents(documents[:middle]) + self._extract_documents(documents[middle:])
+        # Transport and API errors propagate so the caller can fall back to single pages
+    
+    def _build_batch_prompt(self, documents: List[Dict[str, str]]) -> str:
+        sections = "\n\n".join(
+            f"### Document {index}\nPlatform: {document['platform']}\nURL: {document['url']}\n"
+            f"Content:\n{document['content']}"
+            for index, document in enumerate(documents)
+        )
+        return f"""
+Extract key information from each of these {len(documents)} documents about the same user.
+Treat every document separately.
+
+{sections}
+
+For each document, extract a JSON object with the following information:
+{EXTRACTION_FIELDS}
+
+Return only valid JSON of the form {{"results": [{{"index": 0, ...}}, {{"index": 1, ...}}]}}
+with exactly one object per document, in document order. If information is not available,
+omit the field or use null.
+"""
+
+    def _parse_batch_response(self, text: str, expected: int) -> List[Dict[str, Any]]:
+        text = re.sub(r'^```(?:json)?\s*|\s*```$', '', text.strip())
+        try:
+            payload = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise MalformedBatchResponse(f"invalid JSON: {e}")
+        
+        results = payload.get("results") if isinstance(payload, dict) else payload
+        if not isinstance(results, list) or not all(isinstance(r, dict) for r in results):
+            raise MalformedBatchResponse("missing results list")
+        
+        by_index = {}
+        for position, result in enumerate(results):
+            index = result.pop("index", position)
+            if isinstance(index, int) and 0 <= index < expected:
+                by_index[index] = result
+        if len(by_index) != expected:
+            raise MalformedBatchResponse(f"expected {expected} results, got {len(by_index)}")
+        return [by_index[index] for index in range(expected)]
     
     def _parse_structured_text(self, text: str) -> Dict[str, Any]:
         # Simple structured text parser as fallback
@@ -110,21 +301,20 @@ Generate a JSON profile with:
 
 Return only valid JSON.
 """
-        
+
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are an expert at creating user profiles from digital footprint analysis."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.2,
-                max_tokens=1000
-            )
+            summary_model = model_router.route("summary").model
+            with tracer.span("llm.profile_summary", model=summary_model, activities=len(activity_summary)):
+                profile_text = self._complete(
+                    prompt,
+                    pages=len(activity_summary),
+                    operation="profile_summary",
+                    system_prompt=SUMMARY_SYSTEM_PROMPT,
+                    route="summary"
+                )
             
-            profile_text = response.choices[0].message.content.strip()
             return json.loads(profile_text)
-            
+        
         except Exception as e:
             print(f"Error generating profile summary: {str(e)}")
             return {
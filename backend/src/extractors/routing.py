@@ -0,0 +1,133 @@
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from src.config import config
+
+class ModelRoute:
+    """One kind of LLM work: which model, how many tokens, how many calls at once and how long to wait.
+    
+    The SDK call blocks, so a route runs its work on its own threads, as
+    many as its concurrency. A saturated route queues work there instead of
+    tying up the default executor that DB and tracer work share.
+    """
+    
+    def __init__(self, name: str, settings: Dict[str, Any]):
+        self.name = name
+        self.model = settings["model"]
+        self.max_tokens = settings["max_tokens"]
+        self.temperature = settings.get("temperature", 0.1)
+        self.concurrency = settings.get("concurrency", 4)
+        self.timeout = settings.get("timeout", 60.0)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.queued = 0
+        self.in_flight = 0
+        self._lock = threading.Lock()
+        self.stats = {
+            "calls": 0, "errors": 0, "timeouts": 0,
+            "prompt_tokens": 0, "completion_tokens": 0, "cost_usd": 0.0,
+            "latency_total": 0.0, "latency_max": 0.0
+        }
+    
+    async def run(self, func: Callable[..., Any], *args) -> Any:
+        """Run blocking LLM work on the route's threads, in the caller's context (usage scope, trace)"""
+        context = contextvars.copy_context()
+        with self._lock:
+            self.queued += 1
+        
+        def call():
+            with self._lock:
+                self.queued -= 1
+                self.in_flight += 1
+            try:
+                return context.run(func, *args)
+            finally:
+                with self._lock:
+                    self.in_flight -= 1
+        
+        return await asyncio.get_running_loop().run_in_executor(self._get_executor(), call)
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix=f"llm-{self.name}")
+            return self._executor
+    
+    def close(self):
+        """Stop the route's threads; the next run() starts a fresh pool"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+class ModelRouter:
+    """Routes extraction and summary calls to their configured models and prices them"""
+    
+    def __init__(self, routes: Dict[str, Dict[str, Any]] = None, pricing: Dict[str, tuple] = None):
+        self.routes = {name: ModelRoute(name, settings) for name, settings in (routes or config.LLM_ROUTES).items()}
+        self.pricing = pricing or config.LLM_PRICING
+        self._lock = threading.Lock()
+    
+    def route(self, name: str) -> ModelRoute:
+        return self.routes[name]
+    
+    async def run(self, route: str, func: Callable[..., Any], *args) -> Any:
+        return await self.routes[route].run(func, *args)
+    
+    def close(self):
+        for route in self.routes.values():
+            route.close()
+    
+    def cost(self, model: str, prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0) -> Optional[float]:
+        """USD for one call from the per-million-token prices; None for models without a price"""
+        prices = self.pricing.get(model)
+        if prices is None:
+            return None
+        input_price, cached_price, output_price = prices
+        return (
+            (prompt_tokens - cached_tokens) * input_price
+            + cached_tokens * cached_price
+            + completion_tokens * output_price
+        ) / 1_000_000
+    
+    def record(self, route: ModelRoute, latency: float, prompt_tokens: int = 0, completion_tokens: int = 0,
+               cost: Optional[float] = None, status: str = "ok"):
+        with self._lock:
+            stats = route.stats
+            stats["calls"] += 1
+            if status == "timeout":
+                stats["timeouts"] += 1
+            elif status != "ok":
+                stats["errors"] += 1
+            stats["prompt_tokens"] += prompt_tokens
+            stats["completion_tokens"] += completion_tokens
+            stats["cost_usd"] += cost or 0.0
+            stats["latency_total"] += latency
+            stats["latency_max"] = max(stats["latency_max"], latency)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            report = {}
+            for name, route in self.routes.items():
+                stats = route.stats
+                report[name] = {
+                    "model": route.model,
+                    "max_tokens": route.max_tokens,
+                    "concurrency": route.concurrency,
+                    "timeout": route.timeout,
+                    "in_flight": route.in_flight,
+                    "queued": route.queued,
+                    "calls": stats["calls"],
+                    "errors": stats["errors"],
+                    "timeouts": stats["timeouts"],
+                    "prompt_tokens": stats["prompt_tokens"],
+                    "completion_tokens": stats["completion_tokens"],
+                    "avg_latency_ms": round(stats["latency_total"] / stats["calls"] * 1000, 1) if stats["calls"] else 0.0,
+                    "max_latency_ms": round(stats["latency_max"] * 1000, 1),
+                    "cost_usd": round(stats["cost_usd"], 6)
+                }
+            return report
+
+# Global router shared by every LLMExtractor
+model_router = ModelRouter()
@@ -0,0 +1,194 @@
+import secrets
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+from src.config import config
+
+class LLMBudgetExceeded(RuntimeError):
+    """A token budget would be exceeded by the next LLM call"""
+
+@dataclass
+class UsageScope:
+    """Token spend of one crawl (or profile generation) and its budget; 0 means unlimited"""
+    user_id: str
+    operation: str
+    budget: int
+    scope_id: str = field(default_factory=lambda: secrets.token_hex(8))
+    tokens: int = 0
+    calls: int = 0
+    skipped_pages: int = 0
+    exhausted: Optional[str] = None  # "crawl" or "daily" once a budget ran out
+    
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "scope_id": self.scope_id,
+            "tokens": self.tokens,
+            "calls": self.calls,
+            "budget": self.budget,
+            "skipped_pages": self.skipped_pages,
+            "budget_exhausted": self.exhausted
+        }
+
+def _token_count(obj: Any, name: str) -> int:
+    value = getattr(obj, name, None)
+    return value if isinstance(value, int) else 0
+
+def token_counts(usage: Any) -> Tuple[int, int, int]:
+    """Prompt, completion and cached prompt tokens of a response's usage object (zeros for None)"""
+    return (
+        _token_count(usage, "prompt_tokens"),
+        _token_count(usage, "completion_tokens"),
+        _token_count(getattr(usage, "prompt_tokens_details", None), "cached_tokens")
+    )
+
+# The scope travels in a contextvar, so LLM calls made on the model routes' threads see it
+_current_scope: ContextVar[Optional[UsageScope]] = ContextVar("llm_usage_scope", default=None)
+
+class LLMUsageTracker:
+    """Account every LLM call against per-crawl and per-day token budgets.
+    
+    Calls are recorded from the worker threads that make them and queued
+    until the caller drains them into the llm_usage table. The daily total
+    is seeded from that table, so a restart doesn't reset the budget.
+    """
+    
+    def __init__(self, crawl_budget: int = None, daily_budget: int = None):
+        self.crawl_budget = config.LLM_CRAWL_TOKEN_BUDGET if crawl_budget is None else crawl_budget
+        self.daily_budget = config.LLM_DAILY_TOKEN_BUDGET if daily_budget is None else daily_budget
+        self.daily_tokens: Dict[date, int] = {}
+        self._loaded_day: Optional[date] = None
+        self.pending: List[Dict[str, Any]] = []
+        self.stats = {"calls": 0, "tokens": 0, "rejected_calls": 0, "skipped_pages": 0}
+        self._lock = threading.Lock()
+    
+    @contextmanager
+    def scope(self, user_id: str, operation: str = "crawl", budget: int = None):
+        usage_scope = UsageScope(user_id, operation, self.crawl_budget if budget is None else budget)
+        token = _current_scope.set(usage_scope)
+        try:
+            yield usage_scope
+        finally:
+            _current_scope.reset(token)
+    
+    def current(self) -> Optional[UsageScope]:
+        return _current_scope.get()
+    
+    async def load_daily(self, db):
+        """Seed today's total from the database once per day"""
+        today = date.today()
+        if self._loaded_day == today:
+            return
+        stored = await db.get_llm_tokens_since(datetime.combine(today, datetime.min.time()))
+        with self._lock:
+            # Calls recorded but not flushed yet aren't in the table
+            unflushed = sum(r["total_tokens"] for r in self.pending if r["created_at"].date() == today)
+            self.daily_tokens = {today: stored + unflushed}
+            self._loaded_day = today
+    
+    def exhausted(self) -> Optional[str]:
+        """Which budget is already used up, if any"""
+        usage_scope = _current_scope.get()
+        if usage_scope is not None and usage_scope.exhausted:
+            return usage_scope.exhausted
+        if self.daily_budget and self.daily_tokens.get(date.today(), 0) >= self.daily_budget:
+            return "daily"
+        return None
+    
+    def check(self, estimated_tokens: int):
+        """Raise LLMBudgetExceeded if a call of about this many tokens would go over a budget"""
+        usage_scope = _current_scope.get()
+        reason = None
+        if usage_scope is not None and usage_scope.budget and usage_scope.tokens + estimated_tokens > usage_scope.budget:
+            reason = "crawl"
+        elif self.daily_budget and self.daily_tokens.get(date.today(), 0) + estimated_tokens > self.daily_budget:
+            reason = "daily"
+        if reason is None:
+            return
+        
+        with self._lock:
+            self.stats["rejected_calls"] += 1
+        if usage_scope is not None:
+            usage_scope.exhausted = reason
+        raise LLMBudgetExceeded(f"{reason} LLM token budget exhausted")
+    
+    def skip_pages(self, count: int):
+        """Pages left with rule-only extraction because a budget ran out"""
+        usage_scope = _current_scope.get()
+        if usage_scope is not None:
+            usage_scope.skipped_pages += count
+        with self._lock:
+            self.stats["skipped_pages"] += count
+    
+    def record(
+        self,
+        operation: str,
+        model: str,
+        usage: Any,
+        latency: float,
+        platform: str = None,
+        pages: int = 1,
+        status: str = "ok",
+        route: str = None,
+        cost_usd: float = None
+    ):
+        """Account one completed (or failed) call; usage is the response's usage object or None"""
+        prompt_tokens, completion_tokens, cached_tokens = token_counts(usage)
+        total_tokens = prompt_tokens + completion_tokens
+        
+        usage_scope = _current_scope.get()
+        if usage_scope is not None:
+            usage_scope.tokens += total_tokens
+            usage_scope.calls += 1
+        
+        record = {
+            "created_at": datetime.now(),
+            "user_id": usage_scope.user_id if usage_scope else None,
+            "scope_id": usage_scope.scope_id if usage_scope else None,
+            "operation": operation,
+            "platform": platform,
+            "route": route,
+            "model": model,
+            "pages": pages,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": total_tokens,
+            "cached_tokens": cached_tokens,
+            "cache_hit": cached_tokens > 0,
+            "latency_ms": round(latency * 1000, 1),
+            "cost_usd": cost_usd,
+            "status": status
+        }
+        today = date.today()
+        with self._lock:
+            self.daily_tokens[today] = self.daily_tokens.get(today, 0) + total_tokens
+            self.pending.append(record)
+            self.stats["calls"] += 1
+            self.stats["tokens"] += total_tokens
+    
+    def drain(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            records, self.pending = self.pending, []
+        return records
+    
+    async def flush(self, db):
+        """Write queued call records to the llm_usage table"""
+        records = self.drain()
+        if records:
+            await db.add_llm_usage(records)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        today = date.today()
+        with self._lock:
+            return {
+                **self.stats,
+                "pending_records": len(self.pending),
+                "today_tokens": self.daily_tokens.get(today, 0),
+                "daily_budget": self.daily_budget,
+                "crawl_budget": self.crawl_budget
+            }
+
+# Global tracker shared by the extractor, the profiler and the API
+llm_usage = LLMUsageTracker()
@@ -1,12 +1,45 @@
+import zlib
 from datetime import datetime
 from typing import Optional, Dict, Any, List
-from pydantic import BaseModel
-from sqlalchemy import Column, Integer, String, DateTime, Text, JSON
+from pydantic import BaseModel, Field
+from sqlalchemy import Column, Integer, String, DateTime, JSON, LargeBinary, ForeignKey, Boolean, Float
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
+from sqlalchemy.types import TypeDecorator
 
 Base = declarative_base()
 
+class CompressedText(TypeDecorator):
+    """Text column stored as a zlib-compressed blob"""
+    
+    impl = LargeBinary
+    cache_ok = True
+    
+    def __init__(self, level: int = 6, **kwargs):
+        super().__init__(**kwargs)
+        self.level = level
+    
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return zlib.compress(value.encode("utf-8"), self.level)
+    
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return zlib.decompress(value).decode("utf-8")
+
+class ActivityContent(Base):
+    """Cold storage for raw activity content, loaded only when requested"""
+    
+    __tablename__ = "user_activity_contents"
+    
+    activity_id = Column(
+        Integer, ForeignKey("user_activities.id", ondelete="CASCADE"), primary_key=True
+    )
+    body = Column(CompressedText)
+
 class UserActivity(Base):
     __tablename__ = "user_activities"
     
@@ -15,10 +48,23 @@ class UserActivity(Base):
     platform = Column(String)
     url = Column(String)
     title = Column(String)
-    content = Column(Text)
     extracted_data = Column(JSON)
     timestamp = Column(DateTime, default=func.now())
     created_at = Column(DateTime, default=func.now())
+    
+    # Raw content lives in user_activity_contents; it is only populated when
+    # the query asks for it (see DatabaseManager.get_user_activities).
+    content_record = relationship(
+        ActivityContent, uselist=False, lazy="noload", cascade="all, delete-orphan"
+    )
+    
+    @property
+    def content(self) -> Optional[str]:
+        return self.content_record.body if self.content_record else None
+    
+    @content.setter
+    def content(self, value: Optional[str]):
+        self.content_record = ActivityContent(body=value) if value is not None else None
 
 class UserProfile(Base):
     __tablename__ = "user_profiles"
@@ -29,6 +75,29 @@ class UserProfile(Base):
     last_updated = Column(DateTime, default=func.now())
     created_at = Column(DateTime, default=func.now())
 
+class LLMUsage(Base):
+    """One LLM call: tokens, latency and prompt-cache use, attributed to a user and crawl"""
+    
+    __tablename__ = "llm_usage"
+    
+    id = Column(Integer, primary_key=True)
+    created_at = Column(DateTime, default=func.now(), index=True)
+    user_id = Column(String, index=True)
+    scope_id = Column(String, index=True)  # crawl or profile generation the call belonged to
+    operation = Column(String)
+    platform = Column(String)
+    route = Column(String)  # "extraction" or "summary"
+    model = Column(String)
+    pages = Column(Integer, default=1)
+    prompt_tokens = Column(Integer, default=0)
+    completion_tokens = Column(Integer, default=0)
+    total_tokens = Column(Integer, default=0)
+    cached_tokens = Column(Integer, default=0)
+    cache_hit = Column(Boolean, default=False)
+    latency_ms = Column(Float)
+    cost_usd = Column(Float)  # None when the model has no configured price
+    status = Column(String)
+
 # Pydantic models for API
 class ActivityCreate(BaseModel):
     user_id: str
@@ -61,4 +130,8 @@ class ProfileResponse(BaseModel):
 class CrawlRequest(BaseModel):
     user_id: str
     platforms: List[str] = ["github", "zhihu", "xiaohongshu"]
-    search_engines: List[str] = ["google", "bing"]
\ No newline at end of file
+    search_engines: List[str] = ["google", "bing"]
+    # Skip the crawl when this user already has activities stored within the window
+    fresh_within_minutes: Optional[int] = Field(None, ge=1)
+    # "sample" or "cprofile": profile the crawl run; needs the X-Admin-Token header
+    profile: Optional[str] = None
@@ -1,26 +1,121 @@
 import asyncio
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
 import time
-from src.collectors import GitHubCollector, ZhihuCollector, SearchEngineCollector
-from src.extractors import LLMExtractor  
+from src.collectors import (
+    GitHubCollector, ZhihuCollector, XiaohongshuCollector, SearchEngineCollector, PageCollector, CrawlFrontier
+)
+from src.extractors import LLMExtractor, llm_gate
+from src.extractors.routing import model_router
+from src.extractors.usage import LLMBudgetExceeded, llm_usage
 from src.storage.database import db_manager
+from src.storage.archive import page_archive
 from src.config import config
+from src.utils.offload import cpu_offloader
 from src.utils.logger import get_logger, LogContext
+from src.utils.tracing import tracer
+
+# Rough pickled size of one statistics row, for the offload threshold
+STATISTICS_ROW_BYTES = 64
+
+def compute_activity_statistics(rows: List[Tuple[str, datetime, Optional[str]]]) -> Dict[str, Any]:
+    """Statistics over (platform, timestamp, activity_type) rows; activity_type is None without extracted data"""
+    stats = {
+        "platform_breakdown": {},
+        "content_types": {},
+        "engagement_patterns": {},
+        "date_range": {},
+        "activity_frequency": {}
+    }
+    
+    if not rows:
+        return stats
+    
+    # Platform breakdown
+    for platform, _, _ in rows:
+        stats["platform_breakdown"][platform] = stats["platform_breakdown"].get(platform, 0) + 1
+    
+    # Date range and frequency
+    dates = [timestamp for _, timestamp, _ in rows]
+    if dates:
+        earliest = min(dates)
+        latest = max(dates)
+        stats["date_range"] = {
+            "earliest_activity": earliest.isoformat(),
+            "latest_activity": latest.isoformat(),
+            "span_days": (latest - earliest).days
+        }
+        
+        # Activity frequency by month
+        monthly_counts = {}
+        for date in dates:
+            month_key = date.strftime("%Y-%m")
+            monthly_counts[month_key] = monthly_counts.get(month_key, 0) + 1
+        stats["activity_frequency"] = monthly_counts
+    
+    # Content types from extracted data
+    for _, _, activity_type in rows:
+        if activity_type is not None:
+            stats["content_types"][activity_type] = stats["content_types"].get(activity_type, 0) + 1
+    
+    return stats
 
 class UserProfiler:
+    """Crawl, extract and profile users.
+    
+    Collectors and the LLM extractor are built on first use, so importing
+    the module (and constructing the global instance) stays cheap and
+    doesn't require OPENAI_API_KEY until an LLM call is actually made.
+    """
+    
     def __init__(self):
-        self.collectors = {
-            "github": GitHubCollector(),
-            "zhihu": ZhihuCollector(),
-        }
-        self.search_collectors = {
-            engine: SearchEngineCollector(engine) 
-            for engine in config.SEARCH_ENGINES
-        }
-        self.llm_extractor = LLMExtractor()
+        self._collectors: Optional[Dict[str, Any]] = None
+        self._search_collectors: Optional[Dict[str, SearchEngineCollector]] = None
+        self._page_collector: Optional[PageCollector] = None
+        self._llm_extractor: Optional[LLMExtractor] = None
         self.db = db_manager
     
+    @property
+    def collectors(self) -> Dict[str, Any]:
+        if self._collectors is None:
+            self._collectors = {
+                "github": GitHubCollector(),
+                "zhihu": ZhihuCollector(),
+                "xiaohongshu": XiaohongshuCollector(),
+            }
+        return self._collectors
+    
+    @property
+    def search_collectors(self) -> Dict[str, SearchEngineCollector]:
+        if self._search_collectors is None:
+            self._search_collectors = {
+                engine: SearchEngineCollector(engine) 
+                for engine in config.SEARCH_ENGINES
+            }
+        return self._search_collectors
+    
+    @property
+    def page_collector(self) -> PageCollector:
+        if self._page_collector is None:
+            self._page_collector = PageCollector()
+        return self._page_collector
+    
+    @property
+    def llm_extractor(self) -> LLMExtractor:
+        if self._llm_extractor is None:
+            self._llm_extractor = LLMExtractor()
+        return self._llm_extractor
+    
+    @llm_extractor.setter
+    def llm_extractor(self, extractor: LLMExtractor):
+        self._llm_extractor = extractor
+    
+    def get_batch_stats(self) -> Dict[str, int]:
+        # Don't build the extractor (and require an API key) just to report zeros
+        if self._llm_extractor is None:
+            return {"requests": 0, "pages": 0, "splits": 0}
+        return self._llm_extractor.get_batch_stats()
+    
     async def crawl_user_data(
         self, 
         user_id: str, 
@@ -30,7 +125,9 @@ class UserProfiler:
     ) -> Dict[str, Any]:
         start_time = time.time()
         
-        with LogContext(user_id=user_id, operation="crawl_user_data") as log_ctx:
+        with LogContext(user_id=user_id, operation="crawl_user_data") as log_ctx, \
+                tracer.span("crawl", user_id=user_id, use_llm=use_llm) as crawl_span, \
+                llm_usage.scope(user_id) as usage_scope:
             if not platforms:
                 platforms = ["github", "zhihu"]
             if not search_engines:
@@ -56,8 +153,13 @@ class UserProfiler:
                     try:
                         log_ctx.info(f"Starting {platform} data collection", platform=platform)
                         platform_start = time.time()
+                        collector = self.collectors[platform]
+                        # Read before this crawl's pages are stored, so only earlier crawls count as known
+                        known_entries = await self.db.get_known_entries(user_id, platform)
                         
-                        platform_data = await self.collectors[platform].collect_user_data(user_id)
+                        with tracer.span("collect", platform=platform) as span:
+                            platform_data = await collector.collect_user_data(user_id)
+                            span.set(items=len(platform_data))
                         
                         platform_duration = time.time() - platform_start
                         log_ctx.info(
@@ -67,64 +169,173 @@ class UserProfiler:
                             duration=f"{platform_duration:.2f}s"
                         )
                         
-                        for item in platform_data:
-                            # Enhanced extraction with LLM if enabled
-                            if use_llm and item.get("content"):
-                                try:
-                                    log_ctx.debug(f"Enhancing data with LLM for {item['url']}", url=item['url'])
-                                    enhanced_data = self.llm_extractor.extract_structured_info(
-                                        item["content"],
-                                        item["platform"], 
-                                        item["url"]
-                                    )
-                                    # Merge LLM extraction with original data
-                                    item["extracted_data"].update(enhanced_data)
-                                    log_ctx.debug(f"LLM extraction completed for {item['url']}")
-                                except Exception as e:
-                                    log_ctx.warning(f"LLM extraction failed for {item['url']}: {str(e)}", url=item['url'])
-                            
-                            # Store in database
-                            await self.db.add_activity(item)
-                            results["collected_data"].append(item)
-                            log_ctx.debug(f"Stored activity: {item['title']}", url=item['url'])
-                            
+                        await self._store_items(user_id, platform_data, use_llm, results, log_ctx)
+                        log_ctx.debug(f"Stored {len(platform_data)} activities from {platform}", platform=platform)
+                        
+                        # Older pages of paginated listings, stored window by window as they arrive
+                        with tracer.span("paginate", platform=platform) as span:
+                            pages = 0
+                            async for page_items in collector.collect_more_pages(user_id, platform_data, known_entries):
+                                await self._store_items(user_id, page_items, use_llm, results, log_ctx)
+                                pages += len(page_items)
+                            span.set(pages=pages)
+                        if pages:
+                            log_ctx.info(f"Stored {pages} more listing pages from {platform}", platform=platform, pages=pages)
+                    
                     except Exception as e:
                         error_msg = f"Error crawling {platform}: {str(e)}"
                         log_ctx.error(error_msg, platform=platform)
                         results["errors"].append(error_msg)
-        
-        # Collect from search engines
-        for engine in search_engines:
-            if engine in self.search_collectors:
+            
+            # Collect from search engines
+            search_items = []
+            for engine in search_engines:
+                if engine in self.search_collectors:
+                    try:
+                        print(f"Searching {engine} for user: {user_id}")
+                        with tracer.span("search", engine=engine) as span:
+                            search_data = await self.search_collectors[engine].collect_user_data(user_id)
+                            span.set(items=len(search_data))
+                        
+                        await self._store_items(user_id, search_data, use_llm, results, log_ctx)
+                        search_items.extend(search_data)
+                    
+                    except Exception as e:
+                        error_msg = f"Error searching {engine}: {str(e)}"
+                        print(error_msg)
+                        results["errors"].append(error_msg)
+            
+            # Follow links discovered in search results under a page budget
+            if config.FRONTIER_ENABLED and search_items:
                 try:
-                    print(f"Searching {engine} for user: {user_id}")
-                    search_data = await self.search_collectors[engine].collect_user_data(user_id)
+                    frontier = CrawlFrontier(user_id, self.collectors, self.page_collector)
+                    for platform in platforms:
+                        if platform in self.collectors:
+                            frontier.mark_seen(self.collectors[platform].build_search_urls(user_id))
+                    frontier.add_search_results(search_items)
                     
-                    for item in search_data:
-                        if use_llm and item.get("content"):
-                            try:
-                                enhanced_data = self.llm_extractor.extract_structured_info(
-                                    item["content"],
-                                    item["platform"],
-                                    item["url"]
-                                )
-                                item["extracted_data"].update(enhanced_data)
-                            except Exception as e:
-                                print(f"LLM extraction error for search result: {str(e)}")
-                        
-                        await self.db.add_activity(item)
-                        results["collected_data"].append(item)
-                        
+                    log_ctx.info(f"Crawling {len(frontier.queue)} discovered links", queued=len(frontier.queue))
+                    with tracer.span("frontier", queued=len(frontier.queue)) as span:
+                        discovered_data = await frontier.run()
+                        span.set(items=len(discovered_data))
+                    await self._store_items(user_id, discovered_data, use_llm, results, log_ctx)
                 except Exception as e:
-                    error_msg = f"Error searching {engine}: {str(e)}"
-                    print(error_msg)
+                    error_msg = f"Error crawling discovered links: {str(e)}"
+                    log_ctx.error(error_msg)
                     results["errors"].append(error_msg)
+            
+            if use_llm:
+                results["llm_usage"] = usage_scope.summary()
+            crawl_span.set(items=len(results["collected_data"]), errors=len(results["errors"]))
+            return results
+    
+    async def _store_items(
+        self,
+        user_id: str,
+        items: List[Dict[str, Any]],
+        use_llm: bool,
+        results: Dict[str, Any],
+        log_ctx: LogContext
+    ):
+        for item in items:
+            item["user_id"] = user_id
+            self._archive_item(user_id, item, log_ctx)
         
-        return results
+        # Enhanced extraction with LLM if enabled
+        if use_llm:
+            await llm_usage.load_daily(self.db)
+            # The OpenAI SDK call blocks; run it on the extraction route's threads
+            with tracer.span("llm.enhance", items=len(items)):
+                await model_router.run("extraction", self._enhance_items, items, log_ctx)
+            await llm_usage.flush(self.db)
+        
+        with tracer.span("db.write", rows=len(items)):
+            pending_writes = []
+            for item in items:
+                # Queue for the next group commit; the full page is only needed up to here
+                item.pop("raw_content", None)
+                pending_writes.append(self.db.submit_activity(item))
+                results["collected_data"].append(item)
+            
+            await asyncio.gather(*pending_writes)
+    
+    def _enhance_items(self, items: List[Dict[str, Any]], log_ctx: LogContext):
+        # Pages whose required fields the rules already got confidently skip the LLM
+        llm_items = [item for item in items if item.get("content") and llm_gate.needs_llm(item)]
+        if not llm_items:
+            return
+        
+        exhausted = llm_usage.exhausted()
+        if exhausted:
+            log_ctx.warning(f"{exhausted} LLM token budget spent, keeping rule-only extraction for {len(llm_items)} items")
+            llm_usage.skip_pages(len(llm_items))
+            return
+        
+        # Several pages share one request; the full page goes to the reducer,
+        # the stored content is only a preview
+        if config.LLM_BATCH_ENABLED and len(llm_items) > 1:
+            try:
+                log_ctx.debug(f"Enhancing {len(llm_items)} items with one batched LLM extraction")
+                start = time.perf_counter()
+                enhanced = self.llm_extractor.extract_batch([
+                    {
+                        "content": item.get("raw_content") or item["content"],
+                        "platform": item["platform"],
+                        "url": item["url"]
+                    }
+                    for item in llm_items
+                ])
+                llm_gate.record_latency([item["platform"] for item in llm_items], time.perf_counter() - start)
+                for item, enhanced_data in zip(llm_items, enhanced):
+                    self._merge_enhanced(item, enhanced_data, log_ctx)
+                log_ctx.debug(f"Batched LLM extraction completed for {len(llm_items)} items")
+                return
+            except Exception as e:
+                # Same as a malformed batch that splits down to single pages
+                log_ctx.warning(f"Batched LLM extraction failed, extracting {len(llm_items)} items one by one: {str(e)}")
+        
+        for index, item in enumerate(llm_items):
+            try:
+                log_ctx.debug(f"Enhancing data with LLM for {item['url']}", url=item['url'])
+                start = time.perf_counter()
+                enhanced_data = self.llm_extractor.extract_structured_info(
+                    item.get("raw_content") or item["content"],
+                    item["platform"], 
+                    item["url"]
+                )
+                llm_gate.record_latency([item["platform"]], time.perf_counter() - start)
+                # Merge LLM extraction with original data
+                if self._merge_enhanced(item, enhanced_data, log_ctx):
+                    log_ctx.debug(f"LLM extraction completed for {item['url']}")
+            except LLMBudgetExceeded as e:
+                log_ctx.warning(f"{str(e)}, keeping rule-only extraction for {len(llm_items) - index} items")
+                llm_usage.skip_pages(len(llm_items) - index)
+                return
+            except Exception as e:
+                log_ctx.warning(f"LLM extraction failed for {item['url']}: {str(e)}", url=item['url'])
+    
+    def _merge_enhanced(self, item: Dict[str, Any], enhanced_data: Dict[str, Any], log_ctx: LogContext) -> bool:
+        """Merge LLM output into the item; a failed extraction leaves the rule-only data untouched"""
+        if "error" in enhanced_data:
+            log_ctx.warning(f"LLM extraction failed for {item['url']}: {enhanced_data['error']}", url=item['url'])
+            return False
+        llm_gate.merge(item["extracted_data"], enhanced_data)
+        return True
+    
+    def _archive_item(self, user_id: str, item: Dict[str, Any], log_ctx: LogContext):
+        raw_content = item.get("raw_content")
+        if not config.ARCHIVE_ENABLED or not raw_content:
+            return
+        if item["extracted_data"].get("serp_cache_hit"):
+            return
+        try:
+            page_archive.append(item["platform"], user_id, item["url"], raw_content)
+        except OSError as e:
+            log_ctx.warning(f"Failed to archive {item['url']}: {str(e)}", url=item['url'])
     
     async def generate_user_profile(self, user_id: str) -> Dict[str, Any]:
         # Get all user activities
-        activities = await self.db.get_user_activities(user_id)
+        activities = await self.db.get_user_activities(user_id, with_content=True)
         
         if not activities:
             return {
@@ -146,9 +357,14 @@ class UserProfiler:
             for activity in activities
         ]
         
-        # Generate profile with LLM
+        # Generate profile with LLM; only the daily token budget applies here
         try:
-            llm_profile = self.llm_extractor.generate_profile_summary(activity_dicts)
+            await llm_usage.load_daily(self.db)
+            with llm_usage.scope(user_id, "profile", budget=0):
+                llm_profile = await model_router.run(
+                    "summary", self.llm_extractor.generate_profile_summary, activity_dicts
+                )
+            await llm_usage.flush(self.db)
         except Exception as e:
             print(f"Error generating LLM profile: {str(e)}")
             llm_profile = {"error": str(e)}
@@ -181,47 +397,18 @@ class UserProfiler:
         return profile
     
     async def _generate_statistics(self, activities: List) -> Dict[str, Any]:
-        stats = {
-            "platform_breakdown": {},
-            "content_types": {},
-            "engagement_patterns": {},
-            "date_range": {},
-            "activity_frequency": {}
-        }
-        
-        if not activities:
-            return stats
-        
-        # Platform breakdown
-        for activity in activities:
-            platform = activity.platform
-            stats["platform_breakdown"][platform] = stats["platform_breakdown"].get(platform, 0) + 1
-        
-        # Date range and frequency
-        dates = [activity.timestamp for activity in activities]
-        if dates:
-            earliest = min(dates)
-            latest = max(dates)
-            stats["date_range"] = {
-                "earliest_activity": earliest.isoformat(),
-                "latest_activity": latest.isoformat(),
-                "span_days": (latest - earliest).days
-            }
-            
-            # Activity frequency by month
-            monthly_counts = {}
-            for date in dates:
-                month_key = date.strftime("%Y-%m")
-                monthly_counts[month_key] = monthly_counts.get(month_key, 0) + 1
-            stats["activity_frequency"] = monthly_counts
-        
-        # Content types from extracted data
-        for activity in activities:
-            if activity.extracted_data:
-                activity_type = activity.extracted_data.get("activity_type", "unknown")
-                stats["content_types"][activity_type] = stats["content_types"].get(activity_type, 0) + 1
-        
-        return stats
+        # Plain tuples so the rows can be shipped to the CPU pool
+        rows = [
+            (
+                activity.platform,
+                activity.timestamp,
+                activity.extracted_data.get("activity_type", "unknown") if activity.extracted_data else None
+            )
+            for activity in activities
+        ]
+        if cpu_offloader.worth_offloading(len(rows) * STATISTICS_ROW_BYTES):
+            return await cpu_offloader.run(compute_activity_statistics, rows)
+        return compute_activity_statistics(rows)
     
     def _extract_timeline_highlights(self, activities: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         # Extract significant events for timeline highlights
@@ -268,7 +455,7 @@ class UserProfiler:
         
         if "repositories_count" in extracted:
             score += min(float(extracted.get("repositories_count", 0)) / 10, 1.5)
-            
+        
         return score
 
 # Global profiler instance
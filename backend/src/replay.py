@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""Re-run collector extraction over archived pages without touching the network.
+
+Usage:
+    python -m src.replay --platform github [--user-id ID] [--llm] [--workers N]
+                         [--output replay.jsonl] [--apply]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.collectors.registry import create_collector
+from src.storage.archive import PageArchive
+from src.utils.logger import LogContext
+
+REPLAY_CHUNK_SIZE = 200
+
+# Set when the page was first fetched; a replay must not overwrite them
+FETCH_FIELDS = ("fetch_tier", "timestamp")
+
+def replay_chunk(archive_dir: str, records: List[Dict[str, Any]], use_llm: bool) -> List[Dict[str, Any]]:
+    """Worker entry point: extract every record in the chunk from the archive.
+    
+    Pages go through the same build_item, confidence scoring and LLM gate
+    (batched per user) as a live crawl.
+    """
+    archive = PageArchive(archive_dir)
+    collectors = {}
+    
+    results = []
+    for record in records:
+        platform = record["platform"]
+        if platform not in collectors:
+            collectors[platform] = create_collector(platform)
+        collector = collectors[platform]
+        if collector is None:
+            continue
+        
+        item = collector.build_item(record["url"], archive.read(record), "archive")
+        results.append({
+            "user_id": record["user_id"],
+            "platform": platform,
+            "url": record["url"],
+            "fetched_at": record["fetched_at"],
+            "extracted_data": item["extracted_data"] if item else None,
+            "item": item
+        })
+    archive.close()
+    
+    if use_llm:
+        by_user: Dict[str, List[Dict[str, Any]]] = {}
+        for result in results:
+            if result["item"]:
+                by_user.setdefault(result["user_id"], []).append(result["item"])
+        asyncio.run(enhance_with_database(by_user))
+    
+    for result in results:
+        result.pop("item")
+        for key in FETCH_FIELDS:
+            (result["extracted_data"] or {}).pop(key, None)
+    return results
+
+async def enhance_replayed(items_by_user: Dict[str, List[Dict[str, Any]]], db):
+    """LLM pass over replayed items, accounted like a crawl: one usage scope (and crawl budget) per user"""
+    from src.extractors.routing import model_router
+    from src.extractors.usage import llm_usage
+    from src.profiler.user_profiler import user_profiler
+    for user_id, items in items_by_user.items():
+        await llm_usage.load_daily(db)
+        with llm_usage.scope(user_id, "replay"), LogContext(user_id=user_id, operation="replay") as log_ctx:
+            await model_router.run("extraction", user_profiler._enhance_items, items, log_ctx)
+        await llm_usage.flush(db)
+
+async def enhance_with_database(items_by_user: Dict[str, List[Dict[str, Any]]]):
+    from src.storage.database import db_manager
+    await db_manager.init_db()
+    try:
+        await enhance_replayed(items_by_user, db_manager)
+    finally:
+        await db_manager.close()
+
+async def apply_results(results: List[Dict[str, Any]], db) -> int:
+    """Merge replayed fields into the latest stored activity; fields the replay didn't produce are kept"""
+    updated = 0
+    for result in results:
+        if result["extracted_data"] and await db.update_extracted_data(
+            result["user_id"], result["url"], result["extracted_data"], merge=True
+        ):
+            updated += 1
+    return updated
+
+async def apply_to_database(results: List[Dict[str, Any]]) -> int:
+    from src.storage.database import db_manager
+    await db_manager.init_db()
+    try:
+        return await apply_results(results, db_manager)
+    finally:
+        await db_manager.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay extraction over archived pages")
+    parser.add_argument("--platform", help="Only replay pages from this platform")
+    parser.add_argument("--user-id", help="Only replay pages for this user")
+    parser.add_argument("--archive-dir", help="Archive directory (defaults to ARCHIVE_DIR)")
+    parser.add_argument("--llm", action="store_true", help="Also re-run LLM extraction")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--output", help="Write results as JSON lines to this file")
+    parser.add_argument("--apply", action="store_true",
+                        help="Merge results into extracted_data of the latest matching stored activity")
+    args = parser.parse_args()
+    
+    archive = PageArchive(args.archive_dir)
+    records = list(archive.records(platform=args.platform, user_id=args.user_id))
+    if not records:
+        print("No archived pages match the given filters")
+        return
+    
+    chunks = [records[i:i + REPLAY_CHUNK_SIZE] for i in range(0, len(records), REPLAY_CHUNK_SIZE)]
+    print(f"Replaying {len(records)} pages in {len(chunks)} chunks with {args.workers} workers...")
+    
+    results = []
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = [
+            pool.submit(replay_chunk, str(archive.directory), chunk, args.llm)
+            for chunk in chunks
+        ]
+        for future in futures:
+            results.extend(future.result())
+    
+    extracted = sum(1 for result in results if result["extracted_data"])
+    print(f"Extracted data from {extracted}/{len(results)} pages")
+    
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            for result in results:
+                output.write(json.dumps(result, ensure_ascii=False) + "\n")
+        print(f"Results written to {args.output}")
+    
+    if args.apply:
+        updated = asyncio.run(apply_to_database(results))
+        print(f"Updated {updated} stored activities")
+
+if __name__ == "__main__":
+    main()
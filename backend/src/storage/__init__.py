@@ -1,3 +1,4 @@
 from .database import DatabaseManager, db_manager
+from .archive import PageArchive, page_archive
 
-__all__ = ["DatabaseManager", "db_manager"]
\ No newline at end of file
+__all__ = ["DatabaseManager", "db_manager", "PageArchive", "page_archive"]
\ No newline at end of file
@@ -0,0 +1,111 @@
+import json
+import mmap
+import struct
+import threading
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+from src.config import config
+
+SEGMENT_PREFIX = "segment-"
+SEGMENT_SUFFIX = ".dat"
+INDEX_FILE = "index.jsonl"
+LENGTH_HEADER = struct.Struct("<I")
+
+class PageArchive:
+    """Append-only store for full fetched markdown.
+    
+    Pages are zlib-compressed and appended to numbered segment files, each
+    record prefixed with its length so a segment can be rescanned without the
+    index. index.jsonl maps every record to (segment, offset, length) plus the
+    user, platform and URL it came from. Reads go through cached mmaps.
+    """
+    
+    def __init__(self, directory: str = None, segment_bytes: int = None):
+        self.directory = Path(directory or config.ARCHIVE_DIR)
+        self.segment_bytes = segment_bytes or config.ARCHIVE_SEGMENT_BYTES
+        self._lock = threading.Lock()
+        self._maps: Dict[int, mmap.mmap] = {}
+        self._segment: Optional[int] = None
+    
+    def _segment_path(self, segment: int) -> Path:
+        return self.directory / f"{SEGMENT_PREFIX}{segment:06d}{SEGMENT_SUFFIX}"
+    
+    def _active_segment(self, incoming: int) -> int:
+        if self._segment is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            existing = [
+                int(path.name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)])
+                for path in self.directory.glob(f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}")
+            ]
+            self._segment = max(existing, default=0)
+        
+        path = self._segment_path(self._segment)
+        if path.exists() and path.stat().st_size + incoming > self.segment_bytes:
+            self._segment += 1
+        return self._segment
+    
+    def append(self, platform: str, user_id: str, url: str, markdown: str) -> Dict[str, Any]:
+        payload = zlib.compress(markdown.encode("utf-8"), config.ARCHIVE_COMPRESSION_LEVEL)
+        
+        with self._lock:
+            segment = self._active_segment(LENGTH_HEADER.size + len(payload))
+            with open(self._segment_path(segment), "ab") as data_file:
+                offset = data_file.tell() + LENGTH_HEADER.size
+                data_file.write(LENGTH_HEADER.pack(len(payload)))
+                data_file.write(payload)
+            
+            record = {
+                "segment": segment,
+                "offset": offset,
+                "length": len(payload),
+                "platform": platform,
+                "user_id": user_id,
+                "url": url,
+                "fetched_at": datetime.now().isoformat()
+            }
+            with open(self.directory / INDEX_FILE, "a", encoding="utf-8") as index_file:
+                index_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        return record
+    
+    def _map(self, segment: int, end: int) -> mmap.mmap:
+        mapped = self._maps.get(segment)
+        if mapped is None or len(mapped) < end:
+            # The active segment keeps growing; remap to cover new records
+            if mapped is not None:
+                mapped.close()
+            with open(self._segment_path(segment), "rb") as data_file:
+                mapped = mmap.mmap(data_file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps[segment] = mapped
+        return mapped
+    
+    def read(self, record: Dict[str, Any]) -> str:
+        start = record["offset"]
+        end = start + record["length"]
+        mapped = self._map(record["segment"], end)
+        return zlib.decompress(mapped[start:end]).decode("utf-8")
+    
+    def records(self, platform: str = None, user_id: str = None) -> Iterator[Dict[str, Any]]:
+        index_path = self.directory / INDEX_FILE
+        if not index_path.exists():
+            return
+        with open(index_path, encoding="utf-8") as index_file:
+            for line in index_file:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if platform and record["platform"] != platform:
+                    continue
+                if user_id and record["user_id"] != user_id:
+                    continue
+                yield record
+    
+    def close(self):
+        for mapped in self._maps.values():
+            mapped.close()
+        self._maps.clear()
+
+# Global archive instance
+page_archive = PageArchive()
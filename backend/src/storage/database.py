@@ -1,60 +1,195 @@
 import asyncio
+import time
+import orjson
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Set, Tuple
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy import select, desc
-from src.models import Base, UserActivity, UserProfile, ActivityCreate
+from sqlalchemy.orm import sessionmaker, selectinload
+from sqlalchemy import select, desc, event, func, inspect, text, case, Integer, String, DateTime, Float
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import OperationalError
+from src.models import Base, UserActivity, UserProfile, ActivityContent, ActivityCreate, LLMUsage
+from src.storage.writer import ActivityWriter
+from src.storage.search import (
+    FTS_TABLE, RANK_EXPRESSION, DELETE_FTS_ROW, INSERT_FTS_ROW,
+    build_match_query, create_search_index, fts_row, index_rows
+)
 from src.config import config
 
+MIGRATION_BATCH_SIZE = 1000
+
+def _json_serializer(value: Any) -> str:
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+
+def _migrate_inline_content(sync_conn):
+    """Move content stored inline on user_activities into the compressed side table"""
+    columns = {column["name"] for column in inspect(sync_conn).get_columns("user_activities")}
+    if "content" not in columns:
+        return
+    
+    rows = sync_conn.execute(
+        text("SELECT id, content FROM user_activities WHERE content IS NOT NULL")
+    )
+    contents = ActivityContent.__table__
+    while True:
+        batch = rows.fetchmany(MIGRATION_BATCH_SIZE)
+        if not batch:
+            break
+        sync_conn.execute(
+            contents.insert(),
+            [{"activity_id": row.id, "body": row.content} for row in batch]
+        )
+    
+    try:
+        sync_conn.execute(text("ALTER TABLE user_activities DROP COLUMN content"))
+    except OperationalError:
+        # SQLite < 3.35 cannot drop columns; clear the data so pages shrink on VACUUM
+        sync_conn.execute(text("UPDATE user_activities SET content = NULL"))
+
+def _migrate_llm_usage(sync_conn):
+    """Add columns introduced after the llm_usage table was first created"""
+    columns = {column["name"] for column in inspect(sync_conn).get_columns("llm_usage")}
+    for name, column_type in (("route", "VARCHAR"), ("cost_usd", "FLOAT")):
+        if name not in columns:
+            sync_conn.execute(text(f"ALTER TABLE llm_usage ADD COLUMN {name} {column_type}"))
+
+def _merge_extracted_data(stored: Dict[str, Any], update: Dict[str, Any]) -> Dict[str, Any]:
+    """Stored fields the update doesn't mention survive; field confidences are merged per field"""
+    merged = {**stored, **update}
+    confidence = {**(stored.get("field_confidence") or {}), **(update.get("field_confidence") or {})}
+    if confidence:
+        merged["field_confidence"] = confidence
+    return merged
+
+def _build_activity(activity_data: Dict[str, Any]) -> UserActivity:
+    timestamp = activity_data.get("timestamp")
+    if isinstance(timestamp, str):
+        timestamp = datetime.fromisoformat(timestamp)
+    
+    # Defaults are set client-side so a committed batch needs no refresh round-trip
+    return UserActivity(
+        user_id=activity_data["user_id"],
+        platform=activity_data["platform"],
+        url=activity_data["url"],
+        title=activity_data.get("title"),
+        content=activity_data.get("content"),
+        extracted_data=activity_data.get("extracted_data"),
+        timestamp=timestamp or datetime.now(),
+        created_at=datetime.now()
+    )
+
+def _sqlite_pragmas(read_only: bool) -> List[str]:
+    pragmas = [
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        f"PRAGMA busy_timeout={config.SQLITE_BUSY_TIMEOUT_MS}",
+        f"PRAGMA mmap_size={config.SQLITE_MMAP_SIZE}",
+        f"PRAGMA cache_size=-{config.SQLITE_CACHE_SIZE_KB}",
+    ]
+    if read_only:
+        pragmas.append("PRAGMA query_only=ON")
+    return pragmas
+
 class DatabaseManager:
     def __init__(self):
-        self.engine = create_async_engine(config.DATABASE_URL)
+        url = make_url(config.DATABASE_URL)
+        self.search_enabled = url.get_backend_name() == "sqlite"
+        self.sqlite_tuned = (
+            config.SQLITE_TUNED
+            and url.get_backend_name() == "sqlite"
+            and url.database not in (None, "", ":memory:")
+        )
+        
+        if self.sqlite_tuned:
+            # SQLite allows one writer at a time: funnel all writes through a
+            # single connection and serve reads from a separate WAL reader pool
+            self.engine = self._create_engine(pool_size=1, max_overflow=0)
+            self.read_engine = self._create_engine(
+                pool_size=config.DB_READER_POOL_SIZE, max_overflow=0, read_only=True
+            )
+        else:
+            self.engine = self._create_engine()
+            self.read_engine = self.engine
+        
         self.async_session = sessionmaker(
             self.engine, class_=AsyncSession, expire_on_commit=False
         )
+        self.read_session = sessionmaker(
+            self.read_engine, class_=AsyncSession, expire_on_commit=False
+        )
+        self.writer = ActivityWriter(
+            self.async_session,
+            max_batch_size=config.DB_WRITE_BATCH_SIZE,
+            max_delay_ms=config.DB_WRITE_BATCH_MS,
+            on_flush=self._index_activities if self.search_enabled else None
+        )
+    
+    def _create_engine(self, read_only: bool = False, **pool_options):
+        engine = create_async_engine(
+            config.DATABASE_URL,
+            json_serializer=_json_serializer,
+            json_deserializer=orjson.loads,
+            **pool_options
+        )
+        
+        if self.sqlite_tuned:
+            pragmas = _sqlite_pragmas(read_only)
+            
+            @event.listens_for(engine.sync_engine, "connect")
+            def set_sqlite_pragmas(dbapi_connection, connection_record):
+                cursor = dbapi_connection.cursor()
+                for pragma in pragmas:
+                    cursor.execute(pragma)
+                cursor.close()
+        
+        return engine
     
     async def init_db(self):
         async with self.engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
+            await conn.run_sync(_migrate_inline_content)
+            await conn.run_sync(_migrate_llm_usage)
+            if self.search_enabled:
+                await conn.run_sync(create_search_index)
+    
+    async def _index_activities(self, session: AsyncSession, activities: List[UserActivity]):
+        """Add freshly flushed activities to the full-text index in the same transaction"""
+        rows = [
+            fts_row(activity.id, activity.title, activity.content, activity.extracted_data)
+            for activity in activities
+        ]
+        await session.run_sync(lambda sync_session: index_rows(sync_session.connection(), rows))
+    
+    def submit_activity(self, activity_data: Dict[str, Any]) -> asyncio.Future:
+        """Queue an activity for the next group commit; the future resolves with its id"""
+        return self.writer.submit(_build_activity(activity_data))
     
     async def add_activity(self, activity_data: Dict[str, Any]) -> UserActivity:
-        async with self.async_session() as session:
-            activity = UserActivity(
-                user_id=activity_data["user_id"],
-                platform=activity_data["platform"],
-                url=activity_data["url"],
-                title=activity_data.get("title"),
-                content=activity_data.get("content"),
-                extracted_data=activity_data.get("extracted_data"),
-                timestamp=datetime.fromisoformat(activity_data["timestamp"]) 
-                    if isinstance(activity_data.get("timestamp"), str)
-                    else activity_data.get("timestamp", datetime.now())
-            )
-            
-            session.add(activity)
-            await session.commit()
-            await session.refresh(activity)
-            return activity
+        activity = _build_activity(activity_data)
+        await self.writer.submit(activity)
+        return activity
     
     async def get_user_activities(
         self, 
         user_id: str, 
         platform: Optional[str] = None,
-        limit: int = 100
+        limit: int = 100,
+        with_content: bool = False
     ) -> List[UserActivity]:
-        async with self.async_session() as session:
+        async with self.read_session() as session:
             query = select(UserActivity).where(UserActivity.user_id == user_id)
             
             if platform:
                 query = query.where(UserActivity.platform == platform)
-                
+            if with_content:
+                query = query.options(selectinload(UserActivity.content_record))
+            
             query = query.order_by(desc(UserActivity.timestamp)).limit(limit)
             result = await session.execute(query)
             return result.scalars().all()
     
     async def get_timeline_data(self, user_id: str) -> List[Dict[str, Any]]:
-        activities = await self.get_user_activities(user_id)
+        activities = await self.get_user_activities(user_id, with_content=True)
         timeline = []
         
         for activity in activities:
@@ -87,6 +222,89 @@ class DatabaseManager:
             for date, activities in sorted(grouped_timeline.items(), reverse=True)
         ]
     
+    async def update_extracted_data(
+        self, user_id: str, url: str, extracted_data: Dict[str, Any], merge: bool = False
+    ) -> Optional[int]:
+        """Replace (or with merge, update) extracted_data on the latest activity for (user_id, url); returns its id"""
+        async with self.async_session() as session:
+            result = await session.execute(
+                select(UserActivity)
+                .where(UserActivity.user_id == user_id, UserActivity.url == url)
+                .order_by(desc(UserActivity.created_at), desc(UserActivity.id))
+                .options(selectinload(UserActivity.content_record))
+                .limit(1)
+            )
+            activity = result.scalar_one_or_none()
+            if activity is None:
+                return None
+            if merge:
+                extracted_data = _merge_extracted_data(activity.extracted_data or {}, extracted_data)
+            
+            if self.search_enabled:
+                await session.execute(DELETE_FTS_ROW, fts_row(
+                    activity.id, activity.title, activity.content, activity.extracted_data
+                ))
+                await session.execute(INSERT_FTS_ROW, fts_row(
+                    activity.id, activity.title, activity.content, extracted_data
+                ))
+            activity.extracted_data = extracted_data
+            await session.commit()
+            return activity.id
+    
+    async def search_activities(
+        self,
+        query: str,
+        user_id: Optional[str] = None,
+        platform: Optional[str] = None,
+        limit: int = 20,
+        offset: int = 0
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        """Full-text search over title, content and extracted topics, best match first"""
+        match = build_match_query(query)
+        if not match:
+            return 0, []
+        
+        filters = ""
+        params: Dict[str, Any] = {"match": match, "limit": limit, "offset": offset}
+        if user_id:
+            filters += " AND a.user_id = :user_id"
+            params["user_id"] = user_id
+        if platform:
+            filters += " AND a.platform = :platform"
+            params["platform"] = platform
+        
+        source = (
+            f"FROM {FTS_TABLE} JOIN user_activities a ON a.id = {FTS_TABLE}.rowid "
+            f"WHERE {FTS_TABLE} MATCH :match{filters}"
+        )
+        columns = UserActivity.__table__.c
+        results_query = text(
+            f"SELECT a.id, a.user_id, a.platform, a.url, a.title, a.extracted_data, "
+            f"a.timestamp, {RANK_EXPRESSION} AS rank {source} "
+            f"ORDER BY rank LIMIT :limit OFFSET :offset"
+        ).columns(
+            id=Integer, user_id=String, platform=String, url=String, title=String,
+            extracted_data=columns.extracted_data.type, timestamp=DateTime, rank=Float
+        )
+        
+        async with self.read_session() as session:
+            total = (await session.execute(text(f"SELECT COUNT(*) {source}"), params)).scalar()
+            rows = (await session.execute(results_query, params)).all()
+        
+        return total, [
+            {
+                "id": row.id,
+                "user_id": row.user_id,
+                "platform": row.platform,
+                "url": row.url,
+                "title": row.title,
+                "extracted_data": row.extracted_data,
+                "timestamp": row.timestamp,
+                "score": -row.rank
+            }
+            for row in rows
+        ]
+    
     async def save_user_profile(self, user_id: str, profile_data: Dict[str, Any]) -> UserProfile:
         async with self.async_session() as session:
             # Check if profile exists
@@ -101,7 +319,8 @@ class DatabaseManager:
             else:
                 profile = UserProfile(
                     user_id=user_id,
-                    profile_data=profile_data
+                    profile_data=profile_data,
+                    last_updated=datetime.now()  # Local time, like the update path
                 )
                 session.add(profile)
             
@@ -109,26 +328,115 @@ class DatabaseManager:
             await session.refresh(profile)
             return profile
     
-    async def get_user_profile(self, user_id: str) -> Optional[UserProfile]:
+    async def add_llm_usage(self, records: List[Dict[str, Any]]):
         async with self.async_session() as session:
+            session.add_all([LLMUsage(**record) for record in records])
+            await session.commit()
+    
+    async def get_llm_tokens_since(self, since: datetime) -> int:
+        async with self.read_session() as session:
+            result = await session.execute(
+                select(func.coalesce(func.sum(LLMUsage.total_tokens), 0)).where(LLMUsage.created_at >= since)
+            )
+            return int(result.scalar())
+    
+    async def get_llm_usage_summary(
+        self,
+        since: datetime,
+        group_by: str = "platform",
+        user_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Token, cost, cache and latency aggregates of LLM calls since a time, grouped by one dimension"""
+        key = {
+            "platform": LLMUsage.platform,
+            "user": LLMUsage.user_id,
+            "crawl": LLMUsage.scope_id,
+            "model": LLMUsage.model,
+            "route": LLMUsage.route,
+            "operation": LLMUsage.operation,
+            "day": func.date(LLMUsage.created_at)
+        }[group_by]
+        query = select(
+            key.label("key"),
+            func.count().label("calls"),
+            func.sum(LLMUsage.pages).label("pages"),
+            func.sum(LLMUsage.prompt_tokens).label("prompt_tokens"),
+            func.sum(LLMUsage.completion_tokens).label("completion_tokens"),
+            func.sum(LLMUsage.total_tokens).label("total_tokens"),
+            func.sum(LLMUsage.cached_tokens).label("cached_tokens"),
+            func.sum(case((LLMUsage.cache_hit, 1), else_=0)).label("cache_hits"),
+            func.avg(LLMUsage.latency_ms).label("avg_latency_ms"),
+            func.max(LLMUsage.latency_ms).label("max_latency_ms"),
+            func.coalesce(func.sum(LLMUsage.cost_usd), 0.0).label("cost_usd"),
+            func.sum(case((LLMUsage.status != "ok", 1), else_=0)).label("errors")
+        ).where(LLMUsage.created_at >= since)
+        if user_id:
+            query = query.where(LLMUsage.user_id == user_id)
+        query = query.group_by(key).order_by(desc("total_tokens"))
+        
+        async with self.read_session() as session:
+            result = await session.execute(query)
+            rows = []
+            for row in result.mappings():
+                row = dict(row)
+                row["avg_latency_ms"] = round(row["avg_latency_ms"] or 0.0, 1)
+                row["cost_usd"] = round(row["cost_usd"], 6)
+                rows.append(row)
+            return rows
+    
+    async def get_user_profile(self, user_id: str) -> Optional[UserProfile]:
+        async with self.read_session() as session:
             result = await session.execute(
                 select(UserProfile).where(UserProfile.user_id == user_id)
             )
             return result.scalar_one_or_none()
     
+    async def ping(self) -> float:
+        """Round-trip a trivial query through the reader pool; returns seconds"""
+        start = time.perf_counter()
+        async with self.read_session() as session:
+            await session.execute(text("SELECT 1"))
+        return time.perf_counter() - start
+    
+    async def get_last_activity_time(self, user_id: str) -> Optional[datetime]:
+        """When the most recent activity for this user was stored"""
+        async with self.read_session() as session:
+            result = await session.execute(
+                select(func.max(UserActivity.created_at)).where(UserActivity.user_id == user_id)
+            )
+            return result.scalar()
+    
+    async def get_known_entries(self, user_id: str, platform: str) -> Set[str]:
+        """Listing entries (repositories, answers, articles) already stored for this user on a platform"""
+        entries = func.json_extract(UserActivity.extracted_data, "$.entries")
+        async with self.read_session() as session:
+            result = await session.execute(
+                select(UserActivity.extracted_data).where(
+                    UserActivity.user_id == user_id,
+                    UserActivity.platform == platform,
+                    entries.isnot(None)
+                )
+            )
+            known = set()
+            for extracted_data in result.scalars():
+                known.update(extracted_data.get("entries") or ())
+            return known
+    
     async def get_platform_statistics(self, user_id: str) -> Dict[str, int]:
-        async with self.async_session() as session:
-            activities = await self.get_user_activities(user_id)
-            
-            stats = {}
-            for activity in activities:
-                platform = activity.platform
-                stats[platform] = stats.get(platform, 0) + 1
-            
-            return stats
+        activities = await self.get_user_activities(user_id)
+        
+        stats = {}
+        for activity in activities:
+            platform = activity.platform
+            stats[platform] = stats.get(platform, 0) + 1
+        
+        return stats
     
     async def close(self):
+        await self.writer.close()
         await self.engine.dispose()
+        if self.read_engine is not self.engine:
+            await self.read_engine.dispose()
 
 # Global database instance
 db_manager = DatabaseManager()
\ No newline at end of file
@@ -0,0 +1,112 @@
+import re
+import zlib
+from typing import Any, Dict, Iterable, List, Optional
+from sqlalchemy import text
+
+FTS_TABLE = "user_activities_fts"
+
+# Contentless FTS5 index: the text already lives in user_activities and the
+# compressed content table, so only the inverted index is stored here.
+# Matches are joined back to user_activities on rowid = activity id.
+CREATE_FTS_TABLE = f"""
+CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+    title, content, topics,
+    content='',
+    tokenize='unicode61 remove_diacritics 2'
+)
+"""
+
+INSERT_FTS_ROW = text(
+    f"INSERT INTO {FTS_TABLE} (rowid, title, content, topics) "
+    "VALUES (:id, :title, :content, :topics)"
+)
+
+# Contentless tables forget the indexed text, so removing a row means
+# replaying the exact values it was indexed with
+DELETE_FTS_ROW = text(
+    f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, title, content, topics) "
+    "VALUES ('delete', :id, :title, :content, :topics)"
+)
+
+# bm25 column weights for title, content and topics
+RANK_EXPRESSION = f"bm25({FTS_TABLE}, 5.0, 1.0, 3.0)"
+
+TOPIC_KEY_PATTERN = re.compile(r"skill|topic|tag|interest", re.IGNORECASE)
+BACKFILL_BATCH_SIZE = 1000
+
+def search_topics(extracted_data: Optional[Dict[str, Any]]) -> str:
+    """Flatten LLM-extracted skills/topics/tags/interests into indexable text"""
+    if not isinstance(extracted_data, dict):
+        return ""
+    
+    terms: List[str] = []
+    
+    def collect(value: Any):
+        if isinstance(value, str):
+            terms.append(value)
+        elif isinstance(value, (list, tuple)):
+            for entry in value:
+                collect(entry)
+        elif isinstance(value, dict):
+            for entry in value.values():
+                collect(entry)
+    
+    for key, value in extracted_data.items():
+        if TOPIC_KEY_PATTERN.search(str(key)):
+            collect(value)
+    return " ".join(terms)
+
+def fts_row(activity_id: int, title: Optional[str], content: Optional[str], extracted_data) -> Dict[str, Any]:
+    return {
+        "id": activity_id,
+        "title": title or "",
+        "content": content or "",
+        "topics": search_topics(extracted_data)
+    }
+
+def build_match_query(query: str) -> str:
+    """Turn free text into an FTS5 query that ANDs quoted terms; a trailing * keeps prefix search"""
+    terms = []
+    for token in query.split():
+        prefix = token.endswith("*") and len(token) > 1
+        token = token.rstrip("*")
+        if not token:
+            continue
+        quoted = '"' + token.replace('"', '""') + '"'
+        terms.append(quoted + "*" if prefix else quoted)
+    return " ".join(terms)
+
+def index_rows(sync_conn, rows: Iterable[Dict[str, Any]]):
+    rows = list(rows)
+    if rows:
+        sync_conn.execute(INSERT_FTS_ROW, rows)
+
+def create_search_index(sync_conn):
+    """Create the FTS5 table and backfill it from existing activities on first run"""
+    exists = sync_conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": FTS_TABLE}
+    ).first()
+    if exists:
+        return
+    
+    sync_conn.execute(text(CREATE_FTS_TABLE))
+    
+    from src.models import UserActivity
+    activities = sync_conn.execute(text(
+        "SELECT a.id, a.title, a.extracted_data, c.body FROM user_activities a "
+        "LEFT JOIN user_activity_contents c ON c.activity_id = a.id"
+    ).columns(extracted_data=UserActivity.__table__.c.extracted_data.type))
+    while True:
+        batch = activities.fetchmany(BACKFILL_BATCH_SIZE)
+        if not batch:
+            break
+        index_rows(sync_conn, (
+            fts_row(
+                row.id,
+                row.title,
+                zlib.decompress(row.body).decode("utf-8") if row.body else None,
+                row.extracted_data
+            )
+            for row in batch
+        ))
@@ -0,0 +1,128 @@
+import asyncio
+from typing import Awaitable, Callable, List, Optional, Tuple
+from src.models import UserActivity
+
+class ActivityWriter:
+    """Background task that coalesces activity inserts into group commits.
+    
+    Callers submit ORM instances and get back a future that resolves with the
+    row id once the batch containing it has been committed. A batch is flushed
+    when it reaches max_batch_size rows or max_delay_ms after its first row;
+    with max_delay_ms=0 it takes whatever queued up during the previous commit.
+    on_flush runs inside the batch transaction once row ids are assigned.
+    """
+    
+    def __init__(
+        self,
+        session_factory,
+        max_batch_size: int = 200,
+        max_delay_ms: float = 0,
+        on_flush: Optional[Callable[..., Awaitable[None]]] = None
+    ):
+        self.session_factory = session_factory
+        self.on_flush = on_flush
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.batches_committed = 0
+        self.rows_committed = 0
+    
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+    
+    @property
+    def task(self) -> Optional[asyncio.Task]:
+        """The background commit loop; it runs until close(), so shutdown waits exclude it"""
+        return self._task
+    
+    def submit(self, activity: UserActivity) -> asyncio.Future:
+        self._ensure_running()
+        future = self._loop.create_future()
+        self._queue.put_nowait((activity, future))
+        return future
+    
+    def _ensure_running(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._task is None or self._task.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._task = loop.create_task(self._run())
+    
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+            
+            batch = [item]
+            deadline = self._loop.time() + self.max_delay
+            while len(batch) < self.max_batch_size:
+                try:
+                    if self._queue.empty():
+                        timeout = deadline - self._loop.time()
+                        if timeout <= 0:
+                            break
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    else:
+                        item = self._queue.get_nowait()
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            
+            await self._commit(batch)
+    
+    async def _commit(self, batch: List[Tuple[UserActivity, asyncio.Future]]):
+        try:
+            async with self.session_factory() as session:
+                activities = [activity for activity, _ in batch]
+                session.add_all(activities)
+                await session.flush()
+                if self.on_flush:
+                    await self.on_flush(session, activities)
+                await session.commit()
+        except Exception:
+            # Retry row by row so one bad row does not fail the whole batch
+            for activity, future in batch:
+                await self._commit_one(activity, future)
+            return
+        
+        self.batches_committed += 1
+        self.rows_committed += len(batch)
+        for activity, future in batch:
+            if not future.done():
+                future.set_result(activity.id)
+    
+    async def _commit_one(self, activity: UserActivity, future: asyncio.Future):
+        try:
+            async with self.session_factory() as session:
+                session.add(activity)
+                await session.flush()
+                if self.on_flush:
+                    await self.on_flush(session, [activity])
+                await session.commit()
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            return
+        
+        self.rows_committed += 1
+        if not future.done():
+            future.set_result(activity.id)
+    
+    async def close(self):
+        """Flush pending rows and stop the writer task"""
+        if self._task is None or self._task.done():
+            return
+        if self._loop is not asyncio.get_running_loop():
+            # The loop that owned the writer is gone; nothing left to flush
+            self._task = None
+            return
+        self._queue.put_nowait(None)
+        await self._task
@@ -4,6 +4,7 @@ from datetime import datetime
 from pathlib import Path
 from typing import Optional
 import json
+from src.utils.tracing import current_ids
 
 class ColorFormatter(logging.Formatter):
     """Custom formatter with colors for console output"""
@@ -34,6 +35,8 @@ class ColorFormatter(logging.Formatter):
             context += f"[{record.platform}] "
         if hasattr(record, 'operation'):
             context += f"[{record.operation}] "
+        if hasattr(record, 'trace_id'):
+            context += f"[trace:{record.trace_id[:8]}] "
             
         return f"{timestamp} | {colored_level:20} | {context}{record.getMessage()}"
 
@@ -51,7 +54,7 @@ class JSONFormatter(logging.Formatter):
         }
         
         # Add custom fields
-        for attr in ['user_id', 'platform', 'operation', 'url', 'duration']:
+        for attr in ['user_id', 'platform', 'operation', 'url', 'duration', 'trace_id', 'span_id']:
             if hasattr(record, attr):
                 log_entry[attr] = getattr(record, attr)
                 
@@ -105,7 +108,10 @@ def get_logger() -> logging.Logger:
     return logging.getLogger("user_profiler")
 
 class LogContext:
-    """Context manager for adding structured logging context"""
+    """Context manager for adding structured logging context.
+    
+    Records also carry the trace_id and span_id of the active tracing span.
+    """
     
     def __init__(self, **context):
         self.context = context
@@ -132,6 +138,10 @@ class LogContext:
     def _log(self, level: int, message: str, extra: dict):
         # Combine context and extra data
         combined_extra = {**self.context, **extra}
+        trace_id, span_id = current_ids()
+        if trace_id:
+            combined_extra.setdefault("trace_id", trace_id)
+            combined_extra.setdefault("span_id", span_id)
         
         # Create log record with extra data
         record = self.logger.makeRecord(
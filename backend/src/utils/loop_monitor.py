@@ -0,0 +1,119 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+from src.config import config
+from src.utils.logger import get_logger
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _percentile(sorted_values, fraction: float) -> float:
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+class LoopLagMonitor:
+    """Sample event-loop lag and name the code that blocks the loop.
+    
+    A coroutine sleeps for interval and records how late it wakes up. A
+    watchdog thread watches that heartbeat; when the loop has been stuck
+    longer than the stall threshold it grabs the loop thread's stack and
+    logs the innermost project frame, i.e. the code that is blocking.
+    """
+    
+    def __init__(self, interval_ms: float = None, stall_threshold_ms: float = None, window: int = 600):
+        self.interval = (interval_ms or config.LOOP_LAG_INTERVAL_MS) / 1000
+        self.stall_threshold = (stall_threshold_ms or config.LOOP_STALL_THRESHOLD_MS) / 1000
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.stalls = 0
+        self.last_stall: Optional[Dict[str, Any]] = None
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+    
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+    
+    def start(self):
+        if self.running:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._sample())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        self._watchdog.start()
+    
+    async def stop(self):
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    async def _sample(self):
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self.samples.append(max(0.0, now - start - self.interval))
+            self._heartbeat = now
+    
+    def _watch(self):
+        reported_heartbeat = None
+        while not self._stop.wait(self.interval):
+            heartbeat = self._heartbeat
+            blocked = time.monotonic() - heartbeat - self.interval
+            if blocked < self.stall_threshold or heartbeat == reported_heartbeat:
+                continue
+            # Report each stall once, while it is still happening
+            reported_heartbeat = heartbeat
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            self._report_stall(blocked, traceback.extract_stack(frame))
+    
+    def _report_stall(self, blocked: float, stack: traceback.StackSummary):
+        project_frames = [f for f in stack if f.filename.startswith(SRC_DIR) and f.filename != __file__]
+        culprit = (project_frames or list(stack))[-1]
+        self.stalls += 1
+        self.last_stall = {
+            "blocked_ms": round(blocked * 1000, 1),
+            "culprit": f"{culprit.name} ({os.path.relpath(culprit.filename, os.path.dirname(SRC_DIR))}:{culprit.lineno})",
+            "stack": [f"{f.name} ({os.path.basename(f.filename)}:{f.lineno})" for f in stack[-8:]],
+            "detected_at": time.time()
+        }
+        get_logger().warning(
+            f"Event loop blocked for {self.last_stall['blocked_ms']:.0f} ms in {self.last_stall['culprit']}"
+        )
+    
+    def get_stats(self) -> Dict[str, Any]:
+        values = sorted(self.samples)
+        if not values:
+            lag = {"p50_ms": None, "p95_ms": None, "p99_ms": None, "max_ms": None}
+        else:
+            lag = {
+                "p50_ms": round(_percentile(values, 0.50) * 1000, 2),
+                "p95_ms": round(_percentile(values, 0.95) * 1000, 2),
+                "p99_ms": round(_percentile(values, 0.99) * 1000, 2),
+                "max_ms": round(values[-1] * 1000, 2)
+            }
+        return {
+            "running": self.running,
+            "samples": len(values),
+            **lag,
+            "stalls": self.stalls,
+            "last_stall": self.last_stall
+        }
+
+# Global monitor, started with the API
+loop_monitor = LoopLagMonitor()
@@ -0,0 +1,130 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Tuple
+from src.config import config
+
+def _run_batch(calls: List[Tuple[Callable, tuple]]) -> List[Tuple[bool, Any]]:
+    """Worker entry point: run a batch of calls, capturing each outcome"""
+    outcomes = []
+    for func, args in calls:
+        try:
+            outcomes.append((True, func(*args)))
+        except Exception as e:
+            outcomes.append((False, e))
+    return outcomes
+
+class CPUOffloader:
+    """Run CPU-bound work (HTML conversion, page parsing, statistics) off the event loop.
+    
+    Calls submitted in the same loop iteration are sent to the pool as one
+    batch (up to OFFLOAD_BATCH_SIZE), so a burst of small parses costs one
+    IPC round-trip instead of one each. Work smaller than OFFLOAD_MIN_BYTES
+    is cheaper to run inline; callers check worth_offloading() first.
+    
+    mode is "process" (default; sidesteps the GIL for regex/BeautifulSoup),
+    "thread", or "inline" to disable offloading.
+    """
+    
+    def __init__(self, mode: str = None, workers: int = None, batch_size: int = None, min_bytes: int = None):
+        self.mode = mode or config.OFFLOAD_MODE
+        self.workers = workers or config.OFFLOAD_WORKERS or min(4, os.cpu_count() or 1)
+        self.batch_size = batch_size or config.OFFLOAD_BATCH_SIZE
+        self.min_bytes = config.OFFLOAD_MIN_BYTES if min_bytes is None else min_bytes
+        self._executor: Optional[Executor] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: List[Tuple[Callable, tuple, asyncio.Future]] = []
+        self._flush_scheduled = False
+        self.calls = 0
+        self.batches = 0
+        self.in_flight = 0
+    
+    @property
+    def enabled(self) -> bool:
+        return self.mode in ("process", "thread")
+    
+    def worth_offloading(self, size: int) -> bool:
+        return self.enabled and size >= self.min_bytes
+    
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.mode == "process":
+                # spawn: forking a process that runs aiosqlite/uvicorn threads is unsafe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="offload")
+        return self._executor
+    
+    async def run(self, func: Callable, *args) -> Any:
+        """Run func(*args) in the pool; func and args must be picklable in process mode"""
+        if not self.enabled:
+            return func(*args)
+        
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._pending = []
+            self._flush_scheduled = False
+        
+        future = loop.create_future()
+        self._pending.append((func, args, future))
+        self.calls += 1
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        elif not self._flush_scheduled:
+            self._flush_scheduled = True
+            loop.call_soon(self._flush)
+        
+        self.in_flight += 1
+        try:
+            return await future
+        finally:
+            self.in_flight -= 1
+    
+    def _flush(self):
+        self._flush_scheduled = False
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        
+        self.batches += 1
+        calls = [(func, args) for func, args, _ in batch]
+        done = self._loop.run_in_executor(self._get_executor(), _run_batch, calls)
+        done.add_done_callback(lambda finished: self._deliver(batch, finished))
+    
+    def _deliver(self, batch: List[Tuple[Callable, tuple, asyncio.Future]], finished: asyncio.Future):
+        if finished.cancelled() or finished.exception() is not None:
+            error = asyncio.CancelledError() if finished.cancelled() else finished.exception()
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        
+        for (_, _, future), (ok, value) in zip(batch, finished.result()):
+            if future.done():
+                continue
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+    
+    def get_stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "workers": self.workers,
+            "in_flight": self.in_flight,
+            "calls": self.calls,
+            "batches": self.batches,
+            "avg_batch_size": round(self.calls / self.batches, 2) if self.batches else 0.0
+        }
+    
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+# Global pool for CPU-bound parsing
+cpu_offloader = CPUOffloader()
@@ -0,0 +1,266 @@
+import asyncio
+import cProfile
+import io
+import os
+import pstats
+import random
+import secrets
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from src.config import config
+from src.utils.logger import get_logger
+
+MODES = ("sample", "cprofile")
+ARTIFACT_SUFFIX = {"sample": ".folded", "cprofile": ".pstats"}
+
+class ProfileBusyError(Exception):
+    """Raised when a cProfile session is requested while another one is running"""
+
+def fold_stack(frame) -> str:
+    """Collapse a stack into 'root;...;leaf' frames, the flamegraph.pl/speedscope input format"""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+class ProfileSession:
+    """One profiled request or crawl"""
+    
+    def __init__(self, profile_id: str, mode: str, label: str, trigger: str):
+        self.id = profile_id
+        self.mode = mode
+        self.label = label
+        self.trigger = trigger
+        self.thread_id = threading.get_ident()
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.duration = 0.0
+        self.samples: Counter = Counter()
+        self.profile: Optional[cProfile.Profile] = None
+
+class StackSampler:
+    """One background thread that samples the stacks of every active session's thread.
+    
+    Sharing the thread keeps the cost fixed at one sys._current_frames()
+    call per interval, however many requests are being sampled.
+    """
+    
+    def __init__(self, interval_ms: float):
+        self.interval = interval_ms / 1000
+        self.sessions: List[ProfileSession] = []
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+    
+    def add(self, session: ProfileSession):
+        with self._lock:
+            self.sessions.append(session)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+                self._thread.start()
+    
+    def remove(self, session: ProfileSession):
+        with self._lock:
+            if session in self.sessions:
+                self.sessions.remove(session)
+    
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self.sessions:
+                    self._thread = None
+                    return
+                sessions = list(self.sessions)
+            
+            frames = sys._current_frames()
+            folded: Dict[int, str] = {}
+            for session in sessions:
+                frame = frames.get(session.thread_id)
+                if frame is not None and session.thread_id not in folded:
+                    folded[session.thread_id] = fold_stack(frame)
+            
+            # Count under the lock so a removed session's samples are final
+            with self._lock:
+                for session in self.sessions:
+                    if session.thread_id in folded:
+                        session.samples[folded[session.thread_id]] += 1
+
+class ProfileManager:
+    """Opt-in request and crawl profiling with artifacts stored on disk.
+    
+    "sample" mode records folded stacks of the event-loop thread every
+    PROFILE_SAMPLE_INTERVAL_MS; "cprofile" mode runs cProfile and saves a
+    pstats file. Both observe the whole loop thread, so work from other
+    requests running concurrently shows up too. cProfile is thread-global,
+    so only one cProfile session can run at a time.
+    """
+    
+    def __init__(
+        self,
+        directory: str = None,
+        sample_rate: float = None,
+        interval_ms: float = None,
+        max_artifacts: int = None
+    ):
+        self.directory = directory or config.PROFILE_DIR
+        self.sample_rate = config.PROFILE_SAMPLE_RATE if sample_rate is None else sample_rate
+        self.max_artifacts = max_artifacts or config.PROFILE_MAX_ARTIFACTS
+        self.sampler = StackSampler(interval_ms or config.PROFILE_SAMPLE_INTERVAL_MS)
+        self.artifacts: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._cprofile_active = False
+        self.sessions_started = 0
+        self.busy_rejections = 0
+    
+    def authorized(self, token: Optional[str]) -> bool:
+        return bool(config.PROFILE_ADMIN_TOKEN) and bool(token) and secrets.compare_digest(
+            token, config.PROFILE_ADMIN_TOKEN
+        )
+    
+    def requested_mode(self, value: Optional[str]) -> Optional[str]:
+        """Normalize an X-Profile header or ?profile= value; any truthy value means "sample" """
+        if not value:
+            return None
+        value = value.strip().lower()
+        if value in MODES:
+            return value
+        return "sample" if value in ("1", "true", "yes") else None
+    
+    def should_sample(self) -> bool:
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+    
+    def new_id(self) -> str:
+        return f"{time.strftime('%Y%m%d-%H%M%S')}-{secrets.token_hex(3)}"
+    
+    def start(self, mode: str, label: str, trigger: str = "manual", profile_id: str = None) -> ProfileSession:
+        if mode not in MODES:
+            raise ValueError(f"Unknown profile mode: {mode}")
+        session = ProfileSession(profile_id or self.new_id(), mode, label, trigger)
+        
+        if mode == "cprofile":
+            if self._cprofile_active:
+                self.busy_rejections += 1
+                raise ProfileBusyError("Another cProfile session is running")
+            session.profile = cProfile.Profile()
+            try:
+                session.profile.enable()
+            except ValueError as e:
+                # Another tool (debugger, coverage) already owns the profiling hook
+                self.busy_rejections += 1
+                raise ProfileBusyError(str(e))
+            self._cprofile_active = True
+        else:
+            self.sampler.add(session)
+        
+        self.sessions_started += 1
+        return session
+    
+    async def finish(self, session: ProfileSession) -> Dict[str, Any]:
+        session.duration = time.perf_counter() - session.start
+        if session.profile is not None:
+            session.profile.disable()
+            self._cprofile_active = False
+        else:
+            self.sampler.remove(session)
+        
+        # Serializing pstats walks every recorded function; keep it off the loop
+        path = await asyncio.to_thread(self._write, session)
+        artifact = {
+            "id": session.id,
+            "mode": session.mode,
+            "label": session.label,
+            "trigger": session.trigger,
+            "started_at": session.started_at,
+            "duration_ms": round(session.duration * 1000, 1),
+            "samples": sum(session.samples.values()) if session.mode == "sample" else None,
+            "file": os.path.basename(path),
+            "bytes": os.path.getsize(path)
+        }
+        self.artifacts[session.id] = artifact
+        self._prune()
+        get_logger().info(
+            f"Profile {session.id} saved ({session.mode}, {artifact['duration_ms']:.0f} ms): {session.label}"
+        )
+        return artifact
+    
+    async def run_profiled(
+        self,
+        mode: str,
+        label: str,
+        profile_id: str,
+        func: Callable[..., Awaitable[Any]],
+        *args,
+        **kwargs
+    ) -> Any:
+        """Run func under a profile, or unprofiled if a cProfile session is already running"""
+        try:
+            session = self.start(mode, label, "manual", profile_id)
+        except ProfileBusyError as e:
+            get_logger().warning(f"Not profiling {label}: {e}")
+            return await func(*args, **kwargs)
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            await self.finish(session)
+    
+    def _write(self, session: ProfileSession) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, session.id + ARTIFACT_SUFFIX[session.mode])
+        if session.profile is not None:
+            session.profile.dump_stats(path)
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                for stack, count in session.samples.most_common():
+                    f.write(f"{stack} {count}\n")
+        return path
+    
+    def _prune(self):
+        while len(self.artifacts) > self.max_artifacts:
+            _, artifact = self.artifacts.popitem(last=False)
+            try:
+                os.remove(os.path.join(self.directory, artifact["file"]))
+            except OSError:
+                pass
+    
+    def get(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        return self.artifacts.get(profile_id)
+    
+    def path(self, artifact: Dict[str, Any]) -> str:
+        return os.path.join(self.directory, artifact["file"])
+    
+    def list(self) -> List[Dict[str, Any]]:
+        return list(reversed(self.artifacts.values()))
+    
+    def render_text(self, artifact: Dict[str, Any], limit: int = 40) -> str:
+        """Human-readable summary: top functions by cumulative time, or the hottest stacks"""
+        if artifact["mode"] == "cprofile":
+            out = io.StringIO()
+            pstats.Stats(self.path(artifact), stream=out).sort_stats("cumulative").print_stats(limit)
+            return out.getvalue()
+        
+        with open(self.path(artifact), encoding="utf-8") as f:
+            lines = [line.rstrip("\n") for _, line in zip(range(limit), f)]
+        total = artifact["samples"] or 1
+        report = []
+        for line in lines:
+            stack, count = line.rsplit(" ", 1)
+            leaf = stack.rsplit(";", 1)[-1]
+            report.append(f"{int(count) / total:6.1%}  {leaf}  <-  {stack}")
+        return "\n".join(report)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "sample_rate": self.sample_rate,
+            "sessions_started": self.sessions_started,
+            "active_samplers": len(self.sampler.sessions),
+            "cprofile_active": self._cprofile_active,
+            "busy_rejections": self.busy_rejections,
+            "artifacts": len(self.artifacts)
+        }
+
+# Global profiler for API requests and crawls
+profile_manager = ProfileManager()
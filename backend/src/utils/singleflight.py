@@ -0,0 +1,61 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into one running task.
+    
+    The first caller for a key starts the work; callers arriving while it is
+    still running get the same task instead of starting their own. The key is
+    forgotten as soon as the task finishes, so later calls run again.
+    """
+    
+    def __init__(self):
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+        self.started = 0
+        self.joined = 0
+    
+    def start(self, key: Hashable, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> Tuple[asyncio.Task, bool]:
+        """Return (task, joined); joined is True when an in-flight task was reused"""
+        task = self._tasks.get(key)
+        if task is not None and not task.done():
+            self.joined += 1
+            return task, True
+        
+        task = asyncio.create_task(func(*args, **kwargs))
+        self._tasks[key] = task
+        task.add_done_callback(lambda done: self._forget(key, done))
+        self.started += 1
+        return task, False
+    
+    async def do(self, key: Hashable, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """Run func (or join the in-flight run for key) and wait for its result"""
+        task, _ = self.start(key, func, *args, **kwargs)
+        # Shield so one caller going away doesn't cancel the work for the others
+        return await asyncio.shield(task)
+    
+    def in_flight(self, key: Hashable) -> bool:
+        task = self._tasks.get(key)
+        return task is not None and not task.done()
+    
+    def count(self, operation: str) -> int:
+        """Running tasks whose key is (operation, ...)"""
+        return sum(
+            1 for key, task in self._tasks.items()
+            if isinstance(key, tuple) and key[0] == operation and not task.done()
+        )
+    
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Single-flight task {key} failed: {task.exception()}")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": [list(key) if isinstance(key, tuple) else key for key in self._tasks],
+            "started": self.started,
+            "joined": self.joined
+        }
+
+# Crawls and profile generations, keyed by (operation, user_id)
+single_flight = SingleFlight()
@@ -0,0 +1,258 @@
+import asyncio
+import json
+import os
+import queue
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+from src.config import config
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+def current_ids() -> Tuple[Optional[str], Optional[str]]:
+    """(trace_id, span_id) of the active span, or (None, None)"""
+    span = _current_span.get()
+    if span is None:
+        return None, None
+    return span.trace_id, span.span_id
+
+class Span:
+    """A timed operation; entering it makes it the parent of spans started in the same context.
+    
+    The parent travels in a contextvar, so tasks created with create_task
+    or gather and calls made through asyncio.to_thread nest correctly.
+    """
+    
+    __slots__ = (
+        "tracer", "name", "trace_id", "span_id", "parent_id", "attributes",
+        "start_ns", "end_ns", "status", "error", "_token"
+    )
+    
+    def __init__(self, tracer: "Tracer", name: str, attributes: Dict[str, Any]):
+        parent = _current_span.get()
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = attributes
+        self.start_ns = 0
+        self.end_ns = 0
+        self.status = "OK"
+        self.error: Optional[str] = None
+        self._token = None
+    
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+    
+    def __enter__(self) -> "Span":
+        self.start_ns = time.time_ns()
+        self._token = _current_span.set(self)
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.end_ns = time.time_ns()
+        _current_span.reset(self._token)
+        if exc_type is asyncio.CancelledError:
+            self.status = "CANCELLED"
+        elif exc_type is not None:
+            self.status = "ERROR"
+            self.error = f"{exc_type.__name__}: {exc_val}"
+        self.tracer._end(self)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        # OTLP field names, so the JSONL can be replayed into a collector as-is
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "name": self.name,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "attributes": self.attributes,
+            "status": {"code": self.status, "message": self.error}
+        }
+
+class _NoopSpan:
+    trace_id = None
+    span_id = None
+    
+    def set(self, **attributes):
+        pass
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+class JsonlExporter:
+    """Append finished spans to a JSONL file from a background thread.
+    
+    The file is rotated to <path>.1 once it passes max_bytes, so at most
+    two files are kept.
+    """
+    
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.exported = 0
+        self._queue: "queue.SimpleQueue[Optional[Dict[str, Any]]]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+    
+    def export(self, record: Dict[str, Any]):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                    self._thread.start()
+        self._queue.put(record)
+    
+    def _run(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        while True:
+            records = [self._queue.get()]
+            while not self._queue.empty():
+                records.append(self._queue.get())
+            
+            closing = records[-1] is None
+            lines = "".join(
+                json.dumps(record, ensure_ascii=False, default=str) + "\n"
+                for record in records if record is not None
+            )
+            with self._lock:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(lines)
+                    size = f.tell()
+                if size > self.max_bytes:
+                    os.replace(self.path, self.path + ".1")
+            self.exported += len(records) - closing
+            if closing:
+                return
+    
+    def find(self, trace_id: str) -> List[Dict[str, Any]]:
+        """Scan the exported files for one trace's spans"""
+        needle = f'"trace_id": "{trace_id}"'
+        spans = []
+        with self._lock:
+            for path in (self.path + ".1", self.path):
+                if not os.path.exists(path):
+                    continue
+                with open(path, encoding="utf-8") as f:
+                    spans.extend(json.loads(line) for line in f if needle in line)
+        return spans
+    
+    def close(self):
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+            self._thread = None
+
+class Tracer:
+    """Creates spans, keeps recent traces in memory and exports every span to JSONL"""
+    
+    def __init__(
+        self,
+        enabled: bool = None,
+        export_path: str = None,
+        max_traces: int = None,
+        max_spans_per_trace: int = None
+    ):
+        self.enabled = config.TRACING_ENABLED if enabled is None else enabled
+        self.exporter = JsonlExporter(export_path or config.TRACE_EXPORT_PATH, config.TRACE_FILE_MAX_BYTES)
+        self.max_traces = max_traces or config.TRACE_MAX_TRACES
+        self.max_spans_per_trace = max_spans_per_trace or config.TRACE_MAX_SPANS_PER_TRACE
+        self.traces: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+        self.dropped_spans = 0
+        # Spans end on worker threads too (LLM calls run on the model routes' threads)
+        self._lock = threading.Lock()
+    
+    def span(self, name: str, **attributes):
+        if not self.enabled:
+            return _NoopSpan()
+        return Span(self, name, attributes)
+    
+    def _end(self, span: Span):
+        record = span.to_dict()
+        with self._lock:
+            spans = self.traces.get(span.trace_id)
+            if spans is None:
+                spans = self.traces[span.trace_id] = []
+                while len(self.traces) > self.max_traces:
+                    self.traces.popitem(last=False)
+            if len(spans) < self.max_spans_per_trace:
+                spans.append(record)
+            else:
+                self.dropped_spans += 1
+        self.exporter.export(record)
+    
+    def get_trace(self, trace_id: str) -> List[Dict[str, Any]]:
+        """Spans of a recent trace from memory, otherwise from the export file"""
+        with self._lock:
+            spans = list(self.traces.get(trace_id, ()))
+        return spans or self.exporter.find(trace_id)
+    
+    def recent(self, limit: int = 20) -> List[Dict[str, Any]]:
+        with self._lock:
+            traces = list(self.traces.items())[-limit:]
+        summaries = []
+        for trace_id, spans in reversed(traces):
+            start = min(span["start_time_unix_nano"] for span in spans)
+            end = max(span["end_time_unix_nano"] for span in spans)
+            root = next((span for span in spans if span["parent_span_id"] is None), spans[-1])
+            summaries.append({
+                "trace_id": trace_id,
+                "root": root["name"],
+                "spans": len(spans),
+                "duration_ms": round((end - start) / 1e6, 2),
+                "errors": sum(1 for span in spans if span["status"]["code"] == "ERROR")
+            })
+        return summaries
+    
+    def close(self):
+        self.exporter.close()
+
+def waterfall(spans: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Lay spans out in start order with offsets from the trace start and nesting depth"""
+    if not spans:
+        return {"spans": []}
+    
+    by_id = {span["span_id"]: span for span in spans}
+    
+    def depth(span) -> int:
+        level = 0
+        while span["parent_span_id"] in by_id and level < len(spans):
+            span = by_id[span["parent_span_id"]]
+            level += 1
+        return level
+    
+    trace_start = min(span["start_time_unix_nano"] for span in spans)
+    trace_end = max(span["end_time_unix_nano"] for span in spans)
+    rows = []
+    for span in sorted(spans, key=lambda s: s["start_time_unix_nano"]):
+        rows.append({
+            "span_id": span["span_id"],
+            "parent_span_id": span["parent_span_id"],
+            "name": span["name"],
+            "depth": depth(span),
+            "offset_ms": round((span["start_time_unix_nano"] - trace_start) / 1e6, 2),
+            "duration_ms": round((span["end_time_unix_nano"] - span["start_time_unix_nano"]) / 1e6, 2),
+            "status": span["status"]["code"],
+            "error": span["status"]["message"],
+            "attributes": span["attributes"]
+        })
+    return {
+        "trace_id": spans[0]["trace_id"],
+        "duration_ms": round((trace_end - trace_start) / 1e6, 2),
+        "span_count": len(rows),
+        "spans": rows
+    }
+
+# Global tracer for the crawl pipeline
+tracer = Tracer()
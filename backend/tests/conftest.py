@@ -0,0 +1,16 @@
+import os
+import shutil
+import tempfile
+
+# The tracer, page archive, profile manager, logger and database are module
+# globals configured at import, so their paths must point outside the
+# checkout before any src module is imported
+_output_dir = tempfile.mkdtemp(prefix="user-profiler-tests-")
+os.environ["TRACE_EXPORT_PATH"] = os.path.join(_output_dir, "traces", "spans.jsonl")
+os.environ["ARCHIVE_DIR"] = os.path.join(_output_dir, "archive")
+os.environ["PROFILE_DIR"] = os.path.join(_output_dir, "profiles")
+os.environ["LOG_FILE"] = os.path.join(_output_dir, "logs", "user_profiler.log")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(_output_dir, 'user_profiler.db')}"
+
+def pytest_unconfigure(config):
+    shutil.rmtree(_output_dir, ignore_errors=True)
@@ -0,0 +1,88 @@
+"""OpenAI-compatible chat completions stub for tests and benchmarks.
+
+Answers POST /v1/chat/completions with canned extraction JSON (one result
+per "### Document N" section for batch prompts) and usage counts estimated
+from the prompt. Latency per model comes from LLM_STUB_LATENCY_MS, e.g.
+"gpt-4o-mini=150,gpt-4o=800", so route timing can be exercised without
+a real endpoint.
+
+As a server:  uvicorn tests.llm_stub:app --port 8900
+              LLM_BASE_URL=http://localhost:8900/v1 python main.py
+In process:   LLMExtractor(http_client=httpx.Client(transport=httpx.MockTransport(stub.handle)))
+"""
+
+import asyncio
+import json
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, List
+import httpx
+from fastapi import FastAPI, Request
+from src.extractors.content_reducer import estimate_tokens
+
+def parse_latencies(spec: str) -> Dict[str, float]:
+    latencies = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        model, _, ms = part.partition("=")
+        latencies[model.strip()] = float(ms)
+    return latencies
+
+class ChatStub:
+    def __init__(self, latency_ms: Dict[str, float] = None):
+        self.latency_ms = parse_latencies(os.getenv("LLM_STUB_LATENCY_MS", "")) if latency_ms is None else latency_ms
+        self.requests: List[Dict[str, Any]] = []
+        self.in_flight = 0
+        self.max_in_flight: Dict[str, int] = {}
+        self._lock = threading.Lock()
+    
+    def complete(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        model = body["model"]
+        with self._lock:
+            self.requests.append(body)
+            self.in_flight += 1
+            self.max_in_flight[model] = max(self.max_in_flight.get(model, 0), self.in_flight)
+        try:
+            time.sleep(self.latency_ms.get(model, 0) / 1000)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+        
+        prompt = body["messages"][-1]["content"]
+        documents = len(re.findall(r'^### Document \d+', prompt, re.MULTILINE))
+        if documents:
+            content = json.dumps({"results": [{"index": i, "activity_type": "profile"} for i in range(documents)]})
+        else:
+            content = json.dumps({"activity_type": "profile", "interests": ["python"]})
+        prompt_tokens = sum(estimate_tokens(message["content"]) for message in body["messages"])
+        completion_tokens = estimate_tokens(content)
+        return {
+            "id": f"chatcmpl-stub{len(self.requests)}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        }
+    
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        """httpx.MockTransport handler"""
+        if not request.url.path.endswith("/chat/completions"):
+            return httpx.Response(404, json={"error": {"message": "not found"}})
+        return httpx.Response(200, json=self.complete(json.loads(request.content)))
+
+stub = ChatStub()
+app = FastAPI(title="LLM stub")
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    return await asyncio.to_thread(stub.complete, await request.json())
@@ -1,8 +1,13 @@
 import pytest
 import asyncio
+import os
+import subprocess
+import sys
+from pathlib import Path
 from fastapi.testclient import TestClient
-from unittest.mock import Mock, patch
-from src.api.main import app
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, Mock, patch
+from src.api.main import app, graceful_shutdown
 
 class TestAPI:
     def setup_method(self):
@@ -13,10 +18,28 @@ class TestAPI:
         assert response.status_code == 200
         assert response.json()["message"] == "User Profiler API"
     
-    def test_health_check(self):
+    @patch('src.api.main.db_manager.ping')
+    def test_health_check(self, mock_ping):
+        mock_ping.return_value = 0.002
+        
         response = self.client.get("/health")
         assert response.status_code == 200
         assert response.json()["status"] == "healthy"
+        assert response.json()["database"]["ping_ms"] == 2.0
+    
+    @patch('src.api.main.db_manager.ping')
+    def test_ready_flips_when_saturated(self, mock_ping):
+        mock_ping.return_value = 0.002
+        
+        response = self.client.get("/ready")
+        assert response.status_code == 200
+        assert response.json()["status"] == "ready"
+        
+        with patch('src.api.main.config.READY_MAX_INFLIGHT_CRAWLS', 0):
+            response = self.client.get("/ready")
+        assert response.status_code == 503
+        assert response.json()["status"] == "saturated"
+        assert "crawls in flight" in response.json()["reasons"][0]
     
     def test_crawl_user_endpoint(self):
         crawl_data = {
@@ -33,6 +56,49 @@ class TestAPI:
         assert data["platforms"] == ["github"]
         assert "Started crawling data for user" in data["message"]
     
+    @patch('src.api.main.db_manager.get_last_activity_time')
+    def test_crawl_user_skipped_when_fresh(self, mock_last_activity):
+        mock_last_activity.return_value = datetime.now() - timedelta(minutes=5)
+        
+        response = self.client.post("/crawl", json={"user_id": "testuser", "fresh_within_minutes": 30})
+        assert response.status_code == 200
+        assert response.json()["status"] == "fresh"
+    
+    def test_crawl_user_rejects_non_positive_freshness(self):
+        for minutes in (0, -5):
+            response = self.client.post("/crawl", json={"user_id": "testuser", "fresh_within_minutes": minutes})
+            assert response.status_code == 422
+    
+    def test_profiled_request_is_downloadable(self, tmp_path):
+        with patch('src.api.main.profile_manager.directory', str(tmp_path)), \
+                patch('src.api.main.config.PROFILE_ADMIN_TOKEN', 'secret'):
+            unprofiled = self.client.get("/", headers={"X-Profile": "sample"})
+            response = self.client.get("/", headers={"X-Profile": "cprofile", "X-Admin-Token": "secret"})
+            profile_id = response.headers["X-Profile-Id"]
+            
+            forbidden = self.client.get(f"/profiles/{profile_id}")
+            download = self.client.get(f"/profiles/{profile_id}", headers={"X-Admin-Token": "secret"})
+        
+        assert "X-Profile-Id" not in unprofiled.headers
+        assert forbidden.status_code == 403
+        assert download.status_code == 200
+        assert download.headers["content-type"] == "application/octet-stream"
+    
+    def test_trace_waterfall(self, tmp_path):
+        from src.api.main import tracer
+        
+        with patch.object(tracer.exporter, 'path', str(tmp_path / "spans.jsonl")):
+            with tracer.span("crawl", user_id="testuser") as crawl:
+                with tracer.span("fetch", url="https://github.com/testuser"):
+                    pass
+            
+            response = self.client.get(f"/traces/{crawl.trace_id}")
+            missing = self.client.get("/traces/0000")
+        
+        assert response.status_code == 200
+        assert [(span["name"], span["depth"]) for span in response.json()["spans"]] == [("crawl", 0), ("fetch", 1)]
+        assert missing.status_code == 404
+    
     def test_crawl_user_invalid_id(self):
         crawl_data = {
             "user_id": "",
@@ -63,6 +129,30 @@ class TestAPI:
         response = self.client.get("/users/testuser/activities")
         assert response.status_code == 200
     
+    @patch('src.api.main.db_manager.get_user_activities')
+    def test_get_user_activities_compressed(self, mock_get_activities):
+        mock_get_activities.return_value = [
+            Mock(
+                id=i,
+                user_id="testuser",
+                platform="github",
+                url="https://github.com/testuser",
+                title="Profile",
+                content="Test content " * 100,
+                extracted_data={"type": "profile"},
+                timestamp="2024-01-01T00:00:00"
+            )
+            for i in range(10)
+        ]
+        
+        for encoding in ("br", "gzip"):
+            response = self.client.get(
+                "/users/testuser/activities", headers={"Accept-Encoding": encoding}
+            )
+            assert response.status_code == 200
+            assert response.headers["content-encoding"] == encoding
+            assert len(response.json()) == 10
+    
     @patch('src.api.main.db_manager.get_timeline_data')
     def test_get_user_timeline(self, mock_get_timeline):
         mock_timeline = [
@@ -87,6 +177,33 @@ class TestAPI:
         assert data["user_id"] == "testuser"
         assert len(data["timeline"]) == 1
     
+    @patch('src.api.main.db_manager.search_activities')
+    def test_search_activities(self, mock_search):
+        mock_search.return_value = (1, [
+            {
+                "id": 1,
+                "user_id": "testuser",
+                "platform": "github",
+                "url": "https://github.com/testuser",
+                "title": "Profile",
+                "extracted_data": {"skills": ["python"]},
+                "timestamp": "2024-01-01T00:00:00",
+                "score": 1.5
+            }
+        ])
+        
+        response = self.client.get("/search", params={"q": "python", "platform": "github"})
+        assert response.status_code == 200
+        
+        data = response.json()
+        assert data["total"] == 1
+        assert data["results"][0]["user_id"] == "testuser"
+        mock_search.assert_called_once_with("python", None, "github", 20, 0)
+    
+    def test_search_empty_query(self):
+        response = self.client.get("/search", params={"q": "  "})
+        assert response.status_code == 400
+    
     @patch('src.api.main.db_manager.get_user_profile')
     def test_get_user_profile_not_found(self, mock_get_profile):
         mock_get_profile.return_value = None
@@ -101,4 +218,43 @@ class TestAPI:
         
         response = self.client.post("/users/testuser/profile/generate")
         assert response.status_code == 404
-        assert "No activities found" in response.json()["detail"]
\ No newline at end of file
+        assert "No activities found" in response.json()["detail"]
+
+class TestShutdown:
+    @pytest.mark.asyncio
+    async def test_waits_for_crawls_before_closing(self):
+        order = []
+        
+        async def crawl():
+            await asyncio.sleep(0.05)
+            order.append("crawl")
+        
+        task = asyncio.create_task(crawl())
+        record = lambda name: AsyncMock(side_effect=lambda: order.append(name))
+        with patch('src.api.main.loop_monitor.stop', AsyncMock()), \
+                patch('src.api.main.db_manager.close', record("db")), \
+                patch('src.api.main.page_fetcher.close', record("fetcher")), \
+                patch('src.api.main.cpu_offloader.close', Mock(side_effect=lambda: order.append("offloader"))), \
+                patch('src.api.main.model_router.close', Mock(side_effect=lambda: order.append("router"))), \
+                patch('src.api.main.tracer.close', Mock(side_effect=lambda: order.append("tracer"))):
+            await graceful_shutdown()
+        
+        assert task.done()
+        assert order == ["crawl", "db", "fetcher", "offloader", "router", "tracer"]
+
+class TestStartup:
+    def test_api_import_defers_heavy_modules(self):
+        env = dict(os.environ)
+        env.pop("OPENAI_API_KEY", None)
+        probe = (
+            "import sys; import src.api.main; "
+            "print(','.join(m for m in ('crawl4ai', 'openai', 'playwright') if m in sys.modules))"
+        )
+        
+        result = subprocess.run(
+            [sys.executable, "-c", probe],
+            cwd=Path(__file__).parent.parent, env=env, capture_output=True, text=True
+        )
+        
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.strip() == ""
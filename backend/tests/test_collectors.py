@@ -1,7 +1,19 @@
 import pytest
 import asyncio
-from unittest.mock import Mock, patch
-from src.collectors import GitHubCollector, ZhihuCollector, SearchEngineCollector
+from pathlib import Path
+from unittest.mock import Mock, AsyncMock, patch
+from src.collectors.search_collector import serp_cache
+from src.collectors.fetcher import FetchResult, TieredFetcher, html_to_markdown
+from src.collectors.resilience import HostResilience, AdaptiveLimiter
+from src.collectors import (
+    GitHubCollector, ZhihuCollector, XiaohongshuCollector, SearchEngineCollector, PageCollector, CrawlFrontier,
+    canonicalize_url
+)
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+def load_fixture(name: str) -> str:
+    return (FIXTURES / name).read_text(encoding="utf-8")
 
 @pytest.mark.asyncio
 class TestGitHubCollector:
@@ -42,20 +54,82 @@ class TestGitHubCollector:
         result = self.collector.extract_user_info("", "https://github.com/testuser")
         assert result is None
     
-    @patch('src.collectors.base_collector.AsyncWebCrawler')
-    async def test_collect_user_data_success(self, mock_crawler_class):
-        mock_crawler = Mock()
-        mock_crawler_class.return_value.__aenter__.return_value = mock_crawler
-        
-        mock_result = Mock()
-        mock_result.success = True
-        mock_result.markdown = "# TestUser\n10 repositories"
-        mock_crawler.arun.return_value = mock_result
+    async def test_collect_user_data_success(self):
+        self.collector.rate_limit = 0
+        self.collector.fetcher = Mock()
+        self.collector.fetcher.fetch = AsyncMock(side_effect=lambda url, tier: FetchResult(
+            url, True, markdown="# TestUser\n10 repositories", tier="http"
+        ))
         
         results = await self.collector.collect_user_data("testuser")
         
         assert len(results) == 4  # 4 URLs
         assert all(result["platform"] == "github" for result in results)
+        assert all(result["fetch_tier"] == "http" for result in results)
+    
+    def test_page_url(self):
+        assert self.collector.page_url("https://github.com/testuser?tab=repositories", 3) == \
+            "https://github.com/testuser?tab=repositories&page=3"
+        assert self.collector.page_url("https://github.com/testuser?tab=repositories&page=2", 4) == \
+            "https://github.com/testuser?tab=repositories&page=4"
+    
+    @patch('src.collectors.base_collector.config.PAGINATION_CONCURRENCY', 2)
+    async def test_collect_more_pages_stops_at_known_entries(self):
+        def listing(page):
+            repos = "\n".join(
+                f"[repo{n}](https://github.com/testuser/repo{n})" for n in (2 * page - 1, 2 * page)
+            )
+            return f"# testuser\n{repos}"
+        
+        self.collector.rate_limit = 0
+        self.collector.fetcher = Mock()
+        self.collector.fetcher.fetch = AsyncMock(side_effect=lambda url, tier: FetchResult(
+            url, True, markdown=listing(int(url.rsplit("page=", 1)[1]) if "page=" in url else 1), tier="http"
+        ))
+        first = self.collector.build_item("https://github.com/testuser?tab=repositories", listing(1), "http")
+        assert first["extracted_data"]["entries"] == ["repo1", "repo2"]
+        
+        # repo7/repo8 were stored by an earlier crawl, so page 4 is where new entries run out
+        windows = [
+            window async for window in self.collector.collect_more_pages("testuser", [first], {"repo7", "repo8"})
+        ]
+        
+        assert [[item["extracted_data"]["page"] for item in window] for window in windows] == [[2, 3]]
+        assert windows[0][1]["extracted_data"]["entries"] == ["repo5", "repo6"]
+        assert self.collector.fetcher.fetch.await_count == 4  # pages 2-5, the last window is dropped
+    
+    async def test_collect_more_pages_respects_page_budget(self):
+        self.collector.rate_limit = 0
+        self.collector.fetcher = Mock()
+        self.collector.fetcher.fetch = AsyncMock(side_effect=lambda url, tier: FetchResult(
+            url, True, markdown=f"# testuser\n[r](https://github.com/testuser/{url.rsplit('=', 1)[1]})", tier="http"
+        ))
+        first = self.collector.build_item(
+            "https://github.com/testuser?tab=repositories", "# testuser\n[r](https://github.com/testuser/r1)", "http"
+        )
+        
+        pages = [
+            item async for window in self.collector.collect_more_pages("testuser", [first], set(), max_pages=4)
+            for item in window
+        ]
+        
+        assert len(pages) == 3  # pages 2-4
+    
+    async def test_collect_url_escalates_on_parse_failure(self):
+        self.collector.rate_limit = 0
+        self.collector.fetcher = Mock(stats={"escalations": 0})
+        self.collector.fetcher.fetch = AsyncMock(return_value=FetchResult(
+            "https://github.com/testuser", True, markdown="Sign in", tier="http"
+        ))
+        self.collector.fetcher.fetch_browser = AsyncMock(return_value=FetchResult(
+            "https://github.com/testuser", True, markdown="# TestUser\n10 repositories", tier="browser"
+        ))
+        
+        item = await self.collector.collect_url("https://github.com/testuser")
+        
+        assert item["fetch_tier"] == "browser"
+        assert item["extracted_data"]["fetch_tier"] == "browser"
+        assert self.collector.fetcher.stats["escalations"] == 1
 
 @pytest.mark.asyncio
 class TestZhihuCollector:
@@ -90,6 +164,104 @@ class TestZhihuCollector:
         assert result["answers_count"] == 50
         assert result["articles_count"] == 10
         assert len(result["recent_posts"]) == 2
+        assert "entries" not in result  # only answers/articles listings paginate
+        
+        answers = self.collector.extract_user_info(markdown_content, "https://www.zhihu.com/people/testuser/answers")
+        assert answers["entries"] == ["如何学习Python", "Vue.js最佳实践"]
+        assert self.collector.page_url("https://www.zhihu.com/people/testuser/answers", 2) == \
+            "https://www.zhihu.com/people/testuser/answers?page=2"
+
+@pytest.mark.asyncio
+class TestXiaohongshuCollector:
+    def setup_method(self):
+        self.collector = XiaohongshuCollector()
+        self.collector.rate_limit = 0
+        self.profile_url = "https://www.xiaohongshu.com/user/profile/5f3c1a2b000000000101d2e3"
+        self.first = self.collector.build_item(self.profile_url, load_fixture("xiaohongshu/profile.md"), "browser")
+    
+    def scroll_feed(self, *names):
+        results = [FetchResult(self.profile_url, True, markdown=load_fixture(f"xiaohongshu/{name}"), tier="browser")
+                   for name in names]
+        session = Mock(step=AsyncMock(side_effect=results), close=AsyncMock())
+        
+        self.collector.resilience = HostResilience()
+        self.collector.fetcher = Mock()
+        self.collector.fetcher.scroll_session = Mock(return_value=session)
+        return session
+    
+    def test_extract_profile(self):
+        info = self.first["extracted_data"]
+        
+        assert info["type"] == "xiaohongshu_profile"
+        assert info["nickname"] == "小林同学"
+        assert info["red_id"] == "27384910"
+        assert info["ip_location"] == "上海"
+        assert (info["following"], info["followers"], info["likes_and_collects"]) == (128, 36000, 521000)
+        assert len(info["entries"]) == 4
+        assert info["recent_notes"][0] == "周末露营装备清单"
+    
+    async def test_scroll_yields_new_notes_incrementally(self):
+        session = self.scroll_feed("scroll_1.md", "scroll_2.md", "scroll_3.md")
+        
+        batches = [
+            batch async for batch in self.collector.collect_more_pages(
+                "5f3c1a2b000000000101d2e3", [self.first], set()
+            )
+        ]
+        
+        # The first scroll also loads the page, so its batch includes the first screen;
+        # later scrolls only contribute the notes they added, and scroll_3 adds nothing
+        assert [len(batch) for batch in batches] == [6, 2]
+        assert session.step.await_count == 3
+        session.close.assert_awaited_once()
+        notes = [item for batch in batches for item in batch]
+        assert len({item["url"] for item in notes}) == 8
+        assert notes[0]["title"] == "周末露营装备清单"
+        assert notes[0]["extracted_data"]["likes"] == 12000
+        assert notes[5]["extracted_data"]["likes"] == 100000
+    
+    async def test_scroll_respects_note_budget_and_known_notes(self):
+        self.scroll_feed("scroll_1.md", "scroll_2.md")
+        self.collector.max_notes = 3
+        known = set(self.first["extracted_data"]["entries"][:2])
+        
+        batches = [
+            batch async for batch in self.collector.collect_more_pages(
+                "5f3c1a2b000000000101d2e3", [self.first], known
+            )
+        ]
+        
+        notes = [item["extracted_data"]["note_id"] for batch in batches for item in batch]
+        assert len(notes) == 3
+        assert not known & set(notes)
+        
+        # Nothing new on the first screen: the feed isn't scrolled at all
+        self.collector.fetcher.scroll_session.reset_mock()
+        batches = [
+            batch async for batch in self.collector.collect_more_pages(
+                "5f3c1a2b000000000101d2e3", [self.first], set(self.first["extracted_data"]["entries"])
+            )
+        ]
+        assert batches == []
+        self.collector.fetcher.scroll_session.assert_not_called()
+    
+    async def test_hung_scroll_times_out_through_host_guard(self):
+        session = self.scroll_feed()
+        
+        async def hang():
+            await asyncio.sleep(1)
+        session.step = AsyncMock(side_effect=hang)
+        self.collector.url_timeout = 0.05
+        
+        batches = [
+            batch async for batch in self.collector.collect_more_pages(
+                "5f3c1a2b000000000101d2e3", [self.first], set()
+            )
+        ]
+        
+        assert batches == []
+        assert self.collector.resilience.for_url(self.profile_url).timeouts == 1
+        session.close.assert_awaited_once()
 
 @pytest.mark.asyncio
 class TestSearchEngineCollector:
@@ -118,4 +290,230 @@ class TestSearchEngineCollector:
         assert "relevant_links" in result
         assert len(result["relevant_links"]) == 2
         assert "snippets" in result
-        assert len(result["snippets"]) == 2
\ No newline at end of file
+        assert len(result["snippets"]) == 2
+
+class TestCrawlFrontier:
+    def setup_method(self):
+        self.github = GitHubCollector()
+        self.page = PageCollector()
+        self.frontier = CrawlFrontier(
+            "testuser", {"github": self.github}, self.page, page_budget=2, host_concurrency=1
+        )
+    
+    def test_canonicalize_url(self):
+        assert canonicalize_url("https://www.GitHub.com/testuser/?utm_source=x#readme") == "https://github.com/testuser"
+        assert canonicalize_url("https://github.com/testuser)") == "https://github.com/testuser"
+        assert canonicalize_url(
+            "https://www.google.com/url?q=https://blog.example.com/about&sa=U"
+        ) == "https://blog.example.com/about"
+        assert canonicalize_url("mailto:testuser@example.com") is None
+    
+    def test_dedupes_and_prioritizes(self):
+        assert self.frontier.add("https://blog.example.com/posts")
+        assert self.frontier.add("https://github.com/testuser")
+        assert not self.frontier.add("https://www.github.com/testuser/")
+        assert not self.frontier.add("https://github.com/search?q=testuser")
+        
+        assert self.frontier.queue[0].url == "https://github.com/testuser"
+        assert self.frontier.queue[0].platform == "github"
+    
+    @pytest.mark.asyncio
+    async def test_run_respects_page_budget(self):
+        self.github.collect_url = AsyncMock(return_value={
+            "platform": "github", "url": "https://github.com/testuser", "extracted_data": {}
+        })
+        self.page.collect_url = AsyncMock(return_value=None)
+        self.frontier.add_search_results([{
+            "url": "https://www.google.com/search?q=testuser",
+            "extracted_data": {"relevant_links": [
+                {"url": "https://github.com/testuser"},
+                {"url": "https://testuser.dev/blog"},
+                {"url": "https://example.com/portfolio"},
+            ]}
+        }])
+        
+        results = await self.frontier.run()
+        
+        assert len(results) == 1
+        assert self.frontier.pages_fetched == 2
+        assert results[0]["extracted_data"]["discovered_from"] == "https://www.google.com/search?q=testuser"
+
+@pytest.mark.asyncio
+class TestSearchEngineCollection:
+    def setup_method(self):
+        serp_cache.clear()
+        self.collector = SearchEngineCollector("bing")
+        self.collector.rate_limit = 0
+    
+    async def test_repeat_crawl_uses_serp_cache(self):
+        self.collector.collect_url = AsyncMock(side_effect=lambda url: {
+            "platform": "search_bing", "url": url, "extracted_data": {"relevant_links": []}
+        })
+        
+        first = await self.collector.collect_user_data("testuser")
+        second = await self.collector.collect_user_data("testuser")
+        
+        assert len(first) == len(second) == 5
+        assert self.collector.collect_url.await_count == 5
+        assert all(item["extracted_data"]["serp_cache_hit"] for item in second)
+        assert "serp_cache_hit" not in first[0]["extracted_data"]
+    
+    async def test_queries_run_with_bounded_concurrency(self):
+        in_flight = 0
+        peak = 0
+        
+        async def fetch(url):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return {"platform": "search_bing", "url": url, "extracted_data": {}}
+        
+        self.collector.collect_url = fetch
+        results = await self.collector.collect_user_data("testuser")
+        
+        assert len(results) == 5
+        assert peak == self.collector.concurrency
+
+class TestTieredFetcher:
+    def setup_method(self):
+        self.fetcher = TieredFetcher()
+    
+    def test_html_to_markdown(self):
+        html = """
+        <html><head><title>x</title><script>var a = 1;</script></head>
+        <body><h1>TestUser</h1><p>Builds <b>tools</b> at <a href="/about">Example</a></p>
+        <ul><li>10 repositories</li></ul></body></html>
+        """
+        
+        markdown = html_to_markdown(html, "https://example.com/testuser")
+        
+        assert markdown.startswith("# TestUser")
+        assert "Builds **tools** at [Example](https://example.com/about)" in markdown
+        assert "- 10 repositories" in markdown
+        assert "var a" not in markdown
+    
+    @pytest.mark.asyncio
+    async def test_auto_tier_escalates_thin_pages(self):
+        self.fetcher.fetch_http = AsyncMock(return_value=FetchResult(
+            "https://example.com", True, markdown="Please enable JavaScript", html="<div id=\"root\"></div>"
+        ))
+        self.fetcher.fetch_browser = AsyncMock(return_value=FetchResult(
+            "https://example.com", True, markdown="# Rendered", tier="browser"
+        ))
+        
+        result = await self.fetcher.fetch("https://example.com")
+        
+        assert result.tier == "browser"
+        assert self.fetcher.stats["escalations"] == 1
+        assert (await self.fetcher.fetch("https://example.com", "http")).tier == "http"
+    
+    @pytest.mark.asyncio
+    async def test_auto_tier_keeps_http_failures(self):
+        self.fetcher.fetch_browser = AsyncMock()
+        for failure in (
+            FetchResult("https://example.com/gone", False, status_code=404),
+            FetchResult("https://example.com/gone", False, error="Name or service not known")
+        ):
+            self.fetcher.fetch_http = AsyncMock(return_value=failure)
+            assert await self.fetcher.fetch("https://example.com/gone") is failure
+        
+        self.fetcher.fetch_http = AsyncMock(return_value=FetchResult("https://example.com", False, status_code=403))
+        await self.fetcher.fetch("https://example.com")
+        
+        assert self.fetcher.fetch_browser.await_count == 1
+        assert self.fetcher.stats["escalations"] == 1
+
+@pytest.mark.asyncio
+class TestHostResilience:
+    def setup_method(self):
+        self.collector = ZhihuCollector()
+        self.collector.rate_limit = 0
+        self.collector.resilience = HostResilience()
+        self.collector.fetcher = Mock()
+        self.collector.fetcher.fetch = AsyncMock(return_value=FetchResult(
+            "https://www.zhihu.com/people/testuser", False, status_code=403, tier="browser"
+        ))
+    
+    @patch('src.collectors.resilience.config.BREAKER_RESET_SECONDS', 0.05)
+    async def test_breaker_opens_then_recovers(self):
+        results = await self.collector.collect_urls([f"https://www.zhihu.com/people/u{i}" for i in range(6)])
+        guard = self.collector.resilience.for_url("https://zhihu.com/")
+        
+        assert results == []
+        assert self.collector.fetcher.fetch.await_count == 3
+        assert guard.get_stats()["state"] == "open"
+        assert guard.rejected == 3
+        
+        await asyncio.sleep(0.06)
+        self.collector.fetcher.fetch.return_value = FetchResult(
+            "https://www.zhihu.com/people/testuser", True, markdown="# 测试用户\n1000 关注者", tier="browser"
+        )
+        
+        assert await self.collector.collect_url("https://www.zhihu.com/people/testuser")
+        assert guard.breaker.state == "closed"
+    
+    async def test_per_url_timeout(self):
+        async def hang(url, tier):
+            await asyncio.sleep(1)
+        self.collector.fetcher.fetch = hang
+        self.collector.url_timeout = 0.05
+        
+        assert await self.collector.collect_url("https://www.zhihu.com/people/testuser") is None
+        assert self.collector.resilience.for_url("https://zhihu.com/").timeouts == 1
+    
+    async def test_parser_errors_do_not_count_against_host(self):
+        self.collector.fetcher.fetch.return_value = FetchResult(
+            "https://www.zhihu.com/people/testuser", True, markdown="# 测试用户", tier="browser"
+        )
+        self.collector.extract_user_info = Mock(side_effect=KeyError("nickname"))
+        
+        for i in range(5):
+            assert await self.collector.collect_url(f"https://www.zhihu.com/people/u{i}") is None
+        
+        guard = self.collector.resilience.for_url("https://zhihu.com/")
+        assert guard.breaker.state == "closed"
+        assert guard.failures == 0
+    
+    async def test_adaptive_limit_backs_off_and_recovers(self):
+        limiter = AdaptiveLimiter(initial=4, max_limit=8, slow_call_seconds=1.0)
+        
+        await limiter.acquire()
+        limiter.release(False, 0.1)
+        assert limiter.limit == 2
+        
+        for _ in range(10):
+            await limiter.acquire()
+            limiter.release(True, 0.1)
+        assert 4 < limiter.limit <= 8
+        
+        await limiter.acquire()
+        limiter.release(True, 5.0)  # Slow success still backs off
+        assert limiter.limit < 4
+    
+    async def test_cancelled_waiter_passes_its_slot_on(self):
+        limiter = AdaptiveLimiter(initial=1, max_limit=1, slow_call_seconds=1.0)
+        await limiter.acquire()
+        first = asyncio.create_task(limiter.acquire())
+        second = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        
+        limiter.release(True, 0.1)  # Wakes the first waiter...
+        first.cancel()  # ...which is cancelled before it resumes
+        
+        await asyncio.wait_for(second, 1.0)
+        assert first.cancelled()
+        assert limiter.in_flight == 1
+    
+    async def test_rate_limit_wait_not_timed_by_guard(self):
+        self.collector.rate_limit = 0.2
+        self.collector.last_request_time = 0
+        self.collector.url_timeout = 0.1
+        self.collector.fetcher.fetch.return_value = FetchResult(
+            "https://www.zhihu.com/people/testuser", True, markdown="# 测试用户\n1000 关注者", tier="http"
+        )
+        
+        await self.collector.collect_url("https://www.zhihu.com/people/a")
+        assert await self.collector.collect_url("https://www.zhihu.com/people/b")
+        assert self.collector.resilience.for_url("https://zhihu.com/").timeouts == 0
@@ -0,0 +1,275 @@
+import asyncio
+import json
+import httpx
+import pytest
+from unittest.mock import Mock, patch
+from src.extractors import LLMExtractor
+from src.extractors.content_reducer import ContentReducer, estimate_tokens
+from src.extractors.field_rules import LLMGate, extract_schema, score_fields
+from src.extractors.routing import ModelRouter
+from src.extractors.usage import LLMUsageTracker
+from src.collectors import GitHubCollector
+from tests.test_collectors import load_fixture
+from tests.llm_stub import ChatStub
+
+GITHUB_PAGE = """
+[Skip to content](#start-of-content)
+
+- [Product](https://github.com/features)
+- [Solutions](https://github.com/solutions)
+- [Pricing](https://github.com/pricing)
+
+Sign in
+
+Sign up
+
+# TestUser
+
+**Bio:** Backend engineer working on crawlers and search
+
+42 repositories · 1200 followers · 80 following
+
+[Sign up](https://github.com/signup)
+
+Pinned
+
+Pinned
+
+Created new-repo
+
+© 2024 GitHub, Inc.
+
+- [Terms](https://docs.github.com/terms)
+- [Privacy](https://docs.github.com/privacy)
+- [Security](https://github.com/security)
+"""
+
+class TestContentReducer:
+    def setup_method(self):
+        self.reducer = ContentReducer(token_budget=200)
+    
+    def test_strips_boilerplate_and_duplicates(self):
+        reduced = self.reducer.reduce(GITHUB_PAGE, "github")
+        
+        assert reduced.startswith("# TestUser")
+        assert "**Bio:** Backend engineer" in reduced
+        assert "1200 followers" in reduced
+        assert reduced.count("Pinned") == 1
+        for chrome in ("Skip to content", "Sign in", "Pricing", "© 2024", "Privacy"):
+            assert chrome not in reduced
+    
+    def test_packs_signal_into_budget(self):
+        filler = "\n\n".join(f"Lorem ipsum dolor sit amet paragraph {i} " * 8 for i in range(40))
+        content = filler + "\n\n**Bio:** Rust developer\n\n500 followers"
+        
+        reduced = self.reducer.reduce(content, "web", token_budget=100)
+        
+        assert estimate_tokens(reduced) <= 100
+        assert "Rust developer" in reduced
+        assert "500 followers" in reduced
+    
+    def test_stats_per_platform(self):
+        self.reducer.reduce(GITHUB_PAGE, "github")
+        self.reducer.reduce(GITHUB_PAGE, "github")
+        self.reducer.reduce("# 测试用户\n\n1000 关注者", "zhihu")
+        
+        stats = self.reducer.get_stats()
+        
+        assert stats["github"]["pages"] == 2
+        assert stats["github"]["tokens_saved"] > 0
+        assert 0 < stats["github"]["saved_ratio"] < 1
+        assert stats["zhihu"]["tokens_saved"] == 0
+
+def completion(text: str) -> Mock:
+    response = Mock()
+    response.choices = [Mock(message=Mock(content=text))]
+    return response
+
+class TestBatchExtraction:
+    def setup_method(self):
+        self.extractor = LLMExtractor(client=Mock())
+        self.create = self.extractor.client.chat.completions.create
+        self.pages = [
+            {"content": f"# Page {i}\n\n{i * 10} followers", "platform": "github", "url": f"https://github.com/u?tab={i}"}
+            for i in range(4)
+        ]
+    
+    def test_one_request_per_batch(self):
+        self.create.return_value = completion(json.dumps({"results": [
+            {"index": 2, "followers": 20}, {"index": 0, "followers": 0},
+            {"index": 3, "followers": 30}, {"index": 1, "followers": 10},
+        ]}))
+        
+        results = self.extractor.extract_batch(self.pages)
+        
+        assert self.create.call_count == 1
+        assert [r["followers"] for r in results] == [0, 10, 20, 30]
+        assert "Document 3" in self.create.call_args.kwargs["messages"][1]["content"]
+    
+    def test_malformed_response_splits_and_retries(self):
+        def respond(**kwargs):
+            prompt = kwargs["messages"][1]["content"]
+            if "4 documents" in prompt:
+                return completion('{"results": [{"index": 0}]')  # Truncated JSON
+            return completion(json.dumps({"results": [{"index": 0, "ok": True}, {"index": 1, "ok": True}]}))
+        self.create.side_effect = respond
+        
+        results = self.extractor.extract_batch(self.pages)
+        
+        assert self.create.call_count == 3
+        assert all(r["ok"] for r in results)
+        assert self.extractor.batch_stats["splits"] == 1
+    
+    @patch('src.extractors.llm_extractor.config.LLM_BATCH_MAX_PAGES', 3)
+    def test_batches_respect_page_limit(self):
+        batches = self.extractor._pack_batches(self.pages * 2)
+        
+        assert [len(batch) for batch in batches] == [3, 3, 2]
+    
+    def test_budget_leaves_remaining_pages_rule_only(self):
+        usage = Mock(prompt_tokens=3000, completion_tokens=1500, prompt_tokens_details=None)
+        self.create.return_value = completion(json.dumps({"results": [
+            {"index": 0, "ok": True}, {"index": 1, "ok": True}
+        ]}))
+        self.create.return_value.usage = usage
+        tracker = LLMUsageTracker(crawl_budget=5000, daily_budget=0)
+        
+        with patch('src.extractors.llm_extractor.llm_usage', tracker), \
+                patch('src.extractors.llm_extractor.config.LLM_BATCH_MAX_PAGES', 2), \
+                tracker.scope("testuser") as scope:
+            results = self.extractor.extract_batch(self.pages)
+        
+        # The first request spends 4500 of 5000 tokens; the second batch never goes out
+        assert self.create.call_count == 1
+        assert results == [{"ok": True}, {"ok": True}, {}, {}]
+        assert (scope.tokens, scope.skipped_pages, scope.exhausted) == (4500, 2, "crawl")
+        assert tracker.drain()[0]["total_tokens"] == 4500
+
+class TestModelRouting:
+    def setup_method(self):
+        self.router = ModelRouter(
+            routes={
+                "extraction": {"model": "small-model", "max_tokens": 300, "concurrency": 2, "timeout": 5},
+                "summary": {"model": "large-model", "max_tokens": 900, "temperature": 0.2, "concurrency": 1, "timeout": 5}
+            },
+            pricing={"small-model": (0.2, 0.1, 0.8), "large-model": (2.0, 1.0, 8.0)}
+        )
+        self.stub = ChatStub(latency_ms={"small-model": 50})
+        self.extractor = LLMExtractor(http_client=httpx.Client(transport=httpx.MockTransport(self.stub.handle)))
+        self.tracker = LLMUsageTracker(crawl_budget=0, daily_budget=0)
+        self.patches = [
+            patch('src.extractors.llm_extractor.model_router', self.router),
+            patch('src.extractors.llm_extractor.llm_usage', self.tracker)
+        ]
+        for p in self.patches:
+            p.start()
+    
+    def teardown_method(self):
+        for p in self.patches:
+            p.stop()
+        self.router.close()
+    
+    def test_routes_pick_model_and_token_limit(self):
+        extracted = self.extractor.extract_structured_info("# TestUser\n\n42 repositories", "github", "https://github.com/u")
+        profile = self.extractor.generate_profile_summary([{"platform": "github", "content": "Pushed to repo"}])
+        
+        assert extracted["activity_type"] == "profile"
+        assert profile["interests"] == ["python"]
+        sent = [(r["model"], r["max_tokens"], r["temperature"]) for r in self.stub.requests]
+        assert sent == [("small-model", 300, 0.1), ("large-model", 900, 0.2)]
+        assert [(r["route"], r["model"]) for r in self.tracker.drain()] == [
+            ("extraction", "small-model"), ("summary", "large-model")
+        ]
+    
+    def test_latency_and_cost_reported_per_route(self):
+        self.extractor.extract_structured_info("# TestUser", "github", "https://github.com/u")
+        
+        stats = self.router.get_stats()
+        record = self.tracker.drain()[0]
+        expected = (record["prompt_tokens"] * 0.2 + record["completion_tokens"] * 0.8) / 1_000_000
+        assert record["cost_usd"] == pytest.approx(expected)
+        assert stats["extraction"]["calls"] == 1
+        assert stats["extraction"]["avg_latency_ms"] >= 50
+        assert stats["extraction"]["cost_usd"] == round(expected, 6)
+        assert stats["summary"]["calls"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_route_concurrency_limit(self):
+        await asyncio.gather(*(
+            self.router.run("extraction", self.extractor.extract_structured_info,
+                            f"# Page {i}", "github", f"https://github.com/u?tab={i}")
+            for i in range(6)
+        ))
+        
+        assert len(self.stub.requests) == 6
+        assert self.stub.max_in_flight["small-model"] == 2
+        assert self.router.get_stats()["extraction"]["queued"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_route_runs_again_after_close(self):
+        await self.router.run("extraction", self.extractor.extract_structured_info, "# A", "github", "https://github.com/a")
+        self.router.close()
+        await self.router.run("extraction", self.extractor.extract_structured_info, "# B", "github", "https://github.com/b")
+        
+        assert len(self.stub.requests) == 2
+
+class TestFieldRules:
+    def setup_method(self):
+        self.html = load_fixture("github/profile.html")
+        self.gate = LLMGate(enabled=True, threshold=0.7)
+    
+    def test_schema_reads_css_and_counts(self):
+        fields = extract_schema("github_profile", self.html)
+        
+        assert fields["username"][0] == "testuser"
+        assert fields["followers"][0] == 1200
+        assert fields["repositories_count"][0] == 42
+        assert fields["location"][0] == "Hangzhou"
+    
+    def test_schema_without_lxml(self):
+        with_lxml = extract_schema("github_profile", self.html)
+        with patch('src.extractors.field_rules.LXML_AVAILABLE', False):
+            assert extract_schema("github_profile", self.html) == with_lxml
+    
+    def test_embedded_json_paths(self):
+        html = (
+            '<script>window.__INITIAL_STATE__={"user":{"userPageData":{"basicInfo":{"nickname":"小林同学",'
+            '"redId":"27384910","desc":undefined},"interactions":[{"type":"follows","count":"128"},'
+            '{"type":"fans","count":"3.6万"}]}}}</script>'
+        )
+        fields = extract_schema("xiaohongshu_profile", html)
+        
+        assert fields["nickname"] == ("小林同学", 0.95)
+        assert fields["followers"][0] == 36000
+        assert "description" not in fields
+    
+    def test_confidence_from_agreement_and_disagreement(self):
+        info = score_fields({"type": "github_profile", "username": "TestUser", "followers": 999, "bio": "x"}, self.html)
+        confidence = info["field_confidence"]
+        
+        assert confidence["username"] == 0.95  # regex and schema agree
+        assert info["followers"] == 1200 and confidence["followers"] < 0.9  # schema wins a disagreement
+        assert confidence["location"] == 0.9  # schema only
+    
+    def test_gate_skips_confident_pages(self):
+        collector = GitHubCollector()
+        rich = collector.build_item("https://github.com/testuser", GITHUB_PAGE, "http", self.html)
+        thin = collector.build_item("https://github.com/testuser", "# TestUser\n12 repositories", "http")
+        search = {"platform": "search_google", "extracted_data": {"type": "google_search_results"}}
+        
+        assert not self.gate.needs_llm(rich)
+        assert self.gate.weak_fields(thin["extracted_data"]) == ["followers"]
+        assert self.gate.needs_llm(thin) and self.gate.needs_llm(search)
+        
+        self.gate.record_latency(["github"], 2.0)
+        stats = self.gate.get_stats()["platforms"]["github"]
+        assert (stats["pages"], stats["llm_pages"], stats["llm_call_rate"]) == (2, 1, 0.5)
+        assert stats["latency_saved_seconds"] == 2.0
+    
+    def test_merge_keeps_confident_fields(self):
+        extracted = {"type": "github_profile", "followers": 1200, "field_confidence": {"followers": 0.95}}
+        
+        self.gate.merge(extracted, {"followers": 12, "skills/interests": ["python"]})
+        
+        assert extracted["followers"] == 1200
+        assert extracted["skills/interests"] == ["python"]
@@ -1,13 +1,15 @@
 import pytest
 from unittest.mock import Mock, AsyncMock, patch
 from datetime import datetime
+from src.config import config
+from src.extractors import LLMExtractor
 from src.profiler.user_profiler import UserProfiler
 
-@pytest.mark.asyncio
 class TestUserProfiler:
     def setup_method(self):
         self.profiler = UserProfiler()
     
+    @pytest.mark.asyncio
     @patch('src.profiler.user_profiler.db_manager')
     @patch('src.profiler.user_profiler.LLMExtractor')
     async def test_crawl_user_data_success(self, mock_llm_extractor, mock_db):
@@ -39,12 +41,14 @@ class TestUserProfiler:
         assert len(result["errors"]) == 0
         assert result["collected_data"][0]["extracted_data"]["enhanced"] == True
     
+    @pytest.mark.asyncio
     async def test_crawl_user_data_excluded_id(self):
         result = await self.profiler.crawl_user_data("abc", ["github"], [])
         
         assert result["user_id"] == "abc"
         assert len(result["collected_data"]) == 0
     
+    @pytest.mark.asyncio
     @patch('src.profiler.user_profiler.db_manager')
     @patch('src.profiler.user_profiler.LLMExtractor')
     async def test_generate_user_profile_success(self, mock_llm_extractor, mock_db):
@@ -78,6 +82,7 @@ class TestUserProfiler:
         assert result["activity_summary"]["total_activities"] == 1
         assert "personality_traits" in result["ai_analysis"]
     
+    @pytest.mark.asyncio
     async def test_generate_user_profile_no_activities(self):
         with patch('src.profiler.user_profiler.db_manager') as mock_db:
             mock_db.get_user_activities.return_value = []
@@ -88,6 +93,27 @@ class TestUserProfiler:
             assert "error" in result
             assert "No activities found" in result["error"]
     
+    def test_failed_batch_falls_back_to_single_pages(self):
+        client = Mock()
+        client.chat.completions.create.side_effect = RuntimeError("connection reset")
+        self.profiler.llm_extractor = LLMExtractor(client=client)
+        items = [
+            {
+                "platform": "search_google",
+                "url": f"https://example.com/{i}",
+                "content": "result",
+                "extracted_data": {"title": f"Result {i}"}
+            }
+            for i in range(3)
+        ]
+        
+        with patch.object(config, 'LLM_BATCH_ENABLED', True):
+            self.profiler._enhance_items(items, Mock())
+        
+        # One batched request, then one request per page; nothing from the failures is merged
+        assert client.chat.completions.create.call_count == 4
+        assert [item["extracted_data"] for item in items] == [{"title": f"Result {i}"} for i in range(3)]
+    
     def test_calculate_significance(self):
         activity = {
             "platform": "github",
@@ -0,0 +1,273 @@
+import asyncio
+import httpx
+import pytest
+import pytest_asyncio
+import sqlite3
+from datetime import datetime
+from unittest.mock import Mock, patch
+from sqlalchemy import text
+from src.storage.database import DatabaseManager
+from src.storage.archive import PageArchive
+from src.replay import apply_results, enhance_replayed, replay_chunk
+from src.extractors import LLMExtractor, llm_gate
+from src.extractors.usage import LLMUsageTracker
+from src.collectors import GitHubCollector
+from src.profiler import user_profiler
+from tests.llm_stub import ChatStub
+
+@pytest_asyncio.fixture
+async def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        "src.storage.database.config.DATABASE_URL",
+        f"sqlite+aiosqlite:///{tmp_path / 'test.db'}"
+    )
+    manager = DatabaseManager()
+    await manager.init_db()
+    yield manager
+    await manager.close()
+
+@pytest.mark.asyncio
+class TestActivityContent:
+    async def test_content_loaded_only_on_request(self, db):
+        await db.add_activity({
+            "user_id": "testuser",
+            "platform": "github",
+            "url": "https://github.com/testuser",
+            "content": "# TestUser\n" * 50
+        })
+        
+        with_content = await db.get_user_activities("testuser", with_content=True)
+        without_content = await db.get_user_activities("testuser")
+        
+        assert with_content[0].content == "# TestUser\n" * 50
+        assert without_content[0].content is None
+    
+    async def test_migrates_inline_content(self, tmp_path, monkeypatch):
+        path = tmp_path / "legacy.db"
+        conn = sqlite3.connect(path)
+        conn.execute(
+            "CREATE TABLE user_activities (id INTEGER PRIMARY KEY, user_id VARCHAR, "
+            "platform VARCHAR, url VARCHAR, title VARCHAR, content TEXT, "
+            "extracted_data JSON, timestamp DATETIME, created_at DATETIME)"
+        )
+        conn.execute(
+            "INSERT INTO user_activities (user_id, platform, url, content, timestamp) "
+            "VALUES ('testuser', 'github', 'https://github.com/testuser', 'legacy', '2024-01-01 00:00:00')"
+        )
+        conn.commit()
+        conn.close()
+        
+        monkeypatch.setattr("src.storage.database.config.DATABASE_URL", f"sqlite+aiosqlite:///{path}")
+        manager = DatabaseManager()
+        await manager.init_db()
+        activities = await manager.get_user_activities("testuser", with_content=True)
+        await manager.close()
+        
+        assert activities[0].content == "legacy"
+        columns = [row[1] for row in sqlite3.connect(path).execute("PRAGMA table_info(user_activities)")]
+        assert "content" not in columns
+
+@pytest.mark.asyncio
+class TestSQLiteTuning:
+    async def test_wal_and_read_only_readers(self, db):
+        async with db.engine.connect() as conn:
+            journal_mode = (await conn.execute(text("PRAGMA journal_mode"))).scalar()
+        async with db.read_engine.connect() as conn:
+            query_only = (await conn.execute(text("PRAGMA query_only"))).scalar()
+        
+        assert db.read_engine is not db.engine
+        assert journal_mode == "wal"
+        assert query_only == 1
+
+@pytest.mark.asyncio
+class TestActivityWriter:
+    async def test_concurrent_submits_share_a_commit(self, db):
+        futures = [
+            db.submit_activity({
+                "user_id": "testuser",
+                "platform": "github",
+                "url": f"https://github.com/testuser?page={i}",
+                "content": f"page {i}"
+            })
+            for i in range(20)
+        ]
+        
+        ids = await asyncio.gather(*futures)
+        
+        assert len(set(ids)) == 20
+        assert db.writer.batches_committed == 1
+        assert len(await db.get_user_activities("testuser")) == 20
+    
+    async def test_close_flushes_pending_rows(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(
+            "src.storage.database.config.DATABASE_URL",
+            f"sqlite+aiosqlite:///{tmp_path / 'flush.db'}"
+        )
+        manager = DatabaseManager()
+        await manager.init_db()
+        future = manager.submit_activity({
+            "user_id": "testuser", "platform": "github", "url": "https://github.com/testuser"
+        })
+        
+        await manager.close()
+        
+        assert future.done() and future.result() > 0
+
+@pytest.mark.asyncio
+class TestSearch:
+    async def test_search_matches_title_content_and_topics(self, db):
+        await db.add_activity({
+            "user_id": "alice",
+            "platform": "github",
+            "url": "https://github.com/alice",
+            "title": "Async crawler in Rust",
+            "content": "Built with tokio",
+            "extracted_data": {"skills/interests": ["Kubernetes"]}
+        })
+        await db.add_activity({
+            "user_id": "bob",
+            "platform": "zhihu",
+            "url": "https://www.zhihu.com/people/bob",
+            "title": "Rust ownership explained",
+            "content": "Borrowing rules"
+        })
+        
+        total, results = await db.search_activities("rust")
+        assert total == 2
+        
+        total, results = await db.search_activities("kubernetes")
+        assert [r["user_id"] for r in results] == ["alice"]
+        
+        total, results = await db.search_activities("rust", platform="zhihu")
+        assert [r["user_id"] for r in results] == ["bob"]
+        
+        total, results = await db.search_activities("tok*", user_id="alice")
+        assert total == 1
+    
+    async def test_search_ignores_query_syntax(self, db):
+        await db.add_activity({
+            "user_id": "alice", "platform": "github", "url": "https://github.com/alice", "title": "C++ AND"
+        })
+        
+        total, _ = await db.search_activities('c++ "AND')
+        assert total == 1
+
+class TestPageArchive:
+    def test_append_and_read_across_segments(self, tmp_path):
+        archive = PageArchive(str(tmp_path), segment_bytes=64)
+        pages = [f"# Page {i}\n" + "content " * (10 + i) for i in range(5)]
+        records = [
+            archive.append("github", "testuser", f"https://github.com/testuser?page={i}", page)
+            for i, page in enumerate(pages)
+        ]
+        
+        assert len({record["segment"] for record in records}) > 1
+        assert [archive.read(record) for record in archive.records()] == pages
+        assert len(list(archive.records(platform="zhihu"))) == 0
+        archive.close()
+    
+    def test_replay_reextracts_archived_pages(self, tmp_path):
+        archive = PageArchive(str(tmp_path))
+        archive.append("github", "testuser", "https://github.com/testuser", "# TestUser\n42 followers")
+        
+        results = replay_chunk(str(tmp_path), list(archive.records()), use_llm=False)
+        
+        assert results[0]["extracted_data"]["followers"] == 42
+        assert "field_confidence" in results[0]["extracted_data"]
+    
+    @pytest.mark.asyncio
+    async def test_replay_apply_keeps_stored_fields(self, tmp_path, db):
+        await db.add_activity({
+            "user_id": "testuser",
+            "platform": "github",
+            "url": "https://github.com/testuser",
+            "extracted_data": {
+                "followers": 40,
+                "skills/interests": ["rust"],
+                "fetch_tier": "browser",
+                "field_confidence": {"followers": 0.9, "bio": 0.9}
+            }
+        })
+        archive = PageArchive(str(tmp_path / "archive"))
+        archive.append("github", "testuser", "https://github.com/testuser", "# TestUser\n42 followers")
+        
+        results = replay_chunk(str(tmp_path / "archive"), list(archive.records()), use_llm=False)
+        assert await apply_results(results, db) == 1
+        
+        stored = (await db.get_user_activities("testuser"))[0].extracted_data
+        assert stored["followers"] == 42
+        assert stored["skills/interests"] == ["rust"]
+        assert stored["fetch_tier"] == "browser"
+        assert stored["field_confidence"]["bio"] == 0.9
+        assert stored["field_confidence"]["followers"] == results[0]["extracted_data"]["field_confidence"]["followers"]
+    
+    @pytest.mark.asyncio
+    async def test_replay_llm_calls_are_accounted(self, db):
+        stub = ChatStub()
+        item = GitHubCollector().build_item("https://github.com/testuser", "# TestUser\n42 followers", "archive")
+        
+        extractor = LLMExtractor(http_client=httpx.Client(transport=httpx.MockTransport(stub.handle)))
+        with patch.object(user_profiler, "_llm_extractor", extractor), \
+                patch.object(llm_gate, "enabled", False):
+            await enhance_replayed({"testuser": [item]}, db)
+        
+        rows = await db.get_llm_usage_summary(datetime(2000, 1, 1), group_by="crawl", user_id="testuser")
+        assert len(stub.requests) == 1
+        assert [row["calls"] for row in rows] == [1]
+
+@pytest.mark.asyncio
+class TestUpdateExtractedData:
+    async def test_update_reindexes_topics(self, db):
+        await db.add_activity({
+            "user_id": "testuser",
+            "platform": "github",
+            "url": "https://github.com/testuser",
+            "extracted_data": {"skills": ["cobol"]}
+        })
+        
+        activity_id = await db.update_extracted_data(
+            "testuser", "https://github.com/testuser", {"skills": ["haskell"]}
+        )
+        
+        assert activity_id is not None
+        assert (await db.search_activities("cobol"))[0] == 0
+        assert (await db.search_activities("haskell"))[0] == 1
+
+@pytest.mark.asyncio
+class TestLastActivityTime:
+    async def test_last_activity_time(self, db):
+        assert await db.get_last_activity_time("testuser") is None
+        
+        activity = await db.add_activity({
+            "user_id": "testuser",
+            "platform": "github",
+            "url": "https://github.com/testuser"
+        })
+        
+        assert await db.get_last_activity_time("testuser") == activity.created_at
+        assert await db.get_last_activity_time("otheruser") is None
+
+@pytest.mark.asyncio
+class TestLLMUsage:
+    async def test_usage_persisted_and_aggregated(self, db):
+        tracker = LLMUsageTracker(crawl_budget=0, daily_budget=0)
+        usage = Mock(prompt_tokens=900, completion_tokens=100, prompt_tokens_details=Mock(cached_tokens=512))
+        with tracker.scope("testuser"):
+            tracker.record("extract", "gpt-3.5-turbo", usage, 1.2, platform="github")
+            tracker.record("extract_batch", "gpt-3.5-turbo", usage, 2.4, platform="zhihu", pages=3)
+            tracker.record("extract", "gpt-3.5-turbo", None, 0.3, platform="github", status="error")
+        await tracker.flush(db)
+        
+        groups = {row["key"]: row for row in await db.get_llm_usage_summary(datetime(2000, 1, 1))}
+        
+        assert groups["github"]["calls"] == 2 and groups["github"]["errors"] == 1
+        assert groups["github"]["total_tokens"] == 1000
+        assert groups["zhihu"]["pages"] == 3 and groups["zhihu"]["cache_hits"] == 1
+        assert await db.get_llm_tokens_since(datetime(2000, 1, 1)) == 2000
+        
+        # A restarted tracker picks up today's spend from the table
+        restarted = LLMUsageTracker(daily_budget=2500)
+        await restarted.load_daily(db)
+        assert restarted.get_stats()["today_tokens"] == 2000
+        assert restarted.exhausted() is None
+
@@ -0,0 +1,183 @@
+import pytest
+import asyncio
+import pstats
+import time
+from src.utils.singleflight import SingleFlight
+from src.utils.offload import CPUOffloader
+from src.utils.loop_monitor import LoopLagMonitor
+from src.utils.profiling import ProfileManager, ProfileBusyError
+from src.utils.tracing import Tracer, waterfall
+from src.utils.logger import LogContext
+from src.collectors.fetcher import html_to_markdown
+
+@pytest.mark.asyncio
+class TestSingleFlight:
+    def setup_method(self):
+        self.flight = SingleFlight()
+        self.calls = 0
+    
+    async def slow_work(self, value):
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        return value
+    
+    async def test_concurrent_calls_share_one_run(self):
+        results = await asyncio.gather(*(
+            self.flight.do(("crawl", "testuser"), self.slow_work, i) for i in range(5)
+        ))
+        
+        assert self.calls == 1
+        assert results == [0] * 5
+        assert self.flight.joined == 4
+        assert not self.flight.in_flight(("crawl", "testuser"))
+    
+    async def test_keys_are_independent_and_rerun_after_completion(self):
+        await asyncio.gather(
+            self.flight.do(("crawl", "alice"), self.slow_work, 1),
+            self.flight.do(("profile", "alice"), self.slow_work, 2),
+        )
+        await self.flight.do(("crawl", "alice"), self.slow_work, 3)
+        
+        assert self.calls == 3
+    
+    async def test_cancelled_waiter_does_not_cancel_shared_task(self):
+        task, _ = self.flight.start(("crawl", "testuser"), self.slow_work, "done")
+        waiter = asyncio.create_task(self.flight.do(("crawl", "testuser"), self.slow_work, "other"))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        
+        assert await task == "done"
+        assert self.calls == 1
+
+class TestCPUOffloader:
+    @pytest.mark.asyncio
+    async def test_calls_in_one_iteration_share_a_batch(self):
+        offloader = CPUOffloader(mode="thread", workers=2, batch_size=8, min_bytes=0)
+        
+        results = await asyncio.gather(*(offloader.run(pow, i, 2) for i in range(20)))
+        offloader.close()
+        
+        assert results == [i * i for i in range(20)]
+        assert offloader.batches == 3  # 8 + 8 + 4
+    
+    @pytest.mark.asyncio
+    async def test_process_pool_matches_inline_and_raises(self):
+        offloader = CPUOffloader(mode="process", workers=1, min_bytes=0)
+        html = "<h1>TestUser</h1><p>42 <a href='/x'>repositories</a></p>"
+        
+        try:
+            assert await offloader.run(html_to_markdown, html, "https://example.com") == html_to_markdown(html, "https://example.com")
+            with pytest.raises(ValueError):
+                await offloader.run(int, "not a number")
+        finally:
+            offloader.close()
+    
+    def test_small_work_stays_inline(self):
+        offloader = CPUOffloader(mode="process", min_bytes=1024)
+        
+        assert not offloader.worth_offloading(100)
+        assert offloader.worth_offloading(4096)
+        assert not CPUOffloader(mode="inline", min_bytes=0).worth_offloading(4096)
+
+def parse_everything_synchronously():
+    time.sleep(0.2)
+
+@pytest.mark.asyncio
+class TestLoopLagMonitor:
+    async def test_reports_lag_and_names_blocking_code(self):
+        monitor = LoopLagMonitor(interval_ms=10, stall_threshold_ms=50)
+        monitor.start()
+        await asyncio.sleep(0.05)
+        
+        parse_everything_synchronously()
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+        
+        stats = monitor.get_stats()
+        assert stats["stalls"] == 1
+        assert "parse_everything_synchronously" in stats["last_stall"]["culprit"]
+        assert stats["max_ms"] >= 150
+        assert stats["p50_ms"] < stats["max_ms"]
+
+def spin_for(seconds: float):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+@pytest.mark.asyncio
+class TestProfileManager:
+    async def test_sampling_profile_records_folded_stacks(self, tmp_path):
+        manager = ProfileManager(directory=str(tmp_path), interval_ms=5)
+        session = manager.start("sample", "GET /slow")
+        spin_for(0.1)
+        artifact = await manager.finish(session)
+        
+        assert artifact["samples"] > 0
+        with open(manager.path(artifact)) as f:
+            stack, count = f.readline().rsplit(" ", 1)
+        assert stack.endswith("test_utils.py:spin_for")
+        assert "spin_for" in manager.render_text(artifact)
+    
+    async def test_cprofile_is_exclusive_and_writes_pstats(self, tmp_path):
+        manager = ProfileManager(directory=str(tmp_path))
+        session = manager.start("cprofile", "crawl_user_data testuser")
+        with pytest.raises(ProfileBusyError):
+            manager.start("cprofile", "another")
+        spin_for(0.01)
+        artifact = await manager.finish(session)
+        
+        stats = pstats.Stats(manager.path(artifact))
+        assert any(func[2] == "spin_for" for func in stats.stats)
+        
+        session = manager.start("cprofile", "after")
+        assert session.profile is not None
+        await manager.finish(session)
+    
+    async def test_old_artifacts_are_pruned(self, tmp_path):
+        manager = ProfileManager(directory=str(tmp_path), max_artifacts=2)
+        for _ in range(3):
+            await manager.finish(manager.start("sample", "GET /"))
+        
+        assert len(manager.list()) == 2
+        assert len(list(tmp_path.iterdir())) == 2
+
+@pytest.mark.asyncio
+class TestTracer:
+    async def test_spans_nest_across_tasks_and_threads(self, tmp_path):
+        tracer = Tracer(enabled=True, export_path=str(tmp_path / "spans.jsonl"))
+        
+        def call_llm():
+            with tracer.span("llm.complete"):
+                time.sleep(0.01)
+        
+        async def fetch(url):
+            with tracer.span("fetch", url=url):
+                await asyncio.sleep(0.01)
+                await asyncio.to_thread(call_llm)
+        
+        with tracer.span("crawl", user_id="testuser") as crawl:
+            await asyncio.gather(fetch("https://a"), fetch("https://b"))
+        tracer.close()
+        
+        rows = waterfall(tracer.get_trace(crawl.trace_id))["spans"]
+        assert [(row["name"], row["depth"]) for row in rows][0] == ("crawl", 0)
+        assert sorted(row["depth"] for row in rows if row["name"] == "fetch") == [1, 1]
+        assert sorted(row["depth"] for row in rows if row["name"] == "llm.complete") == [2, 2]
+        
+        # Evicted from memory: read back from the JSONL export
+        tracer.traces.clear()
+        assert len(tracer.get_trace(crawl.trace_id)) == 5
+    
+    async def test_errors_are_recorded_and_logs_carry_trace_id(self, tmp_path, caplog):
+        tracer = Tracer(enabled=True, export_path=str(tmp_path / "spans.jsonl"))
+        
+        with pytest.raises(ValueError):
+            with tracer.span("db.write") as span:
+                with caplog.at_level("INFO", logger="user_profiler"):
+                    LogContext(operation="test").info("writing")
+                raise ValueError("disk full")
+        tracer.close()
+        
+        record = tracer.get_trace(span.trace_id)[0]
+        assert record["status"] == {"code": "ERROR", "message": "ValueError: disk full"}
+        assert caplog.records[-1].trace_id == span.trace_id